@@ -1,6 +1,10 @@
-from contextlib import asynccontextmanager
+import asyncio
+import logging
+import os
+from contextlib import AsyncExitStack, asynccontextmanager
 from typing import List
 
+from aiobotocore.config import AioConfig
 from aiobotocore.session import get_session
 from botocore.exceptions import ClientError, BotoCoreError
 
@@ -16,6 +20,9 @@ from src.exceptions import (
 MAX_SIZE = settings.MAX_FILE_SIZE
 CHUNK_SIZE = 8 * 1024 * 1024  # 8 MB
 MIN_PART_SIZE = 5 * 1024 * 1024  # 5 MB
+MULTIPART_THRESHOLD = 16 * 1024 * 1024  # 16 MB
+
+log = logging.getLogger(__name__)
 
 
 class S3Adapter(AbstractStorage):
@@ -25,6 +32,8 @@ class S3Adapter(AbstractStorage):
         secret_key: str,
         endpoint_url: str,
         bucket_name: str,
+        max_pool_connections: int = 10,
+        keepalive_timeout: float = 60,
     ):
         self.config = {
             "aws_access_key_id": access_key,
@@ -32,11 +41,43 @@ class S3Adapter(AbstractStorage):
             "endpoint_url": endpoint_url,
         }
         self.bucket_name = bucket_name
+        self.client_config = AioConfig(
+            max_pool_connections=max_pool_connections,
+            tcp_keepalive=True,
+            connector_args={"keepalive_timeout": keepalive_timeout},
+        )
         self.session = get_session()
+        self._client = None
+        self._exit_stack: AsyncExitStack | None = None
+
+    async def connect(self):
+        """
+        Open a long-lived client whose connection pool is reused by every operation
+        """
+        if self._client is not None:
+            return
+        log.info(f"S3: Opening client for {self.config['endpoint_url']}...")
+        self._exit_stack = AsyncExitStack()
+        self._client = await self._exit_stack.enter_async_context(self._create_client())
+        log.info("S3: Client opened.")
+
+    async def close(self):
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+            self._client = None
+            self._exit_stack = None
+            log.info("S3: Client closed.")
+
+    def _create_client(self):
+        return self.session.create_client("s3", config=self.client_config, **self.config)
 
     @asynccontextmanager
     async def _get_client(self):
-        async with self.session.create_client("s3", **self.config) as client:
+        if self._client is not None:
+            yield self._client
+            return
+        # not connected (e.g. inside a one-off event loop): fall back to a short-lived client
+        async with self._create_client() as client:
             yield client
 
     async def upload_streaming_file(self, stream, key: str, max_file_size: int = MAX_SIZE):
@@ -107,6 +148,60 @@ class S3Adapter(AbstractStorage):
         except (ClientError, BotoCoreError) as exc:
             raise UploadFailureException from exc
 
+    async def upload_path(
+        self,
+        key: str,
+        path: str,
+        multipart_threshold: int = MULTIPART_THRESHOLD,
+        part_size: int = CHUNK_SIZE,
+    ) -> int:
+        """
+        Upload a local file without reading it into memory: one streamed PUT below
+        `multipart_threshold` bytes, a multipart upload of `part_size` parts above it.
+        Returns the number of bytes uploaded.
+
+        The file is opened and its parts are read in a thread, so that the other uploads
+        sharing the event loop keep going while the disk is busy.
+        """
+        f = await asyncio.to_thread(open, path, "rb")
+        try:
+            size = os.fstat(f.fileno()).st_size
+            async with self._get_client() as client:
+                if size < multipart_threshold:
+                    await client.put_object(
+                        Bucket=self.bucket_name,
+                        Key=key,
+                        Body=f,
+                        ContentLength=size,
+                    )
+                    return size
+
+                response = await client.create_multipart_upload(Bucket=self.bucket_name, Key=key)
+                upload_id = response["UploadId"]
+                parts = []
+                try:
+                    while data := await asyncio.to_thread(f.read, part_size):
+                        part = await self._upload_part(client, key, upload_id, len(parts) + 1, data)
+                        parts.append(part)
+                    await client.complete_multipart_upload(
+                        Bucket=self.bucket_name,
+                        Key=key,
+                        UploadId=upload_id,
+                        MultipartUpload={"Parts": parts},
+                    )
+                except BaseException:
+                    await client.abort_multipart_upload(
+                        Bucket=self.bucket_name,
+                        Key=key,
+                        UploadId=upload_id,
+                    )
+                    raise
+        except (ClientError, BotoCoreError) as exc:
+            raise UploadFailureException from exc
+        finally:
+            f.close()
+        return size
+
     async def get_file(self, key: str) -> bytes:
         """
         Get object from s3 storage
@@ -122,6 +217,26 @@ class S3Adapter(AbstractStorage):
                 raise
         return data
 
+    async def download_file(self, key: str, path: str, chunk_size: int = CHUNK_SIZE) -> int:
+        """
+        Stream object to a local file, holding at most `chunk_size` bytes in memory.
+        Returns the number of bytes written.
+        """
+        size = 0
+        async with self._get_client() as client:
+            try:
+                resp = await client.get_object(Bucket=self.bucket_name, Key=key)
+            except ClientError as e:
+                if e.response["Error"]["Code"] == "NoSuchKey":
+                    raise ObjectNotFoundException(detail=f"File {key} not found")
+                raise
+            async with resp["Body"] as stream:
+                with open(path, "wb") as f:
+                    while chunk := await stream.read(chunk_size):
+                        f.write(chunk)
+                        size += len(chunk)
+        return size
+
     async def get_files_list(self, folder_path: str) -> List[dict]:
         """
         Get list of objects under the given folder path using paginator
@@ -136,6 +251,20 @@ class S3Adapter(AbstractStorage):
 
         return objects
 
+    async def copy_file(self, src_key: str, dst_key: str):
+        """
+        Server-side copy, the data does not pass through this process
+        """
+        try:
+            async with self._get_client() as client:
+                await client.copy_object(
+                    Bucket=self.bucket_name,
+                    Key=dst_key,
+                    CopySource={"Bucket": self.bucket_name, "Key": src_key},
+                )
+        except (ClientError, BotoCoreError) as exc:
+            raise UploadFailureException from exc
+
     async def delete_file(self, key: str):
         async with self._get_client() as client:
             await client.delete_object(Bucket=self.bucket_name, Key=key)
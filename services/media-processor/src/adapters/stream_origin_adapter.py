@@ -0,0 +1,34 @@
+import logging
+
+import aiohttp
+
+
+log = logging.getLogger(__name__)
+
+
+class StreamOriginAdapter:
+    def __init__(self, base_url: str, admin_token: str, timeout: float = 10):
+        self.base_url = base_url.rstrip("/")
+        self.admin_token = admin_token
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+
+    async def warm_up(self, video_id: str, segments: int) -> dict | None:
+        """
+        Ask the origin to preload a freshly published title into its caches.
+        Warm-up is best effort, so failures are logged and not raised.
+        """
+        url = f"{self.base_url}/admin/videos/{video_id}/warmup"
+        try:
+            async with aiohttp.ClientSession(timeout=self.timeout) as session:
+                async with session.post(
+                    url,
+                    params={"segments": segments},
+                    headers={"X-Admin-Token": self.admin_token},
+                    raise_for_status=True,
+                ) as resp:
+                    data = (await resp.json())["data"]
+        except (aiohttp.ClientError, TimeoutError) as e:
+            log.warning(f"Stream origin: warm-up of video {video_id} failed: {e}")
+            return None
+        log.info(f"Stream origin: warm-up job {data['id']} started for video {video_id}")
+        return data
@@ -10,6 +10,33 @@ class Settings(BaseSettings):
     S3_ACCESS_KEY: str
     S3_SECRET_KEY: str
     S3_BUCKET_NAME: str
+    S3_MAX_POOL_CONNECTIONS: int = 50
+    S3_KEEPALIVE_TIMEOUT: float = 60
+
+    STREAM_ORIGIN_URL: str | None = None
+    STREAM_ORIGIN_ADMIN_TOKEN: str | None = None
+    WARMUP_SEGMENTS: int = 5
+
+    # decode the source once for all renditions instead of once per rendition
+    TRANSCODE_SINGLE_PASS: bool = True
+    # encoder threads of a whole job, defaults to the CPUs available to the worker
+    TRANSCODE_MAX_THREADS: int | None = None
+    # threads of each per-quality ffmpeg; unset splits TRANSCODE_MAX_THREADS between them
+    TRANSCODE_THREADS_PER_JOB: int | None = None
+    # "download": stream the source to a local file first; "url": ffmpeg reads it from
+    # a presigned URL, nothing is stored locally (every per-quality ffmpeg reads it again)
+    TRANSCODE_SOURCE: Literal["download", "url"] = "download"
+    TRANSCODE_SOURCE_URL_EXPIRES: int = 12 * 60 * 60
+    # sources at least this long (seconds) are cut into chunks encoded by several workers
+    TRANSCODE_CHUNKED_MIN_DURATION: float = 10 * 60
+    TRANSCODE_CHUNK_DURATION: float = 2 * 60
+
+    # concurrent uploads of one task's output, each retried with exponential backoff
+    UPLOAD_CONCURRENCY: int = 16
+    UPLOAD_RETRIES: int = 4
+    UPLOAD_RETRY_BACKOFF: float = 0.5
+    # larger files go up as multipart uploads of 8 MB parts
+    UPLOAD_MULTIPART_THRESHOLD: int = 16 * 1024 * 1024
 
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str
@@ -1,7 +1,17 @@
 from src.config import settings
 from src.adapters.redis_adapter import RedisAdapter
+from src.adapters.s3_adapter import S3Adapter
 
 redis_manager = RedisAdapter(
     host=settings.REDIS_HOST,
     port=settings.REDIS_PORT,
 )
+
+s3_storage = S3Adapter(
+    access_key=settings.S3_ACCESS_KEY,
+    secret_key=settings.S3_SECRET_KEY,
+    bucket_name=settings.S3_BUCKET_NAME,
+    endpoint_url=settings.S3_ENDPOINT_URL,
+    max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+    keepalive_timeout=settings.S3_KEEPALIVE_TIMEOUT,
+)
@@ -1,16 +1,12 @@
 from src.config import settings
 from src.adapters.s3_adapter import S3Adapter
+from src.container import s3_storage
 
 
 class StorageAdapterFactory:
     @staticmethod
     async def s3_adapter_factory() -> S3Adapter:
-        return S3Adapter(
-            access_key=settings.S3_ACCESS_KEY,
-            secret_key=settings.S3_SECRET_KEY,
-            bucket_name=settings.S3_BUCKET_NAME,
-            endpoint_url=settings.S3_ENDPOINT_URL,
-        )
+        return s3_storage
 
     @staticmethod
     def s3_adapter_sync_factory() -> S3Adapter:
@@ -19,4 +15,6 @@ class StorageAdapterFactory:
             secret_key=settings.S3_SECRET_KEY,
             bucket_name=settings.S3_BUCKET_NAME,
             endpoint_url=settings.S3_ENDPOINT_URL,
+            max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            keepalive_timeout=settings.S3_KEEPALIVE_TIMEOUT,
         )
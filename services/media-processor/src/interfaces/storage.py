@@ -6,12 +6,18 @@ class AbstractStorage(ABC):
     @abstractmethod
     async def get_file(self, key: str) -> bytes: ...
 
+    @abstractmethod
+    async def download_file(self, key: str, path: str) -> int: ...
+
     @abstractmethod
     async def get_files_list(self, folder_path: str) -> List[dict]: ...
 
     @abstractmethod
     async def upload_file(self, key: str, data: bytes): ...
 
+    @abstractmethod
+    async def upload_path(self, key: str, path: str) -> int: ...
+
     @abstractmethod
     async def upload_streaming_file(
         self,
@@ -19,6 +25,9 @@ class AbstractStorage(ABC):
         key: str,
     ): ...
 
+    @abstractmethod
+    async def copy_file(self, src_key: str, dst_key: str): ...
+
     @abstractmethod
     async def delete_file(self, key: str): ...
 
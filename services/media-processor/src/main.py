@@ -7,12 +7,14 @@ from fastapi import FastAPI
 import uvicorn
 
 from src.api import master_router
-from src.container import redis_manager
+from src.container import redis_manager, s3_storage
 
 
 async def lifespan(app: FastAPI):
     await redis_manager.connect()
+    await s3_storage.connect()
     yield
+    await s3_storage.close()
     await redis_manager.close()
 
 
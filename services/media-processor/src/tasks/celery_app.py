@@ -3,4 +3,10 @@ from celery import Celery
 from src.config import settings
 
 
-app = Celery("tasks", broker=settings.REDIS_URL, include=["src.tasks.tasks"])
+app = Celery(
+    "tasks",
+    broker=settings.REDIS_URL,
+    # chords collect the results of their header tasks here
+    backend=settings.REDIS_URL,
+    include=["src.tasks.tasks"],
+)
@@ -1,17 +1,28 @@
 import logging
 import os
 import tempfile
-from typing import List
+from typing import List, Tuple
 import asyncio
 from tempfile import TemporaryDirectory
 from pathlib import Path
+from uuid import uuid4
 
+from celery import chord
+
+from src.adapters.stream_origin_adapter import StreamOriginAdapter
+from src.config import settings
 from src.exceptions import UploadFailureException
 from src.factories.storage_adapter_factories import StorageAdapterFactory
 from src.enums import Qualities
 from src.tasks.celery_app import app
-from src.tasks.utils import update_master_playlist_from_s3
-from src.utils.transcoder import HlsTranscoder
+from src.tasks.utils import (
+    build_vod_playlist,
+    copy_files,
+    join_chunk_playlists,
+    update_master_playlist_from_s3,
+    upload_files,
+)
+from src.utils.transcoder import HlsTranscoder, split_at_keyframes
 
 
 log = logging.getLogger(__name__)
@@ -24,12 +35,17 @@ def process_video(
     storage_dst_key: str,
     qualities: List[Qualities],
 ):
-    video = asyncio.run(storage.get_file(storage_src_key))
-    log.info(f"Downloaded video {storage_src_key}")
+    input_file_path, is_local = open_source(storage_src_key)
 
-    with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-        temp_file.write(video)
-        input_file_path = temp_file.name
+    duration = HlsTranscoder.get_duration(input_file_path)
+    chunked_min_duration = settings.TRANSCODE_CHUNKED_MIN_DURATION
+    if settings.TRANSCODE_CHUNK_DURATION and duration >= chunked_min_duration:
+        try:
+            schedule_chunked_transcode(input_file_path, storage_src_key, storage_dst_key, qualities)
+        finally:
+            if is_local:
+                os.remove(input_file_path)
+        return
 
     with TemporaryDirectory() as tmp:
         temp_dir = Path(tmp)
@@ -38,28 +54,226 @@ def process_video(
             input_path=input_file_path,
             output_dir=temp_dir,
             qualities=qualities,
+            single_pass=settings.TRANSCODE_SINGLE_PASS,
+            max_threads=settings.TRANSCODE_MAX_THREADS,
+            threads_per_job=settings.TRANSCODE_THREADS_PER_JOB,
         ).transcode()
 
-        for quality_dir in temp_dir.iterdir():
-            if not quality_dir.is_dir():
-                continue
+        asyncio.run(publish_renditions(temp_dir, storage_dst_key, input_file_path))
 
-            # delete old files for exact resolution if any
-            asyncio.run(storage.delete_dir(f"{storage_dst_key}/{quality_dir.name}"))
-
-            for file in quality_dir.iterdir():
-                if file.is_file():
-                    key = f"{storage_dst_key}/{quality_dir.name}/{file.name}"
-                    upload_file_to_storage(input_file_path=str(file), s3_key=key)
-
-        asyncio.run(
-            update_master_playlist_from_s3(
-                s3_key=storage_dst_key,
-                input_path=input_file_path,
-            ),
+    if is_local:
+        os.remove(input_file_path)
+
+    warm_up_stream_origin(storage_dst_key)
+
+
+def open_source(storage_src_key: str) -> Tuple[str, bool]:
+    """
+    Return the path or URL ffmpeg reads the source from, and whether it is a local file
+    the caller has to remove. The source is never held in memory.
+    """
+    if settings.TRANSCODE_SOURCE == "url":
+        url = asyncio.run(
+            storage.generate_presigned_url(
+                storage_src_key, expires=settings.TRANSCODE_SOURCE_URL_EXPIRES
+            )
         )
+        return url, False
 
-    os.remove(input_file_path)
+    with tempfile.NamedTemporaryFile(delete=False) as temp_file:
+        input_file_path = temp_file.name
+    try:
+        size = asyncio.run(storage.download_file(storage_src_key, input_file_path))
+    except BaseException:
+        os.remove(input_file_path)
+        raise
+    log.info(f"Downloaded video {storage_src_key} ({size} bytes)")
+    return input_file_path, True
+
+
+async def publish_renditions(output_dir: Path, storage_dst_key: str, input_path: str):
+    """
+    Replace the renditions under `storage_dst_key` with the ones in `output_dir` and rebuild
+    the master playlist, in one event loop sharing one connection pool
+    """
+    segments, playlists = [], []
+    for quality_dir in output_dir.iterdir():
+        if not quality_dir.is_dir():
+            continue
+        for file in quality_dir.iterdir():
+            if file.is_file():
+                key = f"{storage_dst_key}/{quality_dir.name}/{file.name}"
+                (playlists if file.suffix == ".m3u8" else segments).append((file, key))
+
+    await storage.connect()
+    try:
+        for quality_dir in output_dir.iterdir():
+            if quality_dir.is_dir():
+                # delete old files for exact resolution if any
+                await storage.delete_dir(f"{storage_dst_key}/{quality_dir.name}")
+
+        # playlists last, so that they never list a segment that is not there yet
+        await upload_files(storage, segments)
+        await upload_files(storage, playlists)
+        await update_master_playlist_from_s3(storage, s3_key=storage_dst_key, input_path=input_path)
+    finally:
+        await storage.close()
+
+
+def upload_local_files(files: List[Tuple[Path, str]]):
+    """
+    Upload (path, key) pairs concurrently in one event loop sharing one connection pool
+    """
+
+    async def upload():
+        await storage.connect()
+        try:
+            await upload_files(storage, files)
+        finally:
+            await storage.close()
+
+    asyncio.run(upload())
+
+
+def schedule_chunked_transcode(
+    input_file_path: str,
+    storage_src_key: str,
+    storage_dst_key: str,
+    qualities: List[Qualities],
+):
+    """
+    Split the source at keyframes and fan the chunks out to the workers: every chunk is
+    encoded by its own task, and once all are done `stitch_chunks` joins the renditions
+    """
+    job_key = f"transcode-jobs/{uuid4()}"
+
+    with TemporaryDirectory() as tmp:
+        chunks = split_at_keyframes(input_file_path, Path(tmp), settings.TRANSCODE_CHUNK_DURATION)
+        upload_local_files(
+            [
+                (chunk_path, f"{job_key}/source/{index:04d}{chunk_path.suffix}")
+                for index, chunk_path in enumerate(chunks)
+            ]
+        )
+    log.info(f"Split {storage_src_key} into {len(chunks)} chunks under {job_key}")
+
+    stitch = stitch_chunks.si(
+        storage_src_key=storage_src_key,
+        storage_dst_key=storage_dst_key,
+        job_key=job_key,
+        chunks=len(chunks),
+        qualities=qualities,
+    )
+    stitch.on_error(delete_transcode_job.si(job_key=job_key))
+    chord(
+        encode_chunk.si(
+            job_key=job_key,
+            index=index,
+            source_name=f"{index:04d}{chunk_path.suffix}",
+            qualities=qualities,
+        )
+        for index, chunk_path in enumerate(chunks)
+    )(stitch)
+
+
+@app.task
+def encode_chunk(
+    job_key: str,
+    index: int,
+    source_name: str,
+    qualities: List[Qualities],
+):
+    with TemporaryDirectory() as tmp:
+        temp_dir = Path(tmp)
+        input_file_path = temp_dir / source_name
+        asyncio.run(storage.download_file(f"{job_key}/source/{source_name}", str(input_file_path)))
+        output_dir = temp_dir / "out"
+
+        # chunks keep the source timestamps, so the stitched renditions need no discontinuities
+        HlsTranscoder(
+            input_path=str(input_file_path),
+            output_dir=output_dir,
+            qualities=qualities,
+            single_pass=settings.TRANSCODE_SINGLE_PASS,
+            max_threads=settings.TRANSCODE_MAX_THREADS,
+            threads_per_job=settings.TRANSCODE_THREADS_PER_JOB,
+            chunk=True,
+        ).transcode()
+
+        upload_local_files(
+            [
+                (file, f"{job_key}/out/{index:04d}/{quality_dir.name}/{file.name}")
+                for quality_dir in output_dir.iterdir()
+                for file in quality_dir.iterdir()
+            ]
+        )
+
+    log.info(f"Encoded chunk {index} of {job_key}")
+
+
+@app.task
+def stitch_chunks(
+    storage_src_key: str,
+    storage_dst_key: str,
+    job_key: str,
+    chunks: int,
+    qualities: List[Qualities],
+):
+    """
+    Concatenate the chunk renditions into one playlist per quality.
+    Segments are renumbered across chunks and copied inside the storage.
+    """
+
+    async def stitch():
+        for quality in qualities:
+            # delete old files for exact resolution if any
+            await storage.delete_dir(f"{storage_dst_key}/{quality}")
+
+            playlists = []
+            for index in range(chunks):
+                prefix = f"{job_key}/out/{index:04d}/{quality}"
+                playlist = (await storage.get_file(f"{prefix}/index.m3u8")).decode()
+                playlists.append((prefix, playlist))
+            segments, copies = join_chunk_playlists(playlists, f"{storage_dst_key}/{quality}")
+            await copy_files(storage, copies)
+
+            await storage.upload_file(
+                f"{storage_dst_key}/{quality}/index.m3u8",
+                build_vod_playlist(segments).encode(),
+            )
+            log.info(f"Stitched {len(segments)} segments of {storage_dst_key}/{quality}")
+
+        # the source is only probed for its resolution, ffprobe reads it over HTTP
+        source_url = await storage.generate_presigned_url(storage_src_key)
+        await update_master_playlist_from_s3(storage, s3_key=storage_dst_key, input_path=source_url)
+        await storage.delete_dir(f"{job_key}/")
+
+    async def run():
+        await storage.connect()
+        try:
+            await stitch()
+        finally:
+            await storage.close()
+
+    asyncio.run(run())
+
+    warm_up_stream_origin(storage_dst_key)
+
+
+@app.task
+def delete_transcode_job(job_key: str):
+    asyncio.run(storage.delete_dir(f"{job_key}/"))
+    log.warning(f"Transcode job {job_key} failed, deleted its chunks")
+
+
+def warm_up_stream_origin(storage_dst_key: str):
+    if settings.STREAM_ORIGIN_URL and settings.STREAM_ORIGIN_ADMIN_TOKEN:
+        stream_origin = StreamOriginAdapter(
+            base_url=settings.STREAM_ORIGIN_URL,
+            admin_token=settings.STREAM_ORIGIN_ADMIN_TOKEN,
+        )
+        video_id = storage_dst_key.rsplit("/", 1)[-1]
+        asyncio.run(stream_origin.warm_up(video_id, settings.WARMUP_SEGMENTS))
 
 
 @app.task
@@ -67,11 +281,8 @@ def upload_file_to_storage(
     input_file_path: str,
     s3_key: str,
 ):
-    with open(input_file_path, "rb") as f:
-        data = f.read()
-
     try:
-        asyncio.run(storage.upload_file(s3_key, data))
+        asyncio.run(storage.upload_path(s3_key, input_file_path))
         log.info(f"Uploaded {s3_key}")
     except UploadFailureException as exc:
         log.error(f"Failed to upload {s3_key}")
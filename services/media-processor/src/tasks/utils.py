@@ -1,16 +1,35 @@
-from src.factories.storage_adapter_factories import StorageAdapterFactory
+import asyncio
+import logging
+import math
+import random
+from functools import partial
+from pathlib import Path
+from typing import Awaitable, Callable, List, Tuple, TypeVar
+
+from src.config import settings
+from src.exceptions import UploadFailureException
+from src.interfaces.storage import AbstractStorage
 from src.utils.transcoder import BITRATE_SETTINGS, HlsTranscoder
 
 
-async def update_master_playlist_from_s3(s3_key: str, input_path: str):
-    storage = StorageAdapterFactory.s3_adapter_sync_factory()
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
 
+async def update_master_playlist_from_s3(storage: AbstractStorage, s3_key: str, input_path: str):
     files = await storage.get_files_list(f"{s3_key}/")
 
     index_files = [f for f in files if f["Key"].endswith("index.m3u8")]
 
     lines = ["#EXTM3U", "#EXT-X-VERSION:3"]
 
+    if index_files:
+        # every rendition is scaled from the same source, so it is probed once
+        original_width, original_height = await asyncio.to_thread(
+            HlsTranscoder.get_video_resolution, input_path
+        )
+
     for obj in sorted(index_files, key=lambda o: o["Key"]):
         key = obj["Key"]
         quality = key.split("/")[-2]
@@ -19,7 +38,6 @@ async def update_master_playlist_from_s3(s3_key: str, input_path: str):
 
         target_height = int(quality.rstrip("p"))
 
-        original_width, original_height = HlsTranscoder.get_video_resolution(input_path)
         width, height = HlsTranscoder.calculate_scaled_resolution(
             original_width, original_height, target_height
         )
@@ -36,5 +54,116 @@ async def update_master_playlist_from_s3(s3_key: str, input_path: str):
     await storage.upload_file(f"{s3_key}/master.m3u8", master_text.encode("utf-8"))
 
 
+async def upload_files(storage: AbstractStorage, files: List[Tuple[Path, str]]) -> int:
+    """
+    Upload (path, key) pairs concurrently, see `run_storage_writes`.
+    Returns the number of bytes uploaded.
+    """
+    sizes = await run_storage_writes(
+        [
+            (
+                key,
+                partial(
+                    storage.upload_path,
+                    key,
+                    str(path),
+                    multipart_threshold=settings.UPLOAD_MULTIPART_THRESHOLD,
+                ),
+            )
+            for path, key in files
+        ]
+    )
+    log.info(f"Uploaded {len(files)} files ({sum(sizes)} bytes)")
+    return sum(sizes)
+
+
+async def copy_files(storage: AbstractStorage, keys: List[Tuple[str, str]]) -> None:
+    """
+    Copy (src_key, dst_key) pairs inside the storage concurrently, see `run_storage_writes`
+    """
+    await run_storage_writes(
+        [(dst_key, partial(storage.copy_file, src_key, dst_key)) for src_key, dst_key in keys]
+    )
+
+
+async def run_storage_writes(writes: List[Tuple[str, Callable[[], Awaitable[T]]]]) -> List[T]:
+    """
+    Run (key, write) pairs concurrently, at most UPLOAD_CONCURRENCY at a time.
+    A failed write is retried UPLOAD_RETRIES times with exponential backoff; if it still
+    fails, the remaining writes are cancelled and the error is raised.
+    """
+    semaphore = asyncio.Semaphore(settings.UPLOAD_CONCURRENCY)
+
+    async def run(key: str, write: Callable[[], Awaitable[T]]) -> T:
+        for attempt in range(settings.UPLOAD_RETRIES + 1):
+            try:
+                async with semaphore:
+                    return await write()
+            except UploadFailureException as exc:
+                if attempt == settings.UPLOAD_RETRIES:
+                    log.error(f"Failed to write {key}: {exc.__cause__}")
+                    raise
+                # jittered, so that writes throttled together do not retry together
+                delay = settings.UPLOAD_RETRY_BACKOFF * 2**attempt * random.uniform(0.5, 1)
+                log.warning(f"Failed to write {key}: {exc.__cause__}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    tasks = [asyncio.create_task(run(key, write)) for key, write in writes]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
 def bitrate_to_int(bitrate_str: str) -> int:
     return int(bitrate_str.rstrip("k")) * 1000
+
+
+def parse_media_playlist(playlist: str) -> List[Tuple[float, str]]:
+    """
+    Return (duration, uri) of every segment of a media playlist
+    """
+    segments = []
+    duration = None
+    for line in playlist.splitlines():
+        line = line.strip()
+        if line.startswith("#EXTINF:"):
+            duration = float(line.removeprefix("#EXTINF:").split(",")[0])
+        elif line and not line.startswith("#") and duration is not None:
+            segments.append((duration, line))
+            duration = None
+    return segments
+
+
+def join_chunk_playlists(
+    playlists: List[Tuple[str, str]], dst_prefix: str
+) -> Tuple[List[Tuple[float, str]], List[Tuple[str, str]]]:
+    """
+    Join the media playlists of consecutive chunks, given as (prefix, playlist) pairs.
+    Segments are renumbered across chunks under `dst_prefix`. Returns the (duration, uri)
+    of every segment of the joined playlist and the (src_key, dst_key) copies to make.
+    """
+    segments, copies = [], []
+    for prefix, playlist in playlists:
+        for duration, uri in parse_media_playlist(playlist):
+            name = f"segment_{len(segments):03d}.ts"
+            copies.append((f"{prefix}/{uri}", f"{dst_prefix}/{name}"))
+            segments.append((duration, name))
+    return segments, copies
+
+
+def build_vod_playlist(segments: List[Tuple[float, str]]) -> str:
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:3",
+        f"#EXT-X-TARGETDURATION:{math.ceil(max(duration for duration, _ in segments))}",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+        "#EXT-X-PLAYLIST-TYPE:VOD",
+    ]
+    for duration, uri in segments:
+        lines += [f"#EXTINF:{duration:.6f},", uri]
+    lines.append("#EXT-X-ENDLIST")
+    return "\n".join(lines) + "\n"
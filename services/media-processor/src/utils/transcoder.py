@@ -1,5 +1,7 @@
 import logging
+import os
 import subprocess
+import time
 from typing import List, Tuple
 from pathlib import Path
 from src.enums import Qualities
@@ -15,15 +17,187 @@ BITRATE_SETTINGS = {
     "1080p": {"bitrate": "5000k", "maxrate": "5350k", "bufsize": "7500k"},
 }
 
+VIDEO_CODEC_ARGS = [
+    "-c:v",
+    "libx264",
+    "-profile:v",
+    "main",
+    "-crf",
+    "20",
+    "-g",
+    "48",
+    "-keyint_min",
+    "48",
+    "-sc_threshold",
+    "0",
+]
+
+AUDIO_CODEC_ARGS = [
+    "-ar",
+    "48000",
+    "-c:a",
+    "aac",
+    "-b:a",
+    "128k",
+]
+
+HLS_ARGS = [
+    "-hls_time",
+    "4",
+    "-hls_playlist_type",
+    "vod",
+]
+
+
+def available_cpus() -> int:
+    try:
+        # honours CPU affinity (taskset, cgroup cpusets) unlike os.cpu_count()
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def run_parallel(commands: List[List[str]], max_parallel: int, poll_interval: float = 0.1):
+    """
+    Run the commands with at most `max_parallel` at a time. The first failure terminates
+    the running ones, skips the pending ones and raises CalledProcessError.
+    """
+    pending = list(commands)
+    running: List[Tuple[subprocess.Popen, List[str]]] = []
+    try:
+        while pending or running:
+            while pending and len(running) < max_parallel:
+                cmd = pending.pop(0)
+                running.append((subprocess.Popen(cmd), cmd))
+
+            time.sleep(poll_interval)
+            for proc, cmd in list(running):
+                returncode = proc.poll()
+                if returncode is None:
+                    continue
+                running.remove((proc, cmd))
+                if returncode != 0:
+                    log.error(f"{cmd[0]} exited with {returncode}, cancelling {len(running)} jobs")
+                    raise subprocess.CalledProcessError(returncode, cmd)
+    finally:
+        for proc, _ in running:
+            proc.terminate()
+        for proc, _ in running:
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+
+
+def reconnect_args(input_path: str) -> List[str]:
+    """
+    Input options for a source read over HTTP (presigned URL): an encode can outlast
+    the connection, ffmpeg then resumes the read with a range request
+    """
+    if not input_path.startswith(("http://", "https://")):
+        return []
+    return ["-reconnect", "1", "-reconnect_on_network_error", "1", "-reconnect_delay_max", "10"]
+
+
+def split_at_keyframes(input_path: str, output_dir: Path, chunk_duration: float) -> List[Path]:
+    """
+    Cut the source into chunks of about `chunk_duration` seconds without re-encoding the
+    video. With stream copy the segment muxer can only cut on keyframes, so every chunk
+    starts with a complete GOP. Chunks keep the source timestamps. Returns the chunks in order.
+
+    Audio is encoded here, once for the whole source, and the chunk encodes copy it:
+    AAC encoded per chunk would start every chunk with encoder priming and end it with
+    a partial frame, leaving a gap or an overlap at each boundary.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    cmd = [
+        "ffmpeg",
+        *reconnect_args(input_path),
+        "-i",
+        input_path,
+        "-map",
+        "0:v:0",
+        "-map",
+        "0:a:0?",
+        "-c:v",
+        "copy",
+        *AUDIO_CODEC_ARGS,
+        "-f",
+        "segment",
+        "-segment_time",
+        str(chunk_duration),
+        # NUT keeps each stream's time base, Matroska would round audio timestamps to 1 ms
+        f"{output_dir}/chunk_%04d.nut",
+    ]
+    subprocess.run(cmd, check=True)
+    return sorted(output_dir.glob("chunk_*.nut"))
+
 
 class HlsTranscoder:
-    def __init__(self, input_path: str, output_dir: Path, qualities: List[Qualities]):
+    """
+    Encodes the source into one HLS rendition per quality, written to
+    `output_dir/{quality}/index.m3u8` and `segment_%03d.ts`.
+
+    In single-pass mode one ffmpeg process decodes the source once, splits the decoded
+    video and encodes every rendition from it. Otherwise each quality is a separate ffmpeg
+    process that decodes the whole source again; those run concurrently.
+
+    Either way decoder, filter and encoder threads are capped so that all renditions together
+    use at most `max_threads` (default: the CPUs available to the worker). `threads_per_job` fixes
+    the threads of each per-quality ffmpeg instead, which then limits how many run at once.
+
+    With `chunk` the input is a piece of a longer source from `split_at_keyframes`.
+    Its timestamps are kept as they are, video frames are neither duplicated nor dropped
+    and the already encoded audio is copied.
+    Chunks encoded separately then play back as one continuous stream once their
+    segments are concatenated.
+    """
+
+    def __init__(
+        self,
+        input_path: str,
+        output_dir: Path,
+        qualities: List[Qualities],
+        single_pass: bool = True,
+        max_threads: int | None = None,
+        threads_per_job: int | None = None,
+        chunk: bool = False,
+    ):
         self.input_path = input_path
         self.output_dir = output_dir
         self.qualities = qualities
+        self.single_pass = single_pass
+        self.max_threads = max_threads or available_cpus()
+        self.threads_per_job = threads_per_job
+        self.chunk = chunk
+
+    def plan_parallelism(self) -> Tuple[int, int]:
+        """
+        Return (ffmpeg processes run at once, threads per process) for per-quality encodes
+        """
+        jobs = max(1, len(self.qualities))
+        if self.threads_per_job:
+            threads = min(self.threads_per_job, self.max_threads)
+            return max(1, min(jobs, self.max_threads // threads)), threads
+        parallel = min(jobs, self.max_threads)
+        return parallel, max(1, self.max_threads // parallel)
 
     def transcode(self):
+        if self.single_pass and len(self.qualities) > 1:
+            self.transcode_single_pass()
+        else:
+            self.transcode_per_quality()
+
+    def transcode_per_quality(self):
         original_width, original_height = self.get_video_resolution(self.input_path)
+        parallel, threads = self.plan_parallelism()
+        log.info(
+            f"Encoding {len(self.qualities)} renditions, {parallel} at a time, "
+            f"{threads} threads each"
+        )
+
+        commands = []
 
         for quality in self.qualities:
             target_height = int(quality.rstrip("p"))
@@ -42,44 +216,106 @@ class HlsTranscoder:
 
             cmd = [
                 "ffmpeg",
-                "-i",
-                self.input_path,
+                *self.input_args(threads),
+                "-filter_threads",
+                str(threads),
                 "-vf",
                 f"scale={width}:{height}",
-                "-ar",
-                "48000",
-                "-c:v",
-                "libx264",
-                "-profile:v",
-                "main",
-                "-crf",
-                "20",
-                "-g",
-                "48",
-                "-keyint_min",
-                "48",
-                "-sc_threshold",
-                "0",
+                *VIDEO_CODEC_ARGS,
                 "-b:v",
                 settings["bitrate"],
                 "-maxrate",
                 settings["maxrate"],
                 "-bufsize",
                 settings["bufsize"],
-                "-c:a",
-                "aac",
-                "-b:a",
-                "128k",
-                "-hls_time",
-                "4",
-                "-hls_playlist_type",
-                "vod",
+                "-threads",
+                str(threads),
+                *self.audio_args(),
+                *self.chunk_timing_args(),
+                *HLS_ARGS,
                 "-hls_segment_filename",
                 output_segment,
                 output_playlist,
             ]
+            commands.append(cmd)
+
+        run_parallel(commands, max_parallel=parallel)
+
+    def transcode_single_pass(self):
+        subprocess.run(self.build_single_pass_command(), check=True)
+
+    def build_single_pass_command(self) -> List[str]:
+        original_width, original_height = self.get_video_resolution(self.input_path)
+        has_audio = self.has_audio(self.input_path)
+
+        # decode once, then one scaled copy of the frames per rendition
+        outputs = "".join(f"[v{index}]" for index in range(len(self.qualities)))
+        filters = [f"[0:v]split={len(self.qualities)}{outputs}"]
+        maps = []
+        rate_control = []
+        stream_map = []
+        for index, quality in enumerate(self.qualities):
+            width, height = self.calculate_scaled_resolution(
+                original_width, original_height, int(quality.rstrip("p"))
+            )
+            filters.append(f"[v{index}]scale={width}:{height}[v{index}out]")
+            maps += ["-map", f"[v{index}out]"]
+            if has_audio:
+                # the HLS muxer needs one audio stream per variant, they encode in no time
+                maps += ["-map", "0:a:0"]
+
+            settings = BITRATE_SETTINGS[quality]
+            rate_control += [
+                f"-b:v:{index}",
+                settings["bitrate"],
+                f"-maxrate:v:{index}",
+                settings["maxrate"],
+                f"-bufsize:v:{index}",
+                settings["bufsize"],
+            ]
+            audio = f"a:{index}," if has_audio else ""
+            stream_map.append(f"v:{index},{audio}name:{quality}")
+            (self.output_dir / quality).mkdir(parents=True, exist_ok=True)
+
+        return [
+            "ffmpeg",
+            # one decoder and one filter graph feed every rendition
+            *self.input_args(self.max_threads),
+            "-filter_complex_threads",
+            str(self.max_threads),
+            "-filter_complex",
+            ";".join(filters),
+            *maps,
+            *VIDEO_CODEC_ARGS,
+            *rate_control,
+            # per encoder, and all of them run at once
+            "-threads",
+            str(max(1, self.max_threads // len(self.qualities))),
+            *(self.audio_args() if has_audio else []),
+            *self.chunk_timing_args(),
+            "-f",
+            "hls",
+            *HLS_ARGS,
+            "-hls_segment_filename",
+            f"{self.output_dir}/%v/segment_%03d.ts",
+            "-var_stream_map",
+            " ".join(stream_map),
+            f"{self.output_dir}/%v/index.m3u8",
+        ]
+
+    def input_args(self, threads: int) -> List[str]:
+        args = reconnect_args(self.input_path)
+        if self.chunk:
+            args.append("-copyts")
+        # -threads before -i sizes the decoder, after it only the encoder
+        return [*args, "-threads", str(threads), "-i", self.input_path]
 
-            subprocess.run(cmd, check=True)
+    def audio_args(self) -> List[str]:
+        # chunk audio is already encoded by split_at_keyframes
+        return ["-c:a", "copy"] if self.chunk else AUDIO_CODEC_ARGS
+
+    def chunk_timing_args(self) -> List[str]:
+        return ["-fps_mode", "passthrough"] if self.chunk else []
 
     @staticmethod
     def get_video_resolution(input_path: str) -> Tuple[int, int]:
@@ -99,6 +335,38 @@ class HlsTranscoder:
         width, height = map(int, result.stdout.strip().split("x"))
         return width, height
 
+    @staticmethod
+    def get_duration(input_path: str) -> float:
+        cmd = [
+            "ffprobe",
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "csv=p=0",
+            input_path,
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        return float(result.stdout.strip())
+
+    @staticmethod
+    def has_audio(input_path: str) -> bool:
+        cmd = [
+            "ffprobe",
+            "-v",
+            "error",
+            "-select_streams",
+            "a:0",
+            "-show_entries",
+            "stream=index",
+            "-of",
+            "csv=p=0",
+            input_path,
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        return bool(result.stdout.strip())
+
     @staticmethod
     def calculate_scaled_resolution(
         original_width: int, original_height: int, target_height: int
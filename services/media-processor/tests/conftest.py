@@ -0,0 +1,29 @@
+import os
+
+# settings are read when src.config is first imported
+for name, value in {
+    "MODE": "TEST",
+    "S3_ENDPOINT_URL": "http://localhost:9000",
+    "S3_ACCESS_KEY": "test",
+    "S3_SECRET_KEY": "test",
+    "S3_BUCKET_NAME": "test",
+    "JWT_SECRET_KEY": "test",
+    "JWT_ALGORITHM": "HS256",
+    "RABBITMQ_USER": "test",
+    "RABBITMQ_PASSWORD": "test",
+    "RABBITMQ_HOST": "localhost",
+    "RABBITMQ_PORT": "5672",
+    "LOG_LEVEL": "INFO",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_USER": "test",
+    "DB_PASS": "test",
+    "DB_NAME": "test",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "REDIS_PASS": "test",
+    "INPUT_VIDEO_MIMO": '["video/mp4"]',
+    "IMAGE_MIMO": '["image/jpeg"]',
+    "MAX_FILE_SIZE": "1073741824",
+}.items():
+    os.environ.setdefault(name, value)
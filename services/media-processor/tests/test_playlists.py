@@ -0,0 +1,122 @@
+import pytest
+
+from src.tasks.utils import (
+    build_vod_playlist,
+    join_chunk_playlists,
+    parse_media_playlist,
+    update_master_playlist_from_s3,
+)
+from src.utils.transcoder import HlsTranscoder
+from tests.utils import MemoryStorage
+
+
+def chunk_playlist(durations: list[float]) -> str:
+    # as ffmpeg's HLS muxer writes it
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3", "#EXT-X-TARGETDURATION:4", "#EXT-X-MEDIA-SEQUENCE:0"]
+    lines.append("#EXT-X-PLAYLIST-TYPE:VOD")
+    for index, duration in enumerate(durations):
+        lines += [f"#EXTINF:{duration},", f"segment_{index:03d}.ts"]
+    lines.append("#EXT-X-ENDLIST")
+    return "\n".join(lines) + "\n"
+
+
+def test_parse_media_playlist():
+    playlist = chunk_playlist([4.004, 3.5]).replace("#EXTINF:3.5,", "#EXTINF:3.5,title\n\n")
+
+    assert parse_media_playlist(playlist) == [(4.004, "segment_000.ts"), (3.5, "segment_001.ts")]
+
+
+def test_parse_media_playlist_ignores_tags_and_uris_without_duration():
+    playlist = "#EXTM3U\n#EXT-X-MAP:URI=init.mp4\norphan.ts\n#EXTINF:2.0,\n a.ts \n"
+
+    assert parse_media_playlist(playlist) == [(2.0, "a.ts")]
+
+
+def test_join_chunk_playlists_renumbers_segments():
+    segments, copies = join_chunk_playlists(
+        [
+            ("job/out/0000/720p", chunk_playlist([4.0, 4.0])),
+            ("job/out/0001/720p", chunk_playlist([4.0, 1.5])),
+        ],
+        "videos/v/720p",
+    )
+
+    assert segments == [
+        (4.0, "segment_000.ts"),
+        (4.0, "segment_001.ts"),
+        (4.0, "segment_002.ts"),
+        (1.5, "segment_003.ts"),
+    ]
+    assert copies == [
+        ("job/out/0000/720p/segment_000.ts", "videos/v/720p/segment_000.ts"),
+        ("job/out/0000/720p/segment_001.ts", "videos/v/720p/segment_001.ts"),
+        ("job/out/0001/720p/segment_000.ts", "videos/v/720p/segment_002.ts"),
+        ("job/out/0001/720p/segment_001.ts", "videos/v/720p/segment_003.ts"),
+    ]
+
+
+def test_stitched_playlist_plays_as_one_stream():
+    segments, _ = join_chunk_playlists(
+        [("a", chunk_playlist([4.0, 2.25])), ("b", chunk_playlist([4.0]))], "dst"
+    )
+
+    playlist = build_vod_playlist(segments)
+
+    # chunks keep the source timestamps, so there is nothing to reset between them
+    assert "#EXT-X-DISCONTINUITY" not in playlist
+    assert playlist.startswith("#EXTM3U\n")
+    assert playlist.endswith("#EXT-X-ENDLIST\n")
+    assert "#EXT-X-PLAYLIST-TYPE:VOD" in playlist
+    assert parse_media_playlist(playlist) == segments
+
+
+@pytest.mark.parametrize(
+    "durations, target_duration",
+    [([4.0, 4.0], 4), ([4.004, 3.9], 5), ([2.5], 3), ([0.4, 1.0], 1)],
+)
+def test_target_duration_is_the_longest_segment_rounded_up(durations, target_duration):
+    playlist = build_vod_playlist([(d, f"{i}.ts") for i, d in enumerate(durations)])
+
+    assert f"#EXT-X-TARGETDURATION:{target_duration}\n" in playlist
+
+
+async def test_master_playlist_lists_every_rendition(monkeypatch):
+    probes = []
+
+    def get_video_resolution(input_path):
+        probes.append(input_path)
+        return 1920, 1080
+
+    monkeypatch.setattr(HlsTranscoder, "get_video_resolution", staticmethod(get_video_resolution))
+    storage = MemoryStorage(
+        {
+            "videos/v/720p/index.m3u8": b"",
+            "videos/v/720p/segment_000.ts": b"",
+            "videos/v/360p/index.m3u8": b"",
+            "videos/v/1080p/index.m3u8": b"",
+        }
+    )
+
+    await update_master_playlist_from_s3(storage, s3_key="videos/v", input_path="source.mp4")
+
+    # the source is probed once for every rendition
+    assert probes == ["source.mp4"]
+    lines = storage.objects["videos/v/master.m3u8"].decode().splitlines()
+    assert lines[:2] == ["#EXTM3U", "#EXT-X-VERSION:3"]
+    assert lines[3::2] == ["1080p/index.m3u8", "360p/index.m3u8", "720p/index.m3u8"]
+    assert "BANDWIDTH=5000000," in lines[2]
+    assert "RESOLUTION=1920x1080," in lines[2]
+    assert "RESOLUTION=640x360," in lines[4]
+    assert "RESOLUTION=1280x720," in lines[6]
+
+
+async def test_master_playlist_without_renditions_skips_the_probe(monkeypatch):
+    def get_video_resolution(input_path):
+        raise AssertionError("probed")
+
+    monkeypatch.setattr(HlsTranscoder, "get_video_resolution", staticmethod(get_video_resolution))
+    storage = MemoryStorage()
+
+    await update_master_playlist_from_s3(storage, s3_key="videos/v", input_path="source.mp4")
+
+    assert storage.objects["videos/v/master.m3u8"] == b"#EXTM3U\n#EXT-X-VERSION:3"
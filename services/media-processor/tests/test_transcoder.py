@@ -0,0 +1,113 @@
+import subprocess
+import sys
+import time
+
+import pytest
+
+from src.enums import Qualities
+from src.utils.transcoder import HlsTranscoder, run_parallel
+
+
+ALL_QUALITIES = [Qualities.CD, Qualities.SD, Qualities.HD, Qualities.FHD]
+
+
+def transcoder(qualities, max_threads, threads_per_job=None) -> HlsTranscoder:
+    return HlsTranscoder(
+        input_path="input.mp4",
+        output_dir=None,
+        qualities=qualities,
+        max_threads=max_threads,
+        threads_per_job=threads_per_job,
+    )
+
+
+@pytest.mark.parametrize(
+    "qualities, max_threads, threads_per_job, expected",
+    [
+        # every rendition at once, the threads split between them
+        (ALL_QUALITIES, 16, None, (4, 4)),
+        (ALL_QUALITIES, 10, None, (4, 2)),
+        # fewer CPUs than renditions
+        (ALL_QUALITIES, 2, None, (2, 1)),
+        ([Qualities.HD], 8, None, (1, 8)),
+        # fixed threads per process limit how many run at once
+        (ALL_QUALITIES, 16, 8, (2, 8)),
+        (ALL_QUALITIES, 16, 3, (4, 3)),
+        # but never more threads than available
+        (ALL_QUALITIES, 4, 8, (1, 4)),
+        ([], 4, None, (1, 4)),
+    ],
+)
+def test_plan_parallelism(qualities, max_threads, threads_per_job, expected):
+    assert transcoder(qualities, max_threads, threads_per_job).plan_parallelism() == expected
+
+
+def python(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+def test_run_parallel_runs_every_command(tmp_path):
+    commands = [python(f"open(r'{tmp_path / str(index)}', 'w').close()") for index in range(5)]
+
+    run_parallel(commands, max_parallel=2, poll_interval=0.01)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["0", "1", "2", "3", "4"]
+
+
+def test_run_parallel_limits_concurrency(tmp_path):
+    # every command records its start and end time
+    code = (
+        "import sys, time; start = time.time(); time.sleep(0.2); "
+        f"open(r'{tmp_path}/' + sys.argv[1], 'w').write(f'{{start}} {{time.time()}}')"
+    )
+    commands = [[*python(code), str(index)] for index in range(4)]
+
+    run_parallel(commands, max_parallel=2, poll_interval=0.01)
+
+    spans = [tuple(map(float, path.read_text().split())) for path in tmp_path.iterdir()]
+    for start, _ in spans:
+        running = sum(1 for other_start, other_end in spans if other_start <= start < other_end)
+        assert running <= 2
+
+
+def test_failure_stops_the_other_commands(tmp_path):
+    marker = tmp_path / "finished"
+    slow = python(f"import time; time.sleep(30); open(r'{marker}', 'w').close()")
+    skipped = python(f"open(r'{tmp_path / 'skipped'}', 'w').close()")
+
+    started = time.monotonic()
+    with pytest.raises(subprocess.CalledProcessError) as exc_info:
+        run_parallel(
+            [slow, python("raise SystemExit(3)"), skipped], max_parallel=2, poll_interval=0.01
+        )
+
+    assert exc_info.value.returncode == 3
+    # the slow command was terminated instead of waited for, the pending one never started
+    assert time.monotonic() - started < 10
+    assert not marker.exists()
+    assert not (tmp_path / "skipped").exists()
+
+
+def test_transcode_per_quality_propagates_a_failed_encode(monkeypatch, tmp_path):
+    commands = []
+
+    def fake_run_parallel(cmds, max_parallel):
+        commands.extend(cmds)
+        raise subprocess.CalledProcessError(1, cmds[0])
+
+    monkeypatch.setattr("src.utils.transcoder.run_parallel", fake_run_parallel)
+    monkeypatch.setattr(HlsTranscoder, "get_video_resolution", staticmethod(lambda _: (1920, 1080)))
+    encoder = HlsTranscoder(
+        input_path="input.mp4",
+        output_dir=tmp_path,
+        qualities=[Qualities.SD, Qualities.HD],
+        single_pass=False,
+        max_threads=4,
+    )
+
+    with pytest.raises(subprocess.CalledProcessError):
+        encoder.transcode()
+    assert [cmd[-1] for cmd in commands] == [
+        f"{tmp_path}/480p/index.m3u8",
+        f"{tmp_path}/720p/index.m3u8",
+    ]
@@ -0,0 +1,202 @@
+import asyncio
+
+import pytest
+from botocore.exceptions import ClientError
+
+from src.adapters.s3_adapter import S3Adapter
+from src.config import settings
+from src.exceptions import UploadFailureException
+from src.tasks import utils
+from src.tasks.utils import run_storage_writes, upload_files
+from tests.utils import MemoryStorage
+
+
+@pytest.fixture
+def delays(monkeypatch) -> list[float]:
+    """
+    Backoff delays slept by run_storage_writes, without waiting for them
+    """
+    delays = []
+    sleep = asyncio.sleep
+
+    async def fake_sleep(delay, *args, **kwargs):
+        delays.append(delay)
+        await sleep(0)
+
+    monkeypatch.setattr(utils.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(utils.random, "uniform", lambda low, high: high)
+    monkeypatch.setattr(settings, "UPLOAD_RETRIES", 3)
+    monkeypatch.setattr(settings, "UPLOAD_RETRY_BACKOFF", 0.5)
+    return delays
+
+
+def flaky_write(failures: int, result="done"):
+    """
+    Write that fails `failures` times before it succeeds, counting its calls
+    """
+    calls = []
+
+    async def write():
+        calls.append(None)
+        if len(calls) <= failures:
+            raise UploadFailureException from ConnectionError("reset")
+        return result
+
+    return write, calls
+
+
+async def test_writes_return_their_results_in_order(delays):
+    writes = [(str(index), flaky_write(0, index)[0]) for index in range(5)]
+
+    assert await run_storage_writes(writes) == [0, 1, 2, 3, 4]
+    assert delays == []
+
+
+async def test_failed_write_is_retried_with_exponential_backoff(delays):
+    write, calls = flaky_write(failures=3)
+
+    assert await run_storage_writes([("key", write)]) == ["done"]
+    assert len(calls) == 4
+    assert delays == [0.5, 1.0, 2.0]
+
+
+async def test_backoff_is_jittered(delays, monkeypatch):
+    bounds = []
+    monkeypatch.setattr(
+        utils.random, "uniform", lambda low, high: bounds.append((low, high)) or low
+    )
+    write, _ = flaky_write(failures=1)
+
+    await run_storage_writes([("key", write)])
+
+    assert bounds == [(0.5, 1)]
+    assert delays == [0.25]
+
+
+async def test_write_failing_every_retry_cancels_the_others(delays):
+    write, calls = flaky_write(failures=10)
+    started, cancelled = asyncio.Event(), asyncio.Event()
+
+    async def slow_write():
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(UploadFailureException):
+        await run_storage_writes([("slow", slow_write), ("key", write)])
+
+    assert len(calls) == settings.UPLOAD_RETRIES + 1
+    assert started.is_set() and cancelled.is_set()
+
+
+async def test_other_errors_are_not_retried(delays):
+    calls = []
+
+    async def write():
+        calls.append(None)
+        raise ValueError("bug")
+
+    with pytest.raises(ValueError):
+        await run_storage_writes([("key", write)])
+    assert calls == [None]
+    assert delays == []
+
+
+async def test_concurrency_is_limited(monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_CONCURRENCY", 2)
+    running, peak = 0, 0
+
+    async def write():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await run_storage_writes([(str(index), write) for index in range(6)])
+
+    assert peak == 2
+
+
+async def test_upload_files(tmp_path, delays):
+    files = []
+    for name in ("segment_000.ts", "index.m3u8"):
+        path = tmp_path / name
+        path.write_bytes(name.encode())
+        files.append((path, f"videos/v/720p/{name}"))
+    storage = MemoryStorage()
+
+    assert await upload_files(storage, files) == len(b"segment_000.ts") + len(b"index.m3u8")
+    assert storage.objects["videos/v/720p/index.m3u8"] == b"index.m3u8"
+
+
+class FakeS3Client:
+    def __init__(self, fail_part: int | None = None):
+        self.fail_part = fail_part
+        self.objects: dict[str, bytes] = {}
+        self.parts: list[bytes] = []
+        self.aborted = False
+
+    async def put_object(self, Bucket, Key, Body, ContentLength):
+        self.objects[Key] = Body.read()
+        assert len(self.objects[Key]) == ContentLength
+
+    async def create_multipart_upload(self, Bucket, Key):
+        return {"UploadId": "upload"}
+
+    async def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        if PartNumber == self.fail_part:
+            raise ClientError({"Error": {"Code": "SlowDown"}}, "UploadPart")
+        self.parts.append(Body)
+        return {"ETag": f'"{PartNumber}"'}
+
+    async def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        assert [part["PartNumber"] for part in MultipartUpload["Parts"]] == [
+            index + 1 for index in range(len(self.parts))
+        ]
+        self.objects[Key] = b"".join(self.parts)
+
+    async def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted = True
+
+
+def make_adapter(client: FakeS3Client) -> S3Adapter:
+    adapter = S3Adapter(
+        access_key="test", secret_key="test", endpoint_url="http://s3", bucket_name="bucket"
+    )
+    adapter._client = client
+    return adapter
+
+
+@pytest.mark.parametrize("size", [0, 99, 100, 250, 300])
+async def test_upload_path(tmp_path, size):
+    path = tmp_path / "file"
+    data = bytes(range(256)) * 2
+    path.write_bytes(data[:size])
+    client = FakeS3Client()
+
+    uploaded = await make_adapter(client).upload_path(
+        "key", str(path), multipart_threshold=100, part_size=100
+    )
+
+    assert uploaded == size
+    assert client.objects["key"] == data[:size]
+    # small files go up in one PUT, the others in parts
+    assert len(client.parts) == (0 if size < 100 else -(-size // 100))
+
+
+async def test_failed_part_aborts_the_multipart_upload(tmp_path):
+    path = tmp_path / "file"
+    path.write_bytes(b"x" * 250)
+    client = FakeS3Client(fail_part=2)
+
+    with pytest.raises(UploadFailureException):
+        await make_adapter(client).upload_path(
+            "key", str(path), multipart_threshold=100, part_size=100
+        )
+
+    assert client.aborted
+    assert "key" not in client.objects
@@ -0,0 +1,46 @@
+from typing import AsyncGenerator, List
+
+from src.interfaces.storage import AbstractStorage
+
+
+class MemoryStorage(AbstractStorage):
+    """
+    In-memory storage for the task helpers
+    """
+
+    def __init__(self, objects: dict[str, bytes] | None = None):
+        self.objects = objects if objects is not None else {}
+
+    async def get_file(self, key: str) -> bytes:
+        return self.objects[key]
+
+    async def download_file(self, key: str, path: str) -> int:
+        with open(path, "wb") as f:
+            return f.write(self.objects[key])
+
+    async def get_files_list(self, folder_path: str) -> List[dict]:
+        return [{"Key": key} for key in self.objects if key.startswith(folder_path)]
+
+    async def upload_file(self, key: str, data: bytes):
+        self.objects[key] = data
+
+    async def upload_path(self, key: str, path: str, **kwargs) -> int:
+        with open(path, "rb") as f:
+            self.objects[key] = f.read()
+        return len(self.objects[key])
+
+    async def upload_streaming_file(self, stream: AsyncGenerator[bytes, None], key: str):
+        self.objects[key] = b"".join([chunk async for chunk in stream])
+
+    async def copy_file(self, src_key: str, dst_key: str):
+        self.objects[dst_key] = self.objects[src_key]
+
+    async def delete_file(self, key: str):
+        self.objects.pop(key, None)
+
+    async def delete_dir(self, key: str) -> None:
+        for stored_key in [k for k in self.objects if k.startswith(key)]:
+            del self.objects[stored_key]
+
+    async def generate_presigned_url(self, key: str, expires: int = 3600) -> str | None:
+        return f"http://storage/{key}"
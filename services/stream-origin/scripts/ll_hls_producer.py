@@ -0,0 +1,134 @@
+"""
+Synthetic LL-HLS producer for trying the live routes without an encoder.
+
+Writes placeholder partial segments, segments and a sliding-window LL-HLS media playlist
+to the S3 bucket from the service settings (any S3-compatible store, e.g. MinIO),
+at the pace a live packager would:
+
+    uv run scripts/ll_hls_producer.py --stream-id 8c6f0d0e-5d7b-4b44-9a53-6a0c6c1e5a10
+
+The payloads are not decodable video, only the playlist timing and naming are realistic.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+from uuid import UUID
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.adapters.s3_adapter import S3Adapter
+from src.config import settings
+
+
+def build_playlist(
+    first_msn: int,
+    next_msn: int,
+    parts: int,
+    segment_duration: float,
+    part_duration: float,
+    parts_per_segment: int,
+) -> str:
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:9",
+        f"#EXT-X-TARGETDURATION:{round(segment_duration)}",
+        f"#EXT-X-PART-INF:PART-TARGET={part_duration:.3f}",
+        f"#EXT-X-SERVER-CONTROL:CAN-BLOCK-RELOAD=YES,PART-HOLD-BACK={3 * part_duration:.3f}",
+        f"#EXT-X-MEDIA-SEQUENCE:{first_msn}",
+    ]
+    for msn in range(first_msn, next_msn):
+        # parts are only listed for the last segments, older ones are played whole
+        if msn >= next_msn - 2:
+            lines += [part_line(msn, part, part_duration) for part in range(parts_per_segment)]
+        lines += [f"#EXTINF:{segment_duration:.3f},", f"segment_{msn:05d}.ts"]
+    lines += [part_line(next_msn, part, part_duration) for part in range(parts)]
+    next_part = (next_msn, parts) if parts < parts_per_segment else (next_msn + 1, 0)
+    lines.append(f'#EXT-X-PRELOAD-HINT:TYPE=PART,URI="{part_name(*next_part)}"')
+    return "\n".join(lines) + "\n"
+
+
+def part_name(msn: int, part: int) -> str:
+    return f"segment_{msn:05d}.part{part}.ts"
+
+
+def part_line(msn: int, part: int, duration: float) -> str:
+    independent = ",INDEPENDENT=YES" if part == 0 else ""
+    return f'#EXT-X-PART:DURATION={duration:.3f},URI="{part_name(msn, part)}"{independent}'
+
+
+async def produce(args: argparse.Namespace) -> None:
+    storage = S3Adapter(
+        access_key=settings.S3_ACCESS_KEY,
+        secret_key=settings.S3_SECRET_KEY,
+        endpoint_url=settings.S3_ENDPOINT_URL,
+        bucket_name=settings.S3_BUCKET_NAME,
+    )
+    await storage.connect()
+    base_key = f"live/{args.stream_id}"
+    playlist_key = f"{base_key}/{args.quality}/index.m3u8"
+    part_duration = args.segment_duration / args.parts_per_segment
+    await storage.upload_file(
+        f"{base_key}/master.m3u8",
+        (
+            "#EXTM3U\n"
+            '#EXT-X-STREAM-INF:BANDWIDTH=2800000,RESOLUTION=1280x720,CODECS="avc1.64001f"\n'
+            f"{args.quality}/index.m3u8\n"
+        ).encode(),
+    )
+
+    msn = 0
+    try:
+        while args.segments is None or msn < args.segments:
+            parts = []
+            for part in range(args.parts_per_segment):
+                await asyncio.sleep(part_duration)
+                data = os.urandom(args.part_size)
+                parts.append(data)
+                # media first, then the playlist announcing it
+                await storage.upload_file(f"{base_key}/{args.quality}/{part_name(msn, part)}", data)
+                if part < args.parts_per_segment - 1:
+                    playlist = build_playlist(
+                        max(0, msn - args.window + 1),
+                        msn,
+                        part + 1,
+                        args.segment_duration,
+                        part_duration,
+                        args.parts_per_segment,
+                    )
+                    await storage.upload_file(playlist_key, playlist.encode())
+            await storage.upload_file(
+                f"{base_key}/{args.quality}/segment_{msn:05d}.ts", b"".join(parts)
+            )
+            msn += 1
+            playlist = build_playlist(
+                max(0, msn - args.window),
+                msn,
+                0,
+                args.segment_duration,
+                part_duration,
+                args.parts_per_segment,
+            )
+            await storage.upload_file(playlist_key, playlist.encode())
+            print(f"segment {msn - 1} published")
+        await storage.upload_file(playlist_key, (playlist + "#EXT-X-ENDLIST\n").encode())
+    finally:
+        await storage.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stream-id", type=UUID, required=True)
+    parser.add_argument("--quality", default="720p")
+    parser.add_argument("--segment-duration", type=float, default=2)
+    parser.add_argument("--parts-per-segment", type=int, default=4)
+    parser.add_argument("--part-size", type=int, default=64 * 1024)
+    parser.add_argument("--window", type=int, default=6, help="segments kept in the playlist")
+    parser.add_argument("--segments", type=int, default=None, help="stop (ENDLIST) after N")
+    asyncio.run(produce(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,495 @@
+import asyncio
+import inspect
+from collections import OrderedDict
+from contextlib import aclosing
+from functools import partial
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, BinaryIO, Callable, List
+
+from src.interfaces.storage import AbstractStorage
+from src.metrics import CACHE_REQUESTS, SINGLE_FLIGHT, classify
+from src.schemas.storage import ByteRange, ObjectInfo, ObjectStream, StorageObject
+from src.utils.admission import AdmissionController, AdmissionSlot, Priority
+from src.utils.disk_cache import DiskCache
+from src.utils.lru_cache import LRUCache
+from src.utils.redis_cache import RedisCache
+from src.utils.single_flight import SharedDownload, SingleFlight
+from src.utils.ttl_cache import TTLCache
+
+
+class CachedStorage(AbstractStorage):
+    """
+    Read-through cache in front of another storage.
+    Segments are immutable once written, so they are never revalidated. Playlists can be
+    rewritten, so the playlist tiers keep them only for a short TTL.
+    Concurrent misses for the same key share one upstream download.
+
+    With a range cache, range requests and objects too large to be cached whole are served
+    from fixed-size aligned chunks, so seeking in a large file only fetches the chunks
+    that are not cached yet.
+    """
+
+    def __init__(
+        self,
+        storage: AbstractStorage,
+        playlist_cache: LRUCache,
+        segment_cache: LRUCache,
+        presigned_urls: TTLCache,
+        presigned_url_min_validity: int = 120,
+        disk_cache: DiskCache | None = None,
+        chunk_size: int = 64 * 1024,
+        admission: AdmissionController | None = None,
+        shared_playlist_cache: RedisCache | None = None,
+        range_cache: LRUCache | None = None,
+        range_chunk_size: int = 1024 * 1024,
+        max_range_objects: int = 10_000,
+    ):
+        self.storage = storage
+        self.playlist_cache = playlist_cache
+        self.segment_cache = segment_cache
+        self.presigned_urls = presigned_urls
+        self.presigned_url_min_validity = presigned_url_min_validity
+        self.disk_cache = disk_cache
+        self.chunk_size = chunk_size
+        self.admission = admission
+        self.shared_playlist_cache = shared_playlist_cache
+        self.range_cache = range_cache
+        self.range_chunk_size = range_chunk_size
+        self.max_range_objects = max_range_objects
+        # metadata of objects served in chunks, needed to resolve ranges without a request
+        self._range_objects: OrderedDict[str, ObjectInfo] = OrderedDict()
+        self.flights = SingleFlight()
+        self.coalesced = 0
+        self._downloads: dict[str, SharedDownload] = {}
+        self._background_tasks: set[asyncio.Task] = set()
+
+    def _get_cache(self, key: str) -> LRUCache:
+        if key.endswith(".m3u8"):
+            return self.playlist_cache
+        return self.segment_cache
+
+    @staticmethod
+    def _get_priority(key: str) -> Priority:
+        if key.endswith(".m3u8"):
+            return Priority.PLAYLIST
+        return Priority.SEGMENT
+
+    async def get_file(self, key: str) -> bytes:
+        item = await self.get_object(key)
+        return item.data
+
+    async def get_object(self, key: str) -> StorageObject:
+        stream = await self.get_file_stream(key)
+        async with aclosing(stream):
+            data = b"".join([chunk async for chunk in stream])
+        return StorageObject(info=stream.info, data=data)
+
+    async def get_file_stream(self, key: str, byte_range: ByteRange | None = None) -> ObjectStream:
+        artefact, rendition = classify(key)
+        cache = self._get_cache(key)
+        item = cache.get(key)
+        CACHE_REQUESTS.labels(
+            tier="memory",
+            artefact=artefact,
+            rendition=rendition,
+            result="miss" if item is None else "hit",
+        ).inc()
+        if item is not None:
+            return self._open_cached(item, byte_range)
+
+        if self.disk_cache is not None and cache is self.segment_cache:
+            entry = await self.disk_cache.get(key)
+            CACHE_REQUESTS.labels(
+                tier="disk",
+                artefact=artefact,
+                rendition=rendition,
+                result="miss" if entry is None else "hit",
+            ).inc()
+            if entry is not None:
+                return self._open_file(*entry, byte_range)
+
+        if self.shared_playlist_cache is not None and cache is self.playlist_cache:
+            item = await self.shared_playlist_cache.get(key)
+            CACHE_REQUESTS.labels(
+                tier="redis",
+                artefact=artefact,
+                rendition=rendition,
+                result="miss" if item is None else "hit",
+            ).inc()
+            if item is not None:
+                cache.set(key, item)
+                return self._open_cached(item, byte_range)
+
+        chunked = self.range_cache is not None and cache is self.segment_cache
+        if byte_range is not None:
+            if chunked:
+                return await self._open_chunked(key, byte_range)
+            # partial reads go straight to the storage and are not cached
+            return await self._fetch(key, self._get_priority(key), byte_range)
+        if chunked and key in self._range_objects:
+            return await self._open_chunked(key, None)
+
+        download = self._downloads.get(key)
+        if download is not None:
+            self.coalesced += 1
+            SINGLE_FLIGHT.labels(
+                artefact=artefact, rendition=rendition, result="deduplicated"
+            ).inc()
+            return download.open()
+
+        priority = self._get_priority(key)
+        opened, shared = await self.flights.do(key, partial(self._open, cache, key, priority))
+        if shared:
+            self.coalesced += 1
+        SINGLE_FLIGHT.labels(
+            artefact=artefact,
+            rendition=rendition,
+            result="deduplicated" if shared else "executed",
+        ).inc()
+        if isinstance(opened, SharedDownload):
+            return opened.open()
+
+        # too large to be buffered, so the stream belongs to the caller that opened it
+        if shared:
+            if chunked:
+                return await self._open_chunked(key, None)
+            return await self._fetch(key, priority)
+        return opened
+
+    def is_cached_in_memory(self, key: str) -> bool:
+        return key in self._get_cache(key) or key in self._downloads
+
+    async def is_cached(self, key: str) -> bool:
+        if self.is_cached_in_memory(key):
+            return True
+        return (
+            self.disk_cache is not None
+            and self._get_cache(key) is self.segment_cache
+            and await self.disk_cache.contains(key)
+        )
+
+    async def warm(self, key: str) -> None:
+        """
+        Load the object into the cache without serving it and wait until it is stored
+        """
+        download = self._downloads.get(key)
+        if download is not None:
+            await download.wait()
+            return
+        if await self.is_cached(key):
+            return
+
+        opened, shared = await self.flights.do(
+            key, partial(self._open, self._get_cache(key), key, Priority.BACKGROUND)
+        )
+        if isinstance(opened, SharedDownload):
+            await opened.wait()
+        elif not shared:
+            # too large for the cache, nothing to warm
+            await opened.aclose()
+
+    async def _fetch(
+        self, key: str, priority: Priority, byte_range: ByteRange | None = None
+    ) -> ObjectStream:
+        """
+        Open the object upstream. With admission control the slot is held
+        until the body has been read or the stream is closed.
+        """
+        if self.admission is None:
+            return await self.storage.get_file_stream(key, byte_range)
+        slot = await self.admission.acquire(priority)
+        try:
+            stream = await self.storage.get_file_stream(key, byte_range)
+        except BaseException:
+            slot.release()
+            raise
+        stream.chunks = self._release_after(stream.chunks, slot)
+        stream.on_close = partial(self._close_with_slot, stream.on_close, slot)
+        return stream
+
+    @staticmethod
+    async def _close_with_slot(
+        on_close: Callable[[], Awaitable[None] | None] | None, slot: AdmissionSlot
+    ) -> None:
+        slot.release()
+        if on_close is not None:
+            result = on_close()
+            if inspect.isawaitable(result):
+                await result
+
+    @staticmethod
+    async def _release_after(chunks: AsyncIterator[bytes], slot: AdmissionSlot):
+        try:
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    yield chunk
+        finally:
+            slot.release()
+
+    async def _open(
+        self, cache: LRUCache, key: str, priority: Priority
+    ) -> SharedDownload | ObjectStream:
+        stream = await self._fetch(key, priority)
+        if not cache.fits(stream.info.size):
+            if self.range_cache is not None and cache is self.segment_cache:
+                self._remember_range_object(stream.info)
+                stream.chunks = self._cache_chunks(stream.info, stream.chunks)
+            return stream
+
+        download = SharedDownload(info=stream.info)
+        self._downloads[key] = download
+        task = asyncio.create_task(download.pump(stream))
+        task.add_done_callback(partial(self._on_download_done, cache, download))
+        return download
+
+    def _on_download_done(
+        self, cache: LRUCache, download: SharedDownload, task: asyncio.Task
+    ) -> None:
+        key = download.info.key
+        if self._downloads.get(key) is download:
+            del self._downloads[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        if len(download.buffer) != download.info.size:
+            return
+        item = StorageObject(info=download.info, data=bytes(download.buffer))
+        cache.set(key, item)
+        if self.disk_cache is not None and cache is self.segment_cache:
+            self._run_in_background(self.disk_cache.put(item))
+        if self.shared_playlist_cache is not None and cache is self.playlist_cache:
+            self._run_in_background(self.shared_playlist_cache.set(item))
+
+    def _remember_range_object(self, info: ObjectInfo) -> None:
+        # only objects too large for the segment cache are served in chunks when read whole,
+        # the others keep going through the segment cache, the disk tier and single-flight
+        if self.segment_cache.fits(info.size):
+            return
+        self._range_objects[info.key] = info
+        self._range_objects.move_to_end(info.key)
+        while len(self._range_objects) > self.max_range_objects:
+            self._range_objects.popitem(last=False)
+
+    async def _open_chunked(self, key: str, byte_range: ByteRange | None) -> ObjectStream:
+        info = self._range_objects.get(key)
+        first_chunk = None
+        if info is None:
+            if byte_range is None or byte_range.start is None:
+                # a suffix range needs the size first: read it through and learn the object
+                stream = await self._fetch(key, Priority.SEGMENT, byte_range)
+                self._remember_range_object(stream.info)
+                return stream
+            first_chunk = await self._get_chunk(key, byte_range.start // self.range_chunk_size)
+            info = first_chunk.info
+            self._remember_range_object(info)
+        else:
+            self._range_objects.move_to_end(key)
+
+        if byte_range is None:
+            resolved_range = ByteRange(start=0, end=info.size - 1)
+        else:
+            resolved_range = byte_range.resolve(info.size)
+        if first_chunk is None:
+            # loaded before the stream is returned, so a rejected or failed fetch is answered
+            # with its error status instead of a truncated body
+            first_chunk = await self._get_chunk(key, resolved_range.start // self.range_chunk_size)
+        return ObjectStream(
+            info=info,
+            chunks=self._iter_chunks(key, resolved_range, first_chunk),
+            byte_range=resolved_range if byte_range is not None else None,
+        )
+
+    async def _iter_chunks(
+        self, key: str, byte_range: ByteRange, first_chunk: StorageObject
+    ) -> AsyncIterator[bytes]:
+        """
+        Yield the range chunk by chunk, loading the next chunk while the current one is sent
+        """
+        first = byte_range.start // self.range_chunk_size
+        last = byte_range.end // self.range_chunk_size
+        chunk = first_chunk
+        pending = None
+        try:
+            for index in range(first, last + 1):
+                if pending is not None:
+                    chunk = await pending
+                    pending = None
+                if index < last:
+                    pending = self._start_chunk(key, index + 1)
+                offset = index * self.range_chunk_size
+                start = byte_range.start - offset if index == first else 0
+                end = byte_range.end - offset + 1 if index == last else len(chunk.data)
+                yield chunk.data[start:end]
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    def _start_chunk(self, key: str, index: int) -> asyncio.Task[StorageObject]:
+        task = asyncio.create_task(self._get_chunk(key, index))
+        # a read-ahead that fails after the reader has gone must not be reported as unhandled
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    async def _get_chunk(self, key: str, index: int) -> StorageObject:
+        chunk_key = self._chunk_key(key, index)
+        chunk = self.range_cache.get(chunk_key)
+        artefact, rendition = classify(key)
+        CACHE_REQUESTS.labels(
+            tier="chunk",
+            artefact=artefact,
+            rendition=rendition,
+            result="miss" if chunk is None else "hit",
+        ).inc()
+        if chunk is not None:
+            return chunk
+        chunk, _ = await self.flights.do(chunk_key, partial(self._load_chunk, key, index))
+        return chunk
+
+    async def _load_chunk(self, key: str, index: int) -> StorageObject:
+        start = index * self.range_chunk_size
+        # the storage clips the end of the last chunk to the object size
+        byte_range = ByteRange(start=start, end=start + self.range_chunk_size - 1)
+        stream = await self._fetch(key, Priority.SEGMENT, byte_range)
+        async with aclosing(stream):
+            data = b"".join([chunk async for chunk in stream])
+        chunk = StorageObject(info=stream.info, data=data)
+        self.range_cache.set(self._chunk_key(key, index), chunk)
+        return chunk
+
+    async def _cache_chunks(
+        self, info: ObjectInfo, chunks: AsyncIterator[bytes]
+    ) -> AsyncIterator[bytes]:
+        """
+        Pass a whole-object stream through, storing every complete aligned chunk on the way
+        """
+        buffer = bytearray()
+        index = 0
+        async with aclosing(chunks):
+            async for chunk in chunks:
+                yield chunk
+                buffer.extend(chunk)
+                while len(buffer) >= self.range_chunk_size:
+                    data = bytes(buffer[: self.range_chunk_size])
+                    del buffer[: self.range_chunk_size]
+                    self.range_cache.set(
+                        self._chunk_key(info.key, index), StorageObject(info=info, data=data)
+                    )
+                    index += 1
+        if buffer and index * self.range_chunk_size + len(buffer) == info.size:
+            self.range_cache.set(
+                self._chunk_key(info.key, index), StorageObject(info=info, data=bytes(buffer))
+            )
+
+    @staticmethod
+    def _chunk_key(key: str, index: int) -> str:
+        return f"{key}#{index}"
+
+    def _run_in_background(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def _open_cached(self, item: StorageObject, byte_range: ByteRange | None) -> ObjectStream:
+        if byte_range is None:
+            return ObjectStream(info=item.info, chunks=self._iter_data(item.data))
+        resolved_range = byte_range.resolve(item.info.size)
+        data = item.data[resolved_range.start : resolved_range.end + 1]
+        return ObjectStream(
+            info=item.info,
+            chunks=self._iter_data(data),
+            byte_range=resolved_range,
+        )
+
+    @staticmethod
+    async def _iter_data(data: bytes) -> AsyncIterator[bytes]:
+        yield data
+
+    def _open_file(
+        self, path: Path, info: ObjectInfo, byte_range: ByteRange | None
+    ) -> ObjectStream:
+        resolved_range = byte_range.resolve(info.size) if byte_range is not None else None
+        return ObjectStream(
+            info=info,
+            chunks=self._iter_file(path, resolved_range),
+            byte_range=resolved_range,
+            path=path,
+        )
+
+    async def _iter_file(self, path: Path, byte_range: ByteRange | None) -> AsyncIterator[bytes]:
+        start, remaining = 0, None
+        if byte_range is not None:
+            start, remaining = byte_range.start, byte_range.length
+        # opening can block on a busy disk just like reading
+        f = await asyncio.to_thread(self._open_at, path, start)
+        try:
+            while remaining is None or remaining > 0:
+                size = self.chunk_size if remaining is None else min(self.chunk_size, remaining)
+                chunk = await asyncio.to_thread(f.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            f.close()
+
+    @staticmethod
+    def _open_at(path: Path, offset: int) -> BinaryIO:
+        f = open(path, "rb")
+        try:
+            f.seek(offset)
+        except BaseException:
+            f.close()
+            raise
+        return f
+
+    async def get_files_list(self, folder_path: str) -> List[dict]:
+        return await self.storage.get_files_list(folder_path)
+
+    async def upload_file(self, key: str, data: bytes) -> bool:
+        await self._invalidate(key)
+        return await self.storage.upload_file(key, data)
+
+    async def delete_file(self, key: str):
+        await self._invalidate(key)
+        await self.storage.delete_file(key)
+
+    async def _invalidate(self, key: str) -> None:
+        cache = self._get_cache(key)
+        cache.pop(key)
+        self._range_objects.pop(key, None)
+        if self.range_cache is not None:
+            # chunks of objects small enough to be cached whole are kept by range requests too
+            for chunk_key in [k for k in self.range_cache.keys() if k.startswith(f"{key}#")]:
+                self.range_cache.pop(chunk_key)
+        if self.disk_cache is not None and cache is self.segment_cache:
+            await self.disk_cache.delete(key)
+        if self.shared_playlist_cache is not None and cache is self.playlist_cache:
+            await self.shared_playlist_cache.delete(key)
+
+    async def delete_many(self, key: str) -> None:
+        # shared playlist entries are left to expire by their TTL
+        for cached_key in [k for k in self._range_objects if k.startswith(key)]:
+            del self._range_objects[cached_key]
+        caches = [self.playlist_cache, self.segment_cache]
+        if self.range_cache is not None:
+            caches.append(self.range_cache)
+        for cache in caches:
+            for cached_key in [k for k in cache.keys() if k.startswith(key)]:
+                cache.pop(cached_key)
+        if self.disk_cache is not None:
+            await self.disk_cache.delete_prefix(key)
+        await self.storage.delete_many(key)
+
+    async def generate_presigned_url(self, key: str, expires: int = 3600) -> str | None:
+        """
+        Signed URLs are reused until only `presigned_url_min_validity` seconds of their lifetime
+        are left, so anyone who receives one can still use it for at least that long
+        """
+        cache_key = f"{expires}:{key}"
+        url = self.presigned_urls.get(cache_key)
+        if url is None:
+            url = await self.storage.generate_presigned_url(key, expires)
+            if url is not None:
+                ttl = expires - self.presigned_url_min_validity
+                self.presigned_urls.set(cache_key, url, ttl=ttl)
+        return url
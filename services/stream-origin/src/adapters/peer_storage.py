@@ -0,0 +1,169 @@
+import logging
+from contextvars import ContextVar
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, List
+
+import aiohttp
+
+from src.exceptions import ObjectNotFoundException, RangeNotSatisfiableException
+from src.interfaces.storage import AbstractStorage
+from src.metrics import PEER_REQUESTS
+from src.schemas.storage import ByteRange, ObjectInfo, ObjectStream, StorageObject
+from src.utils.hash_ring import HashRing
+
+
+log = logging.getLogger(__name__)
+
+# set while serving another replica, so a request is never forwarded twice
+serving_peer: ContextVar[bool] = ContextVar("serving_peer", default=False)
+
+
+class PeerStorage(AbstractStorage):
+    """
+    Shards reads by video id across origin replicas. Objects of a video owned by another
+    replica are read from that replica (and so from its caches) before falling back to
+    the wrapped storage. Writes and listings always go to the wrapped storage.
+    """
+
+    def __init__(
+        self,
+        storage: AbstractStorage,
+        ring: HashRing,
+        self_peer: str,
+        token: str,
+        chunk_size: int = 64 * 1024,
+        connect_timeout: float = 0.5,
+        read_timeout: float = 5,
+        max_connections: int = 100,
+    ):
+        self.storage = storage
+        self.ring = ring
+        self.self_peer = self_peer
+        self.token = token
+        self.chunk_size = chunk_size
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.max_connections = max_connections
+        self._session: aiohttp.ClientSession | None = None
+
+    async def connect(self):
+        connector = aiohttp.TCPConnector(limit=self.max_connections)
+        self._session = aiohttp.ClientSession(timeout=self.timeout, connector=connector)
+        log.info(f"Peers: {self.self_peer} is one of {self.ring.servers}")
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def get_owner(self, key: str) -> str | None:
+        """
+        Replica owning the key, or None when it is this one
+        """
+        parts = key.split("/")
+        if len(parts) < 3 or parts[0] != "videos":
+            return None
+        owner = self.ring.get_server(parts[1])
+        return None if owner == self.self_peer else owner
+
+    async def get_file(self, key: str) -> bytes:
+        item = await self.get_object(key)
+        return item.data
+
+    async def get_object(self, key: str) -> StorageObject:
+        stream = await self.get_file_stream(key)
+        try:
+            data = b"".join([chunk async for chunk in stream])
+        finally:
+            await stream.aclose()
+        return StorageObject(info=stream.info, data=data)
+
+    async def get_file_stream(self, key: str, byte_range: ByteRange | None = None) -> ObjectStream:
+        owner = self.get_owner(key)
+        if owner is not None and self._session is not None and not serving_peer.get():
+            stream = await self._get_from_peer(owner, key, byte_range)
+            if stream is not None:
+                return stream
+        return await self.storage.get_file_stream(key, byte_range)
+
+    async def _get_from_peer(
+        self, peer: str, key: str, byte_range: ByteRange | None
+    ) -> ObjectStream | None:
+        headers = {"X-Peer-Token": self.token}
+        if byte_range is not None:
+            headers["Range"] = byte_range.to_header()
+        try:
+            resp = await self._session.get(f"http://{peer}/internal/objects/{key}", headers=headers)
+        except (aiohttp.ClientError, TimeoutError) as exc:
+            PEER_REQUESTS.labels(result="error").inc()
+            log.warning(f"Peers: {peer} is unavailable for {key}, using storage: {exc}")
+            return None
+
+        if resp.status == 404:
+            resp.release()
+            PEER_REQUESTS.labels(result="not_found").inc()
+            raise ObjectNotFoundException(detail=f"File {key} not found")
+        if resp.status == 416:
+            resp.release()
+            PEER_REQUESTS.labels(result="not_satisfiable").inc()
+            size = resp.headers.get("Content-Range", "").rpartition("/")[2]
+            raise RangeNotSatisfiableException(size=int(size) if size.isdigit() else None)
+        if resp.status not in (200, 206):
+            resp.release()
+            PEER_REQUESTS.labels(result="error").inc()
+            log.warning(f"Peers: {peer} answered {resp.status} for {key}, using storage")
+            return None
+
+        PEER_REQUESTS.labels(result="hit").inc()
+        size = int(resp.headers["Content-Length"])
+        resolved_range = None
+        if resp.status == 206:
+            # e.g. "bytes 0-1023/146515"
+            content_range = resp.headers["Content-Range"].removeprefix("bytes ")
+            bounds, _, total = content_range.partition("/")
+            start, _, end = bounds.partition("-")
+            resolved_range = ByteRange(start=int(start), end=int(end))
+            size = int(total)
+
+        last_modified = resp.headers.get("Last-Modified")
+        info = ObjectInfo(
+            key=key,
+            size=size,
+            etag=resp.headers.get("ETag"),
+            last_modified=self._parse_http_date(last_modified) if last_modified else None,
+        )
+        return ObjectStream(
+            info=info,
+            chunks=self._iter_body(resp),
+            byte_range=resolved_range,
+            on_close=resp.release,
+        )
+
+    async def _iter_body(self, resp: aiohttp.ClientResponse) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in resp.content.iter_chunked(self.chunk_size):
+                yield chunk
+        finally:
+            resp.release()
+
+    @staticmethod
+    def _parse_http_date(value: str) -> datetime | None:
+        try:
+            return parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+
+    async def get_files_list(self, folder_path: str) -> List[dict]:
+        return await self.storage.get_files_list(folder_path)
+
+    async def upload_file(self, key: str, data: bytes) -> bool:
+        return await self.storage.upload_file(key, data)
+
+    async def delete_file(self, key: str):
+        await self.storage.delete_file(key)
+
+    async def delete_many(self, key: str) -> None:
+        await self.storage.delete_many(key)
+
+    async def generate_presigned_url(self, key: str, expires: int = 3600) -> str | None:
+        return await self.storage.generate_presigned_url(key, expires)
@@ -1,11 +1,21 @@
-from contextlib import asynccontextmanager
-from typing import List
+import logging
+from contextlib import AsyncExitStack, aclosing, asynccontextmanager
+from time import perf_counter
+from typing import AsyncIterator, List
 
+from aiobotocore.config import AioConfig
 from aiobotocore.session import get_session
 from botocore.exceptions import ClientError
 
 from src.interfaces.storage import AbstractStorage
-from src.exceptions import ObjectNotFoundException
+from src.exceptions import ObjectNotFoundException, RangeNotSatisfiableException
+from src.metrics import S3_ERRORS, S3_IN_FLIGHT, S3_LATENCY, classify
+from src.schemas.storage import ByteRange, ObjectInfo, ObjectStream, StorageObject
+
+
+STREAM_CHUNK_SIZE = 64 * 1024  # 64 KB
+
+log = logging.getLogger(__name__)
 
 
 class S3Adapter(AbstractStorage):
@@ -15,6 +25,10 @@ class S3Adapter(AbstractStorage):
         secret_key: str,
         endpoint_url: str,
         bucket_name: str,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        max_pool_connections: int = 10,
+        keepalive_timeout: float = 60,
+        public_endpoint_url: str | None = None,
     ):
         self.config = {
             "aws_access_key_id": access_key,
@@ -22,11 +36,57 @@ class S3Adapter(AbstractStorage):
             "endpoint_url": endpoint_url,
         }
         self.bucket_name = bucket_name
+        # presigned URLs are handed to players, so they may need a different host than ours
+        self.public_endpoint_url = public_endpoint_url or endpoint_url
+        self.chunk_size = chunk_size
+        self.client_config = AioConfig(
+            max_pool_connections=max_pool_connections,
+            tcp_keepalive=True,
+            connector_args={"keepalive_timeout": keepalive_timeout},
+        )
         self.session = get_session()
+        self._client = None
+        self._public_client = None
+        self._exit_stack: AsyncExitStack | None = None
+
+    async def connect(self):
+        """
+        Open a long-lived client whose connection pool is reused by every operation
+        """
+        if self._client is not None:
+            return
+        log.info(f"S3: Opening client for {self.config['endpoint_url']}...")
+        self._exit_stack = AsyncExitStack()
+        self._client = await self._exit_stack.enter_async_context(self._create_client())
+        self._public_client = self._client
+        if self.public_endpoint_url != self.config["endpoint_url"]:
+            self._public_client = await self._exit_stack.enter_async_context(
+                self._create_client(public=True)
+            )
+        log.info("S3: Client opened.")
+
+    async def close(self):
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+            self._client = None
+            self._public_client = None
+            self._exit_stack = None
+            log.info("S3: Client closed.")
+
+    def _create_client(self, public: bool = False):
+        config = dict(self.config)
+        if public:
+            config["endpoint_url"] = self.public_endpoint_url
+        return self.session.create_client("s3", config=self.client_config, **config)
 
     @asynccontextmanager
-    async def _get_client(self):
-        async with self.session.create_client("s3", **self.config) as client:
+    async def _get_client(self, public: bool = False):
+        client = self._public_client if public else self._client
+        if client is not None:
+            yield client
+            return
+        # not connected (e.g. inside a one-off event loop): fall back to a short-lived client
+        async with self._create_client(public=public) as client:
             yield client
 
     async def upload_file(self, key: str, data: bytes) -> bool:
@@ -55,6 +115,82 @@ class S3Adapter(AbstractStorage):
                 raise
         return data
 
+    async def get_object(self, key: str) -> StorageObject:
+        """
+        Get object from s3 storage together with its metadata
+        """
+        stream = await self.get_file_stream(key)
+        async with aclosing(stream):
+            data = b"".join([chunk async for chunk in stream])
+        return StorageObject(info=stream.info, data=data)
+
+    async def get_file_stream(self, key: str, byte_range: ByteRange | None = None) -> ObjectStream:
+        """
+        Open object in s3 storage and return a stream over its body (or over the requested range).
+        The object is requested eagerly, so a missing key raises here
+        and not in the middle of the response.
+        """
+        params = {"Bucket": self.bucket_name, "Key": key}
+        if byte_range is not None:
+            params["Range"] = byte_range.to_header()
+
+        artefact, _ = classify(key)
+        in_flight = S3_IN_FLIGHT.labels(artefact=artefact)
+        stack = AsyncExitStack()
+        client = await stack.enter_async_context(self._get_client())
+        start_time = perf_counter()
+        in_flight.inc()
+        try:
+            resp = await client.get_object(**params)
+        except ClientError as e:
+            await stack.aclose()
+            error = e.response["Error"]
+            S3_ERRORS.labels(artefact=artefact, operation="get_object", code=error["Code"]).inc()
+            if error["Code"] == "NoSuchKey":
+                raise ObjectNotFoundException(detail=f"File {key} not found")
+            if error["Code"] == "InvalidRange":
+                size = error.get("ActualObjectSize")
+                raise RangeNotSatisfiableException(size=int(size) if size else None)
+            raise
+        except BaseException:
+            await stack.aclose()
+            raise
+        finally:
+            in_flight.dec()
+        S3_LATENCY.labels(artefact=artefact, operation="get_object").observe(
+            perf_counter() - start_time
+        )
+
+        body = resp["Body"]
+        stack.callback(body.close)
+        size = resp["ContentLength"]
+        resolved_range = None
+        if "ContentRange" in resp:
+            # e.g. "bytes 0-1023/146515"
+            bounds, _, total = resp["ContentRange"].removeprefix("bytes ").partition("/")
+            start, _, end = bounds.partition("-")
+            resolved_range = ByteRange(start=int(start), end=int(end))
+            size = int(total)
+
+        info = ObjectInfo(
+            key=key,
+            size=size,
+            etag=resp.get("ETag"),
+            last_modified=resp.get("LastModified"),
+        )
+        return ObjectStream(
+            info=info,
+            chunks=self._iter_body(body, stack),
+            byte_range=resolved_range,
+            # a stream closed before it is read never runs _iter_body
+            on_close=stack.aclose,
+        )
+
+    async def _iter_body(self, body, stack: AsyncExitStack) -> AsyncIterator[bytes]:
+        async with stack:
+            async for chunk in body.iter_chunks(self.chunk_size):
+                yield chunk
+
     async def get_files_list(self, folder_path: str) -> List[dict]:
         """
         Get list of objects under the given folder path using paginator
@@ -86,7 +222,7 @@ class S3Adapter(AbstractStorage):
                     await client.delete_objects(Bucket=self.bucket_name, Delete={"Objects": chunk})
 
     async def generate_presigned_url(self, key: str, expires: int = 3600) -> str | None:
-        async with self._get_client() as client:
+        async with self._get_client(public=True) as client:
             url = await client.generate_presigned_url(
                 "get_object",
                 Params={"Bucket": self.bucket_name, "Key": key},
@@ -0,0 +1,41 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Query
+
+from src.config import settings
+from src.exceptions import (
+    PlaylistNotFoundException,
+    PlaylistNotFoundHTTPException,
+    ServiceOverloadedException,
+    ServiceOverloadedHTTPException,
+    WarmupJobNotFoundException,
+    WarmupJobNotFoundHTTPException,
+)
+from src.api.dependencies import AdminDep, WarmupServiceDep
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[AdminDep])
+
+
+@router.post("/videos/{video_id}/warmup", status_code=202)
+async def warm_up_video(
+    warmup_service: WarmupServiceDep,
+    video_id: UUID,
+    segments: int = Query(default=settings.WARMUP_SEGMENTS, ge=0, le=1000),
+):
+    try:
+        job = await warmup_service.start(video_id, segments)
+    except PlaylistNotFoundException:
+        raise PlaylistNotFoundHTTPException
+    except ServiceOverloadedException:
+        raise ServiceOverloadedHTTPException(retry_after=settings.ADMISSION_RETRY_AFTER)
+    return {"status": "ok", "data": job.to_dict()}
+
+
+@router.get("/warmups/{job_id}")
+async def get_warmup_job(warmup_service: WarmupServiceDep, job_id: UUID):
+    try:
+        job = await warmup_service.get_job(job_id)
+    except WarmupJobNotFoundException:
+        raise WarmupJobNotFoundHTTPException
+    return {"status": "ok", "data": job.to_dict()}
@@ -1,30 +1,107 @@
+import hmac
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Depends, Header
 
 from src.config import settings
+from src.container import (
+    live_playlists,
+    prefetcher,
+    rewritten_playlists,
+    s3_storage,
+    shared_playlist_cache,
+    storage,
+    warmup_jobs,
+)
+from src.exceptions import (
+    MultipleRangesException,
+    PermissionDeniedHTTPException,
+)
 from src.interfaces.storage import AbstractStorage
-from src.adapters.s3_adapter import S3Adapter
+from src.schemas.storage import ByteRange
+from src.services.live import LiveService
 from src.services.video import VideoService
+from src.services.warmup import WarmupService
 
 
 class FileAdapterFactory:
     @staticmethod
-    async def s3_adapter_factory() -> AbstractStorage:
-        return S3Adapter(
-            access_key=settings.S3_ACCESS_KEY,
-            secret_key=settings.S3_SECRET_KEY,
-            bucket_name=settings.S3_BUCKET_NAME,
-            endpoint_url=settings.S3_ENDPOINT_URL,
-        )
+    async def storage_factory() -> AbstractStorage:
+        return storage
 
 
 class VideoServiceFactory:
     @staticmethod
     async def video_service_factory(
-        storage: Annotated[AbstractStorage, Depends(FileAdapterFactory.s3_adapter_factory)],
+        storage: Annotated[AbstractStorage, Depends(FileAdapterFactory.storage_factory)],
     ) -> VideoService:
-        return VideoService(storage=storage)
+        return VideoService(
+            storage=storage,
+            rewritten_playlists=rewritten_playlists,
+            prefetcher=prefetcher,
+            url_signer=s3_storage,
+        )
+
+
+class LiveServiceFactory:
+    @staticmethod
+    async def live_service_factory(
+        storage: Annotated[AbstractStorage, Depends(FileAdapterFactory.storage_factory)],
+    ) -> LiveService:
+        return LiveService(storage=storage, playlists=live_playlists)
+
+
+class WarmupServiceFactory:
+    @staticmethod
+    async def warmup_service_factory(
+        storage: Annotated[AbstractStorage, Depends(FileAdapterFactory.storage_factory)],
+    ) -> WarmupService:
+        return WarmupService(
+            storage=storage,
+            jobs=warmup_jobs,
+            concurrency=settings.WARMUP_CONCURRENCY,
+            job_ttl=settings.WARMUP_JOB_TTL,
+            shared_jobs=shared_playlist_cache,
+        )
 
 
+StorageDep = Annotated[AbstractStorage, Depends(FileAdapterFactory.storage_factory)]
 VideoServiceDep = Annotated[VideoService, Depends(VideoServiceFactory.video_service_factory)]
+LiveServiceDep = Annotated[LiveService, Depends(LiveServiceFactory.live_service_factory)]
+WarmupServiceDep = Annotated[WarmupService, Depends(WarmupServiceFactory.warmup_service_factory)]
+
+
+# a 416 must carry the object size in Content-Range, so routes answer it once the object is open
+MULTIPLE_RANGES = ByteRange(start=None, end=None)
+
+
+def get_byte_range(range_header: str | None = Header(default=None, alias="Range")):
+    try:
+        return ByteRange.from_header(range_header)
+    except MultipleRangesException:
+        return MULTIPLE_RANGES
+
+
+ByteRangeDep = Annotated[ByteRange | None, Depends(get_byte_range)]
+
+
+def check_admin_token(admin_token: str | None = Header(default=None, alias="X-Admin-Token")):
+    # admin routes stay closed until a token is configured
+    if not settings.ADMIN_TOKEN or admin_token is None:
+        raise PermissionDeniedHTTPException
+    if not hmac.compare_digest(admin_token.encode(), settings.ADMIN_TOKEN.encode()):
+        raise PermissionDeniedHTTPException
+
+
+AdminDep = Depends(check_admin_token)
+
+
+def check_peer_token(peer_token: str | None = Header(default=None, alias="X-Peer-Token")):
+    # internal routes stay closed until a token is configured
+    if not settings.PEER_TOKEN or peer_token is None:
+        raise PermissionDeniedHTTPException
+    if not hmac.compare_digest(peer_token.encode(), settings.PEER_TOKEN.encode()):
+        raise PermissionDeniedHTTPException
+
+
+PeerDep = Depends(check_peer_token)
@@ -0,0 +1,63 @@
+from pathlib import PurePosixPath
+
+from fastapi import APIRouter
+
+from src.adapters.peer_storage import serving_peer
+from src.config import settings
+from src.exceptions import (
+    ObjectNotFoundException,
+    ObjectNotFoundHTTPException,
+    MultipleRangesHTTPException,
+    RangeNotSatisfiableException,
+    RangeNotSatisfiableHTTPException,
+    ServiceOverloadedException,
+    ServiceOverloadedHTTPException,
+)
+from src.api.dependencies import MULTIPLE_RANGES, ByteRangeDep, PeerDep, StorageDep
+from src.api.responses import SEGMENT_CACHE_CONTROL, stream_response
+from src.utils.media_types import get_media_type
+
+
+# reads between origin replicas, never exposed by the gateway
+router = APIRouter(
+    prefix="/internal", tags=["Internal"], include_in_schema=False, dependencies=[PeerDep]
+)
+
+# only HLS artefacts: the uploaded originals live under the same videos/ prefix
+PEER_SUFFIXES = {".m3u8", ".ts", ".m4s"}
+
+
+def is_peer_key(key: str) -> bool:
+    path = PurePosixPath(key)
+    return (
+        path.parts[:1] == ("videos",)
+        and "original" not in path.parts
+        and path.suffix.lower() in PEER_SUFFIXES
+    )
+
+
+@router.get("/objects/{key:path}")
+async def get_object(storage: StorageDep, key: str, byte_range: ByteRangeDep):
+    if not is_peer_key(key):
+        raise ObjectNotFoundHTTPException
+    serving_peer.set(True)
+    multiple_ranges = byte_range is MULTIPLE_RANGES
+    if multiple_ranges:
+        # opened whole, only for its size
+        byte_range = None
+    try:
+        stream = await storage.get_file_stream(key, byte_range)
+    except ObjectNotFoundException:
+        raise ObjectNotFoundHTTPException
+    except RangeNotSatisfiableException as exc:
+        raise RangeNotSatisfiableHTTPException(size=exc.size)
+    except ServiceOverloadedException:
+        raise ServiceOverloadedHTTPException(retry_after=settings.ADMISSION_RETRY_AFTER)
+    if multiple_ranges:
+        await stream.aclose()
+        raise MultipleRangesHTTPException(size=stream.info.size)
+    return await stream_response(
+        stream,
+        media_type=get_media_type(key),
+        cache_control=SEGMENT_CACHE_CONTROL,
+    )
@@ -0,0 +1,125 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Query
+from fastapi.requests import Request
+
+from src.config import settings
+from src.enums import Quality
+from src.utils.media_types import get_media_type
+from src.exceptions import (
+    InvalidBlockingReloadException,
+    InvalidBlockingReloadHTTPException,
+    LiveStreamStalledException,
+    LiveStreamStalledHTTPException,
+    PlaylistNotFoundException,
+    PlaylistNotFoundHTTPException,
+    MultipleRangesHTTPException,
+    RangeNotSatisfiableException,
+    RangeNotSatisfiableHTTPException,
+    SegmentNotFoundException,
+    SegmentNotFoundHTTPException,
+    ServiceOverloadedException,
+    ServiceOverloadedHTTPException,
+)
+from src.api.dependencies import MULTIPLE_RANGES, ByteRangeDep, LiveServiceDep
+from src.api.responses import (
+    PLAYLIST_CACHE_CONTROL,
+    SEGMENT_CACHE_CONTROL,
+    is_not_modified,
+    not_modified_response,
+    object_response,
+    stream_response,
+)
+
+
+LIVE_PLAYLIST_CACHE_CONTROL = f"public, max-age={settings.LIVE_PLAYLIST_MAX_AGE}"
+BLOCKING_PLAYLIST_CACHE_CONTROL = f"public, max-age={settings.LIVE_BLOCKING_PLAYLIST_MAX_AGE}"
+
+
+router = APIRouter(prefix="/live", tags=["Live"])
+
+
+@router.get("/{stream_id}/master.m3u8")
+async def get_master_playlist(live_service: LiveServiceDep, request: Request, stream_id: UUID):
+    try:
+        playlist = await live_service.get_master_playlist(stream_id)
+    except PlaylistNotFoundException:
+        raise PlaylistNotFoundHTTPException
+    except ServiceOverloadedException:
+        raise ServiceOverloadedHTTPException(retry_after=settings.ADMISSION_RETRY_AFTER)
+    if is_not_modified(request, playlist.info):
+        return not_modified_response(playlist.info, PLAYLIST_CACHE_CONTROL)
+    return object_response(
+        playlist,
+        media_type="application/vnd.apple.mpegurl",
+        cache_control=PLAYLIST_CACHE_CONTROL,
+    )
+
+
+@router.get("/{stream_id}/{quality}/index.m3u8")
+async def get_media_playlist(
+    live_service: LiveServiceDep,
+    request: Request,
+    stream_id: UUID,
+    quality: Quality,
+    msn: int | None = Query(default=None, alias="_HLS_msn", ge=0),
+    part: int | None = Query(default=None, alias="_HLS_part", ge=0),
+):
+    try:
+        playlist = await live_service.get_media_playlist(stream_id, quality, msn, part)
+    except PlaylistNotFoundException:
+        raise PlaylistNotFoundHTTPException
+    except InvalidBlockingReloadException as exc:
+        raise InvalidBlockingReloadHTTPException(detail=exc.detail)
+    except LiveStreamStalledException:
+        raise LiveStreamStalledHTTPException
+
+    if playlist.ended:
+        cache_control = PLAYLIST_CACHE_CONTROL
+    elif msn is not None:
+        cache_control = BLOCKING_PLAYLIST_CACHE_CONTROL
+    else:
+        cache_control = LIVE_PLAYLIST_CACHE_CONTROL
+    if is_not_modified(request, playlist.item.info):
+        return not_modified_response(playlist.item.info, cache_control)
+    return object_response(
+        playlist.item,
+        media_type="application/vnd.apple.mpegurl",
+        cache_control=cache_control,
+    )
+
+
+@router.get("/{stream_id}/{quality}/{name}")
+async def get_media(
+    live_service: LiveServiceDep,
+    request: Request,
+    stream_id: UUID,
+    quality: Quality,
+    name: str,
+    byte_range: ByteRangeDep,
+):
+    multiple_ranges = byte_range is MULTIPLE_RANGES
+    if multiple_ranges:
+        # opened whole, only for its size
+        byte_range = None
+    try:
+        media = await live_service.get_media(stream_id, quality, name, byte_range)
+    except SegmentNotFoundException:
+        raise SegmentNotFoundHTTPException
+    except RangeNotSatisfiableException as exc:
+        raise RangeNotSatisfiableHTTPException(size=exc.size)
+    except LiveStreamStalledException:
+        raise LiveStreamStalledHTTPException
+    except ServiceOverloadedException:
+        raise ServiceOverloadedHTTPException(retry_after=settings.ADMISSION_RETRY_AFTER)
+    if is_not_modified(request, media.info):
+        await media.aclose()
+        return not_modified_response(media.info, SEGMENT_CACHE_CONTROL)
+    if multiple_ranges:
+        await media.aclose()
+        raise MultipleRangesHTTPException(size=media.info.size)
+    return await stream_response(
+        media,
+        media_type=get_media_type(name),
+        cache_control=SEGMENT_CACHE_CONTROL,
+    )
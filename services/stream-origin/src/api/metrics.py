@@ -0,0 +1,31 @@
+import asyncio
+
+from fastapi import APIRouter, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    generate_latest,
+    multiprocess,
+    REGISTRY,
+)
+
+from src.metrics import MULTIPROCESS
+
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+def collect_workers() -> bytes:
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+@router.get("")
+async def metrics():
+    if MULTIPROCESS:
+        # merges the files of every worker, which is disk I/O
+        data = await asyncio.to_thread(collect_workers)
+    else:
+        data = generate_latest(REGISTRY)
+    return Response(data, media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,85 @@
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi.requests import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from src.config import settings
+from src.schemas.storage import ObjectInfo, ObjectStream, StorageObject
+
+
+PLAYLIST_CACHE_CONTROL = f"public, max-age={settings.HTTP_PLAYLIST_MAX_AGE}"
+SEGMENT_CACHE_CONTROL = f"public, max-age={settings.HTTP_SEGMENT_MAX_AGE}, immutable"
+
+
+def validator_headers(info: ObjectInfo, cache_control: str) -> dict[str, str]:
+    headers = {"Cache-Control": cache_control}
+    if info.etag:
+        headers["ETag"] = info.etag
+    if info.last_modified:
+        headers["Last-Modified"] = format_datetime(
+            info.last_modified.astimezone(timezone.utc), usegmt=True
+        )
+    return headers
+
+
+def is_not_modified(request: Request, info: ObjectInfo) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since against the stored object (RFC 9110, 13.2.2)
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if info.etag is None:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or info.etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and info.last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return info.last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+def not_modified_response(info: ObjectInfo, cache_control: str) -> Response:
+    return Response(status_code=304, headers=validator_headers(info, cache_control))
+
+
+def object_response(item: StorageObject, media_type: str, cache_control: str) -> Response:
+    return Response(
+        content=item.data,
+        media_type=media_type,
+        headers=validator_headers(item.info, cache_control),
+    )
+
+
+async def stream_response(stream: ObjectStream, media_type: str, cache_control: str) -> Response:
+    """
+    Build a full (200) or partial (206) response for an opened storage object.
+    Whole objects available on local disk are sent as files, so the server can use sendfile.
+    """
+    headers = validator_headers(stream.info, cache_control)
+    headers["Accept-Ranges"] = "bytes"
+    headers["Content-Length"] = str(stream.content_length)
+
+    if stream.path is not None and stream.byte_range is None:
+        await stream.aclose()
+        return FileResponse(stream.path, media_type=media_type, headers=headers)
+
+    status_code = 200
+    if stream.byte_range is not None:
+        headers["Content-Range"] = stream.byte_range.content_range(stream.info.size)
+        status_code = 206
+
+    return StreamingResponse(
+        content=stream,
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers,
+    )
@@ -1,45 +1,110 @@
 from uuid import UUID
 
 from fastapi import APIRouter
-from fastapi.responses import Response
+from fastapi.requests import Request
+from fastapi.responses import RedirectResponse
 
+from src.config import settings
 from src.enums import Quality
+from src.utils.media_types import get_media_type
 from src.exceptions import (
     PlaylistNotFoundException,
     PlaylistNotFoundHTTPException,
+    MultipleRangesHTTPException,
+    RangeNotSatisfiableException,
+    RangeNotSatisfiableHTTPException,
     SegmentNotFoundException,
     SegmentNotFoundHTTPException,
+    ServiceOverloadedException,
+    ServiceOverloadedHTTPException,
+)
+from src.api.dependencies import MULTIPLE_RANGES, ByteRangeDep, VideoServiceDep
+from src.api.responses import (
+    PLAYLIST_CACHE_CONTROL,
+    SEGMENT_CACHE_CONTROL,
+    is_not_modified,
+    not_modified_response,
+    object_response,
+    stream_response,
 )
-from src.api.dependencies import VideoServiceDep
 
 
 router = APIRouter(prefix="/videos", tags=["Stream"])
 
 
 @router.get("/{video_id}/master.m3u8")
-async def get_master_playlist(video_service: VideoServiceDep, video_id: UUID):
+async def get_master_playlist(video_service: VideoServiceDep, request: Request, video_id: UUID):
     try:
         playlist = await video_service.get_master_playlist(video_id)
     except PlaylistNotFoundException:
         raise PlaylistNotFoundHTTPException
-    return Response(content=playlist, media_type="application/vnd.apple.mpegurl")
+    except ServiceOverloadedException:
+        raise ServiceOverloadedHTTPException(retry_after=settings.ADMISSION_RETRY_AFTER)
+    if is_not_modified(request, playlist.info):
+        return not_modified_response(playlist.info, PLAYLIST_CACHE_CONTROL)
+    return object_response(
+        playlist,
+        media_type="application/vnd.apple.mpegurl",
+        cache_control=PLAYLIST_CACHE_CONTROL,
+    )
 
 
 @router.get("/{video_id}/{quality}/index.m3u8")
-async def get_index_playlist(video_service: VideoServiceDep, video_id: UUID, quality: Quality):
+async def get_index_playlist(
+    video_service: VideoServiceDep, request: Request, video_id: UUID, quality: Quality
+):
     try:
         playlist = await video_service.get_index_playlist(video_id, quality)
     except PlaylistNotFoundException:
         raise PlaylistNotFoundHTTPException
-    return Response(content=playlist, media_type="application/vnd.apple.mpegurl")
+    except ServiceOverloadedException:
+        raise ServiceOverloadedHTTPException(retry_after=settings.ADMISSION_RETRY_AFTER)
+    if is_not_modified(request, playlist.info):
+        return not_modified_response(playlist.info, PLAYLIST_CACHE_CONTROL)
+    return object_response(
+        playlist,
+        media_type="application/vnd.apple.mpegurl",
+        cache_control=PLAYLIST_CACHE_CONTROL,
+    )
 
 
 @router.get("/{video_id}/{quality}/{segment_name}")
 async def get_segment(
-    video_service: VideoServiceDep, video_id: UUID, quality: Quality, segment_name: str
+    video_service: VideoServiceDep,
+    request: Request,
+    video_id: UUID,
+    quality: Quality,
+    segment_name: str,
+    byte_range: ByteRangeDep,
 ):
+    if settings.SEGMENT_DELIVERY_MODE == "redirect":
+        url = await video_service.get_segment_url(
+            video_id, quality, segment_name, expires=settings.PRESIGNED_URL_EXPIRES
+        )
+        # a storage that cannot sign URLs yields None, the segment is then proxied
+        if url is not None:
+            return RedirectResponse(url, status_code=302, headers={"Cache-Control": "no-cache"})
+
+    multiple_ranges = byte_range is MULTIPLE_RANGES
+    if multiple_ranges:
+        # opened whole, only for its size
+        byte_range = None
     try:
-        segment = await video_service.get_segment(video_id, quality, segment_name)
+        segment = await video_service.get_segment(video_id, quality, segment_name, byte_range)
     except SegmentNotFoundException:
         raise SegmentNotFoundHTTPException
-    return Response(content=segment, media_type="application/vnd.apple.mpegurl")
+    except RangeNotSatisfiableException as exc:
+        raise RangeNotSatisfiableHTTPException(size=exc.size)
+    except ServiceOverloadedException:
+        raise ServiceOverloadedHTTPException(retry_after=settings.ADMISSION_RETRY_AFTER)
+    if is_not_modified(request, segment.info):
+        await segment.aclose()
+        return not_modified_response(segment.info, SEGMENT_CACHE_CONTROL)
+    if multiple_ranges:
+        await segment.aclose()
+        raise MultipleRangesHTTPException(size=segment.info.size)
+    return await stream_response(
+        segment,
+        media_type=get_media_type(segment_name),
+        cache_control=SEGMENT_CACHE_CONTROL,
+    )
@@ -1,5 +1,6 @@
 from typing import Literal
 
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -10,6 +11,115 @@ class Settings(BaseSettings):
     S3_ACCESS_KEY: str
     S3_SECRET_KEY: str
     S3_BUCKET_NAME: str
+    S3_PUBLIC_ENDPOINT_URL: str | None = None
+    S3_STREAM_CHUNK_SIZE: int = 64 * 1024
+    S3_MAX_POOL_CONNECTIONS: int = 100
+    S3_KEEPALIVE_TIMEOUT: float = 60
+
+    SEGMENT_DELIVERY_MODE: Literal["proxy", "redirect"] = "proxy"
+    PRESIGNED_URL_EXPIRES: int = 600
+    PRESIGNED_URL_MIN_VALIDITY: int = 120
+    PRESIGNED_URL_CACHE_MAX_ITEMS: int = 100_000
+
+    PLAYLIST_SEGMENT_URLS: Literal["relative", "presigned", "cdn"] = "relative"
+    CDN_BASE_URL: str | None = None
+
+    HTTP_PLAYLIST_MAX_AGE: int = 10
+    HTTP_SEGMENT_MAX_AGE: int = 365 * 24 * 60 * 60
+
+    CACHE_PLAYLIST_MAX_BYTES: int = 32 * 1024 * 1024
+    CACHE_PLAYLIST_MAX_ITEM_BYTES: int = 1024 * 1024
+    # media-processor rewrites master playlists as renditions are added,
+    # so playlists are only kept briefly, in every tier
+    CACHE_PLAYLIST_TTL: float = 10
+    CACHE_SEGMENT_MAX_BYTES: int = 1024 * 1024 * 1024
+    CACHE_SEGMENT_MAX_ITEM_BYTES: int = 16 * 1024 * 1024
+    CACHE_REWRITTEN_PLAYLIST_MAX_ITEMS: int = 10_000
+    # aligned chunks of range requests and of objects too large to be cached whole
+    CACHE_RANGE_MAX_BYTES: int = 256 * 1024 * 1024
+    CACHE_RANGE_CHUNK_SIZE: int = 1024 * 1024
+    DISK_CACHE_DIR: str | None = None
+    DISK_CACHE_MAX_BYTES: int = 20 * 1024 * 1024 * 1024
+    DISK_CACHE_EVICTION_INTERVAL: float = 5
+    # share the disk tier between worker processes, e.g. with DISK_CACHE_DIR on /dev/shm;
+    # the per-worker memory tier then only needs to hold the hottest segments
+    DISK_CACHE_SHARED: bool = False
+
+    PORT: int = 8003
+    WORKERS: int = 1
+    # where workers write their metrics when WORKERS > 1, a temporary directory if unset
+    PROMETHEUS_MULTIPROC_DIR: str | None = None
+    SERVER_LOOP: Literal["auto", "asyncio", "uvloop"] = "uvloop"
+    SERVER_HTTP: Literal["auto", "h11", "httptools"] = "httptools"
+    SERVER_BACKLOG: int = 4096
+    SERVER_KEEP_ALIVE_TIMEOUT: int = 75
+    SERVER_LIMIT_CONCURRENCY: int | None = None
+    SERVER_ACCESS_LOG: bool = False
+    SERVER_FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+
+    # LL-HLS: live playlists are re-read this often while clients follow them
+    LIVE_POLL_INTERVAL: float = 0.1
+    LIVE_IDLE_TIMEOUT: float = 30
+    LIVE_PLAYLIST_MAX_AGE: int = 1
+    # responses to blocking reloads are tied to a msn/part in the URL, so they can be kept
+    LIVE_BLOCKING_PLAYLIST_MAX_AGE: int = 60
+
+    PREFETCH_DEPTH: int = 2
+    PREFETCH_MAX_CONCURRENCY: int = 8
+    PREFETCH_IDLE_TIMEOUT: float = 30
+
+    REDIS_HOST: str | None = None
+    REDIS_PORT: int = 6379
+    REDIS_PASS: str | None = None
+    REDIS_PLAYLIST_TTL: int = 30
+    REDIS_TIMEOUT: float = 0.5
+
+    # "host:port" of every replica, in the same form as the gateway's upstream servers
+    PEERS: list[str] = []
+    SELF_PEER: str | None = None
+    PEER_CONNECT_TIMEOUT: float = 0.5
+    PEER_READ_TIMEOUT: float = 5
+    # shared by the replicas, sent on every /internal request
+    PEER_TOKEN: str | None = None
+
+    ADMISSION_MAX_CONCURRENCY: int = 64
+    ADMISSION_MAX_QUEUE: int = 256
+    ADMISSION_QUEUE_TIMEOUT: float = 2
+    ADMISSION_RETRY_AFTER: int = 1
+
+    ADMIN_TOKEN: str | None = None
+    WARMUP_SEGMENTS: int = 5
+    WARMUP_CONCURRENCY: int = 8
+    WARMUP_JOB_TTL: int = 60 * 60
+    WARMUP_MAX_JOBS: int = 1000
+
+    @property
+    def REDIS_URL(self) -> str:
+        credentials = f"default:{self.REDIS_PASS}@" if self.REDIS_PASS else ""
+        return f"redis://{credentials}{self.REDIS_HOST}:{self.REDIS_PORT}/0"
+
+    @model_validator(mode="after")
+    def check_cdn_base_url(self):
+        if self.PLAYLIST_SEGMENT_URLS == "cdn" and not self.CDN_BASE_URL:
+            raise ValueError("CDN_BASE_URL is required when PLAYLIST_SEGMENT_URLS is 'cdn'")
+        return self
+
+    @model_validator(mode="after")
+    def check_self_peer(self):
+        if self.PEERS and self.SELF_PEER not in self.PEERS:
+            raise ValueError("SELF_PEER must be one of PEERS")
+        if self.PEERS and not self.PEER_TOKEN:
+            raise ValueError("PEER_TOKEN is required when PEERS is set")
+        return self
+
+    @model_validator(mode="after")
+    def check_disk_cache_workers(self):
+        # a per-process disk tier would evict and unlink files other workers are serving
+        if self.WORKERS > 1 and self.DISK_CACHE_DIR and not self.DISK_CACHE_SHARED:
+            raise ValueError(
+                "DISK_CACHE_SHARED is required when WORKERS > 1 and DISK_CACHE_DIR is set"
+            )
+        return self
 
     model_config = SettingsConfigDict(env_file=".env")
 
@@ -0,0 +1,120 @@
+from src.config import settings
+from src.adapters.cached_storage import CachedStorage
+from src.adapters.peer_storage import PeerStorage
+from src.adapters.s3_adapter import S3Adapter
+from src.metrics import ADMISSION_ACTIVE, ADMISSION_QUEUED, CACHE_SIZE, track
+from src.utils.admission import AdmissionController
+from src.utils.disk_cache import DiskCache
+from src.utils.hash_ring import HashRing
+from src.utils.live_playlists import LivePlaylistWatcher
+from src.utils.lru_cache import LRUCache
+from src.utils.prefetch import Prefetcher
+from src.utils.redis_cache import RedisCache
+from src.utils.shared_disk_cache import SharedDiskCache
+from src.utils.ttl_cache import TTLCache
+
+
+s3_storage = S3Adapter(
+    access_key=settings.S3_ACCESS_KEY,
+    secret_key=settings.S3_SECRET_KEY,
+    bucket_name=settings.S3_BUCKET_NAME,
+    endpoint_url=settings.S3_ENDPOINT_URL,
+    chunk_size=settings.S3_STREAM_CHUNK_SIZE,
+    max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+    keepalive_timeout=settings.S3_KEEPALIVE_TIMEOUT,
+    public_endpoint_url=settings.S3_PUBLIC_ENDPOINT_URL,
+)
+
+playlist_cache = LRUCache(
+    max_bytes=settings.CACHE_PLAYLIST_MAX_BYTES,
+    max_item_bytes=settings.CACHE_PLAYLIST_MAX_ITEM_BYTES,
+    ttl=settings.CACHE_PLAYLIST_TTL,
+)
+segment_cache = LRUCache(
+    max_bytes=settings.CACHE_SEGMENT_MAX_BYTES,
+    max_item_bytes=settings.CACHE_SEGMENT_MAX_ITEM_BYTES,
+)
+range_cache = (
+    LRUCache(max_bytes=settings.CACHE_RANGE_MAX_BYTES) if settings.CACHE_RANGE_MAX_BYTES else None
+)
+disk_cache = (
+    (SharedDiskCache if settings.DISK_CACHE_SHARED else DiskCache)(
+        directory=settings.DISK_CACHE_DIR,
+        max_bytes=settings.DISK_CACHE_MAX_BYTES,
+        eviction_interval=settings.DISK_CACHE_EVICTION_INTERVAL,
+    )
+    if settings.DISK_CACHE_DIR
+    else None
+)
+
+track(CACHE_SIZE.labels(tier="playlist"), lambda: playlist_cache.size_bytes)
+track(CACHE_SIZE.labels(tier="segment"), lambda: segment_cache.size_bytes)
+if range_cache is not None:
+    track(CACHE_SIZE.labels(tier="chunk"), lambda: range_cache.size_bytes)
+if disk_cache is not None:
+    track(CACHE_SIZE.labels(tier="disk"), lambda: disk_cache.size_bytes)
+
+admission = AdmissionController(
+    max_concurrency=settings.ADMISSION_MAX_CONCURRENCY,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+)
+track(ADMISSION_ACTIVE, lambda: admission.active)
+track(ADMISSION_QUEUED, lambda: admission.queued)
+
+shared_playlist_cache = (
+    RedisCache(
+        url=settings.REDIS_URL,
+        ttl=settings.REDIS_PLAYLIST_TTL,
+        max_item_bytes=settings.CACHE_PLAYLIST_MAX_ITEM_BYTES,
+        timeout=settings.REDIS_TIMEOUT,
+    )
+    if settings.REDIS_HOST
+    else None
+)
+
+peer_storage = (
+    PeerStorage(
+        storage=s3_storage,
+        ring=HashRing(settings.PEERS),
+        self_peer=settings.SELF_PEER,
+        token=settings.PEER_TOKEN,
+        chunk_size=settings.S3_STREAM_CHUNK_SIZE,
+        connect_timeout=settings.PEER_CONNECT_TIMEOUT,
+        read_timeout=settings.PEER_READ_TIMEOUT,
+    )
+    if settings.PEERS
+    else None
+)
+
+storage = CachedStorage(
+    storage=peer_storage or s3_storage,
+    playlist_cache=playlist_cache,
+    segment_cache=segment_cache,
+    presigned_urls=TTLCache(max_items=settings.PRESIGNED_URL_CACHE_MAX_ITEMS),
+    presigned_url_min_validity=settings.PRESIGNED_URL_MIN_VALIDITY,
+    disk_cache=disk_cache,
+    chunk_size=settings.S3_STREAM_CHUNK_SIZE,
+    admission=admission,
+    shared_playlist_cache=shared_playlist_cache,
+    range_cache=range_cache,
+    range_chunk_size=settings.CACHE_RANGE_CHUNK_SIZE,
+)
+
+rewritten_playlists = TTLCache(max_items=settings.CACHE_REWRITTEN_PLAYLIST_MAX_ITEMS)
+
+prefetcher = Prefetcher(
+    storage=storage,
+    depth=settings.PREFETCH_DEPTH,
+    max_concurrency=settings.PREFETCH_MAX_CONCURRENCY,
+    idle_timeout=settings.PREFETCH_IDLE_TIMEOUT,
+)
+
+# live playlists change in place, so they are read from S3 and never from the caches
+live_playlists = LivePlaylistWatcher(
+    storage=s3_storage,
+    poll_interval=settings.LIVE_POLL_INTERVAL,
+    idle_timeout=settings.LIVE_IDLE_TIMEOUT,
+)
+
+warmup_jobs = TTLCache(max_items=settings.WARMUP_MAX_JOBS)
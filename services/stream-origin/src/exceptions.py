@@ -16,8 +16,9 @@ class MasterHTTPException(HTTPException):
     status_code = 418
     detail = "I'm a teapot"
 
-    def __init__(self):
-        super().__init__(status_code=self.status_code, detail=self.detail)
+    def __init__(self, detail: str = None, headers: dict[str, str] | None = None):
+        self.detail = detail or self.detail
+        super().__init__(status_code=self.status_code, detail=self.detail, headers=headers)
 
 
 class ObjectNotFoundException(MasterException):
@@ -43,3 +44,71 @@ class SegmentNotFoundException(ObjectNotFoundException):
 
 class SegmentNotFoundHTTPException(ObjectNotFoundHTTPException):
     detail = "Segment not found"
+
+
+class RangeNotSatisfiableException(MasterException):
+    detail = "Requested range not satisfiable"
+
+    def __init__(self, detail: str = None, size: int | None = None):
+        self.size = size
+        super().__init__(detail)
+
+
+class RangeNotSatisfiableHTTPException(MasterHTTPException):
+    status_code = 416
+    detail = "Requested range not satisfiable"
+
+    def __init__(self, size: int | None = None):
+        headers = {"Content-Range": f"bytes */{size}"} if size is not None else None
+        super().__init__(headers=headers)
+
+
+class MultipleRangesException(MasterException):
+    detail = "Multiple ranges are not supported"
+
+
+class MultipleRangesHTTPException(RangeNotSatisfiableHTTPException):
+    detail = "Multiple ranges are not supported"
+
+
+class ServiceOverloadedException(MasterException):
+    detail = "Service is overloaded, try again later"
+
+
+class ServiceOverloadedHTTPException(MasterHTTPException):
+    status_code = 503
+    detail = "Service is overloaded, try again later"
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__(headers={"Retry-After": str(retry_after)})
+
+
+class InvalidBlockingReloadException(MasterException):
+    detail = "Invalid blocking playlist reload request"
+
+
+class InvalidBlockingReloadHTTPException(MasterHTTPException):
+    status_code = 400
+    detail = "Invalid blocking playlist reload request"
+
+
+class LiveStreamStalledException(MasterException):
+    detail = "Live stream did not advance in time"
+
+
+class LiveStreamStalledHTTPException(MasterHTTPException):
+    status_code = 503
+    detail = "Live stream did not advance in time"
+
+
+class WarmupJobNotFoundException(ObjectNotFoundException):
+    detail = "Warmup job not found"
+
+
+class WarmupJobNotFoundHTTPException(ObjectNotFoundHTTPException):
+    detail = "Warmup job not found"
+
+
+class PermissionDeniedHTTPException(MasterHTTPException):
+    status_code = 403
+    detail = "You do not have permission to access this resource"
@@ -1,11 +1,21 @@
 from abc import ABC, abstractmethod
 from typing import List
 
+from src.schemas.storage import ByteRange, ObjectStream, StorageObject
+
 
 class AbstractStorage(ABC):
     @abstractmethod
     async def get_file(self, key: str) -> bytes: ...
 
+    @abstractmethod
+    async def get_object(self, key: str) -> StorageObject: ...
+
+    @abstractmethod
+    async def get_file_stream(
+        self, key: str, byte_range: ByteRange | None = None
+    ) -> ObjectStream: ...
+
     @abstractmethod
     async def get_files_list(self, folder_path: str) -> List[dict]: ...
 
@@ -1,16 +1,62 @@
+import asyncio
+import os
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import multiprocess
 import uvicorn
 
+from src.api.admin import router as admin_router
+from src.api.internal import router as internal_router
+from src.api.live import router as live_router
+from src.api.metrics import router as metrics_router
 from src.api.video import router as stream_router
+from src.config import settings
+from src.container import (
+    disk_cache,
+    live_playlists,
+    peer_storage,
+    prefetcher,
+    s3_storage,
+    shared_playlist_cache,
+)
+from src.metrics import MULTIPROCESS, publish_tracked
+from src.middleware import MetricsMiddleware
+from src.server import run as run_server
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await s3_storage.connect()
+    if disk_cache is not None:
+        await disk_cache.start()
+    if shared_playlist_cache is not None:
+        await shared_playlist_cache.connect()
+    if peer_storage is not None:
+        await peer_storage.connect()
+    gauges = asyncio.create_task(publish_tracked()) if MULTIPROCESS else None
+    yield
+    if gauges is not None:
+        gauges.cancel()
+        # drops this worker's gauges from the merged metrics
+        multiprocess.mark_process_dead(os.getpid())
+    await prefetcher.stop()
+    await live_playlists.stop()
+    if peer_storage is not None:
+        await peer_storage.close()
+    if shared_playlist_cache is not None:
+        await shared_playlist_cache.close()
+    if disk_cache is not None:
+        await disk_cache.stop()
+    await s3_storage.close()
 
 
-app = FastAPI(title="Stream Origin")
+app = FastAPI(lifespan=lifespan, title="Stream Origin")
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -18,8 +64,16 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 app.include_router(stream_router)
+app.include_router(live_router)
+app.include_router(admin_router)
+app.include_router(metrics_router)
+app.include_router(internal_router)
 
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8003, reload=True)
+    if settings.MODE in ("LOCAL", "TEST"):
+        uvicorn.run("main:app", host="0.0.0.0", port=settings.PORT, reload=True)
+    else:
+        run_server()
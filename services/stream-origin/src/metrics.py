@@ -0,0 +1,137 @@
+import asyncio
+import os
+from collections.abc import Callable
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from src.enums import Quality
+
+
+# label values are derived from the object key, never the raw path, to keep cardinality bounded
+RENDITIONS = {quality.value for quality in Quality}
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = tuple(2**power for power in range(10, 26, 2))  # 1 KiB .. 32 MiB
+
+# with several workers (see src/server.py) each one writes its samples to files
+# in this directory, and /metrics merges them; gauges are then summed over live workers
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+REQUESTS_IN_FLIGHT = Gauge(
+    "origin_requests_in_flight",
+    "HTTP requests being served",
+    ["artefact"],
+    multiprocess_mode="livesum",
+)
+
+REQUEST_COUNT = Counter(
+    "origin_requests_total", "Total HTTP requests", ["artefact", "rendition", "status"]
+)
+
+REQUEST_LATENCY = Histogram(
+    "origin_request_duration_seconds",
+    "Time until the response body is fully sent",
+    ["artefact", "rendition"],
+    buckets=LATENCY_BUCKETS,
+)
+
+TIME_TO_FIRST_BYTE = Histogram(
+    "origin_time_to_first_byte_seconds",
+    "Time until the first body byte is sent",
+    ["artefact", "rendition"],
+    buckets=LATENCY_BUCKETS,
+)
+
+BYTES_SERVED = Histogram(
+    "origin_response_bytes",
+    "Response body size",
+    ["artefact", "rendition"],
+    buckets=SIZE_BUCKETS,
+)
+
+S3_IN_FLIGHT = Gauge(
+    "origin_s3_requests_in_flight",
+    "S3 requests waiting for a response",
+    ["artefact"],
+    multiprocess_mode="livesum",
+)
+
+S3_LATENCY = Histogram(
+    "origin_s3_request_duration_seconds",
+    "Time until S3 returns the response headers",
+    ["artefact", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+
+S3_ERRORS = Counter(
+    "origin_s3_errors_total", "Failed S3 requests", ["artefact", "operation", "code"]
+)
+
+CACHE_REQUESTS = Counter(
+    "origin_cache_requests_total", "Cache lookups", ["tier", "artefact", "rendition", "result"]
+)
+
+CACHE_SIZE = Gauge(
+    "origin_cache_size_bytes", "Bytes held by a cache tier", ["tier"], multiprocess_mode="livesum"
+)
+
+SINGLE_FLIGHT = Counter(
+    "origin_single_flight_total",
+    "Upstream fetches started (executed) or avoided by joining another one (deduplicated)",
+    ["artefact", "rendition", "result"],
+)
+
+ADMISSION_ACTIVE = Gauge(
+    "origin_admission_active", "Upstream fetches holding a slot", multiprocess_mode="livesum"
+)
+
+ADMISSION_QUEUED = Gauge(
+    "origin_admission_queued", "Upstream fetches waiting for a slot", multiprocess_mode="livesum"
+)
+
+ADMISSION_REJECTED = Counter(
+    "origin_admission_rejected_total", "Upstream fetches rejected", ["priority", "reason"]
+)
+
+PEER_REQUESTS = Counter(
+    "origin_peer_requests_total", "Reads forwarded to the owner replica", ["result"]
+)
+
+
+_tracked: list[tuple[Gauge, Callable[[], float]]] = []
+
+
+def track(gauge: Gauge, function: Callable[[], float]) -> None:
+    """
+    Report `function()` as the gauge value. The multiprocess collector only reads
+    the files, so with several workers the value is written there by `publish_tracked`
+    """
+    if MULTIPROCESS:
+        _tracked.append((gauge, function))
+    else:
+        gauge.set_function(function)
+
+
+async def publish_tracked(interval: float = 1) -> None:
+    while True:
+        for gauge, function in _tracked:
+            gauge.set(function())
+        await asyncio.sleep(interval)
+
+
+def classify(key: str) -> tuple[str, str]:
+    """
+    Map an object key or request path ({videos,live}/{id}/{rendition}/{name})
+    to (artefact, rendition)
+    """
+    parts = key.strip("/").split("/")
+    if len(parts) < 3 or parts[0] not in ("videos", "live"):
+        return "other", ""
+    name = parts[-1]
+    if name == "master.m3u8":
+        return "master", ""
+    rendition = parts[-2] if len(parts) >= 4 and parts[-2] in RENDITIONS else "other"
+    if name.endswith(".m3u8"):
+        return "index", rendition
+    return "segment", rendition
@@ -0,0 +1,67 @@
+from time import perf_counter
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.metrics import (
+    BYTES_SERVED,
+    REQUEST_COUNT,
+    REQUEST_LATENCY,
+    REQUESTS_IN_FLIGHT,
+    TIME_TO_FIRST_BYTE,
+    classify,
+)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: unlike BaseHTTPMiddleware it sees every body message,
+    so time-to-first-byte and bytes served are measured on what actually leaves the origin
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        artefact, rendition = classify(scope["path"])
+        start_time = perf_counter()
+        status = 500
+        sent_bytes = 0
+        content_length = 0
+        first_byte_time = None
+
+        async def send_wrapper(message: Message):
+            nonlocal status, sent_bytes, content_length, first_byte_time
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                content_length = int(dict(message.get("headers", [])).get(b"content-length", 0))
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                if body and first_byte_time is None:
+                    first_byte_time = perf_counter()
+                sent_bytes += len(body)
+            elif message["type"] == "http.response.pathsend":
+                # the server sends the file itself (FileResponse with the pathsend extension),
+                # so no body passes through here and its size comes from Content-Length
+                if content_length and first_byte_time is None:
+                    first_byte_time = perf_counter()
+                sent_bytes += content_length
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(artefact=artefact)
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            duration = perf_counter() - start_time
+            REQUEST_COUNT.labels(artefact=artefact, rendition=rendition, status=status).inc()
+            REQUEST_LATENCY.labels(artefact=artefact, rendition=rendition).observe(duration)
+            if first_byte_time is not None:
+                TIME_TO_FIRST_BYTE.labels(artefact=artefact, rendition=rendition).observe(
+                    first_byte_time - start_time
+                )
+            BYTES_SERVED.labels(artefact=artefact, rendition=rendition).observe(sent_bytes)
@@ -0,0 +1,31 @@
+from dataclasses import dataclass, field
+
+from src.schemas.storage import StorageObject
+
+
+@dataclass(slots=True)
+class LivePlaylist:
+    """
+    A version of a live media playlist and the LL-HLS state needed to answer
+    blocking playlist reloads and preload hint requests
+    """
+
+    item: StorageObject
+    media_sequence: int = 0
+    # media sequence number of the segment being produced, i.e. one past the last full segment
+    next_msn: int = 0
+    # partial segments of `next_msn` published so far
+    parts: int = 0
+    target_duration: float = 0
+    part_target: float | None = None
+    ended: bool = False
+    uris: set[str] = field(default_factory=set)
+    preload_hints: set[str] = field(default_factory=set)
+
+    def has(self, msn: int, part: int | None = None) -> bool:
+        """
+        Whether the playlist contains media segment `msn`, or its partial segment `part`
+        """
+        if self.ended or msn < self.next_msn:
+            return True
+        return part is not None and msn == self.next_msn and part < self.parts
@@ -0,0 +1,113 @@
+import inspect
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable
+
+from src.exceptions import MultipleRangesException, RangeNotSatisfiableException
+
+
+@dataclass(slots=True)
+class ObjectInfo:
+    key: str
+    size: int
+    etag: str | None = None
+    last_modified: datetime | None = None
+
+
+@dataclass(slots=True)
+class ByteRange:
+    """
+    Single HTTP byte range, end is inclusive.
+    A range with no start is a suffix range (the last `end` bytes).
+    """
+
+    start: int | None
+    end: int | None
+
+    @classmethod
+    def from_header(cls, value: str | None) -> "ByteRange | None":
+        """
+        Parse a Range header value. Malformed values are ignored as RFC 9110 requires,
+        so the caller falls back to sending the whole object.
+        """
+        if not value:
+            return None
+        unit, _, ranges = value.partition("=")
+        if unit.strip().lower() != "bytes":
+            return None
+        if "," in ranges:
+            raise MultipleRangesException
+
+        start, sep, end = (part.strip() for part in ranges.partition("-"))
+        if not sep or not (start or end) or not all(p.isdigit() for p in (start, end) if p):
+            return None
+        if start and end and int(start) > int(end):
+            return None
+        return cls(start=int(start) if start else None, end=int(end) if end else None)
+
+    def to_header(self) -> str:
+        start = "" if self.start is None else self.start
+        end = "" if self.end is None else self.end
+        return f"bytes={start}-{end}"
+
+    def resolve(self, size: int) -> "ByteRange":
+        """
+        Return the concrete range for an object of the given size
+        """
+        if self.start is None:
+            if not self.end:
+                raise RangeNotSatisfiableException(size=size)
+            return ByteRange(start=max(size - self.end, 0), end=size - 1)
+        if self.start >= size:
+            raise RangeNotSatisfiableException(size=size)
+        end = size - 1 if self.end is None else min(self.end, size - 1)
+        return ByteRange(start=self.start, end=end)
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start + 1
+
+    def content_range(self, size: int) -> str:
+        return f"bytes {self.start}-{self.end}/{size}"
+
+
+@dataclass(slots=True)
+class ObjectStream:
+    """
+    Opened storage object which yields its body chunk by chunk.
+    For a partial read `byte_range` holds the resolved range and `info.size` the full size.
+    `path` is set when the body is also available as a local file.
+    `on_close` runs (and is awaited if it is a coroutine function) once the stream is closed,
+    even if it was never read, so it must release everything the stream holds.
+    """
+
+    info: ObjectInfo
+    chunks: AsyncIterator[bytes]
+    byte_range: ByteRange | None = None
+    path: Path | None = None
+    on_close: Callable[[], Awaitable[None] | None] | None = None
+
+    @property
+    def content_length(self) -> int:
+        if self.byte_range is not None:
+            return self.byte_range.length
+        return self.info.size
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self.chunks
+
+    async def aclose(self) -> None:
+        try:
+            await self.chunks.aclose()
+        finally:
+            if self.on_close is not None:
+                result = self.on_close()
+                if inspect.isawaitable(result):
+                    await result
+
+
+@dataclass(slots=True)
+class StorageObject:
+    info: ObjectInfo
+    data: bytes
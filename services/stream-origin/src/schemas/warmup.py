@@ -0,0 +1,42 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Literal
+from uuid import UUID
+
+
+@dataclass(slots=True)
+class WarmupJob:
+    id: UUID
+    video_id: UUID
+    segments_per_rendition: int
+    status: Literal["running", "done", "failed"] = "running"
+    total: int = 0
+    warmed: int = 0
+    failed: int = 0
+    error: str | None = None
+    task: asyncio.Task | None = field(default=None, repr=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "video_id": self.video_id,
+            "segments_per_rendition": self.segments_per_rendition,
+            "status": self.status,
+            "total": self.total,
+            "warmed": self.warmed,
+            "failed": self.failed,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "WarmupJob":
+        return cls(
+            id=UUID(data["id"]),
+            video_id=UUID(data["video_id"]),
+            segments_per_rendition=data["segments_per_rendition"],
+            status=data["status"],
+            total=data["total"],
+            warmed=data["warmed"],
+            failed=data["failed"],
+            error=data["error"],
+        )
@@ -0,0 +1,57 @@
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import uvicorn
+
+from src.config import settings
+
+
+log = logging.getLogger(__name__)
+
+
+def prepare_workers() -> None:
+    """
+    Workers are separate processes, each with its own memory. Metrics are merged through
+    files (see src/metrics.py). Warm-up jobs are shared through Redis, when it is configured
+    """
+    directory = Path(
+        settings.PROMETHEUS_MULTIPROC_DIR or tempfile.mkdtemp(prefix="stream-origin-metrics-")
+    )
+    directory.mkdir(parents=True, exist_ok=True)
+    # samples left by a previous run would be merged with the new ones
+    for path in directory.glob("*.db"):
+        path.unlink()
+    # inherited by the workers, which import prometheus_client after it is set
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(directory)
+    if not settings.REDIS_HOST:
+        log.warning(
+            f"{settings.WORKERS} workers without REDIS_HOST: "
+            "a warm-up job can only be looked up on the worker that started it"
+        )
+
+
+def run() -> None:
+    """
+    Production entry point: no reloader, uvloop and httptools, and a keep-alive timeout
+    longer than the gateway's upstream keepalive_timeout, so nginx never reuses
+    a connection the origin is about to close
+    """
+    if settings.WORKERS > 1:
+        prepare_workers()
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=settings.PORT,
+        workers=settings.WORKERS,
+        loop=settings.SERVER_LOOP,
+        http=settings.SERVER_HTTP,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE_TIMEOUT,
+        limit_concurrency=settings.SERVER_LIMIT_CONCURRENCY,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+        access_log=settings.SERVER_ACCESS_LOG,
+        server_header=False,
+    )
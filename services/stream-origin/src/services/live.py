@@ -0,0 +1,111 @@
+from uuid import UUID
+
+from src.enums import Quality
+from src.exceptions import (
+    InvalidBlockingReloadException,
+    LiveStreamStalledException,
+    ObjectNotFoundException,
+    PlaylistNotFoundException,
+    SegmentNotFoundException,
+)
+from src.interfaces.storage import AbstractStorage
+from src.schemas.live import LivePlaylist
+from src.schemas.storage import ByteRange, ObjectStream, StorageObject
+from src.services.base import BaseService
+from src.utils.live_playlists import LivePlaylistWatcher
+
+
+class LiveService(BaseService):
+    """
+    Live streams packaged as LL-HLS under live/{stream_id}/. Media playlists come from
+    the watcher, segments and partial segments are immutable once written and go through
+    the regular cached storage.
+    """
+
+    # how long a blocking request may be held, in target durations (RFC 8216bis, 6.2.5.2)
+    BLOCKING_TIMEOUT_TARGET_DURATIONS = 3
+
+    def __init__(self, storage: AbstractStorage, playlists: LivePlaylistWatcher):
+        super().__init__(storage)
+        self.playlists = playlists
+
+    async def get_master_playlist(self, stream_id: UUID) -> StorageObject:
+        key = f"live/{stream_id}/master.m3u8"
+        try:
+            playlist = await self.storage.get_object(key)
+        except ObjectNotFoundException:
+            raise PlaylistNotFoundException
+        return playlist
+
+    async def get_media_playlist(
+        self,
+        stream_id: UUID,
+        quality: Quality,
+        msn: int | None = None,
+        part: int | None = None,
+    ) -> LivePlaylist:
+        """
+        Current media playlist, or with `msn` (and `part`) the first version containing
+        that segment (or partial segment), waiting for it if needed
+        """
+        if part is not None and msn is None:
+            raise InvalidBlockingReloadException(detail="_HLS_part requires _HLS_msn")
+
+        key = f"live/{stream_id}/{quality}/index.m3u8"
+        playlist = await self._get_playlist(key)
+        if msn is None or playlist.has(msn, part):
+            return playlist
+        if msn > playlist.next_msn + 1:
+            raise InvalidBlockingReloadException(
+                detail="_HLS_msn is more than two segments ahead of the playlist"
+            )
+        try:
+            return await self.playlists.wait_for(
+                key, lambda current: current.has(msn, part), self._blocking_timeout(playlist)
+            )
+        except TimeoutError:
+            raise LiveStreamStalledException
+
+    async def get_media(
+        self,
+        stream_id: UUID,
+        quality: Quality,
+        name: str,
+        byte_range: ByteRange | None = None,
+    ) -> ObjectStream:
+        key = f"live/{stream_id}/{quality}/{name}"
+        try:
+            return await self.storage.get_file_stream(key, byte_range)
+        except ObjectNotFoundException:
+            pass
+
+        # players request the part announced by EXT-X-PRELOAD-HINT before it is written,
+        # hold them until the playlist lists it
+        playlist_key = f"live/{stream_id}/{quality}/index.m3u8"
+        try:
+            playlist = await self.playlists.get(playlist_key)
+        except ObjectNotFoundException:
+            raise SegmentNotFoundException
+        if name not in playlist.preload_hints:
+            raise SegmentNotFoundException
+        try:
+            await self.playlists.wait_for(
+                playlist_key,
+                lambda current: name in current.uris or name not in current.preload_hints,
+                self._blocking_timeout(playlist),
+            )
+        except TimeoutError:
+            raise LiveStreamStalledException
+        try:
+            return await self.storage.get_file_stream(key, byte_range)
+        except ObjectNotFoundException:
+            raise SegmentNotFoundException
+
+    async def _get_playlist(self, key: str) -> LivePlaylist:
+        try:
+            return await self.playlists.get(key)
+        except ObjectNotFoundException:
+            raise PlaylistNotFoundException
+
+    def _blocking_timeout(self, playlist: LivePlaylist) -> float:
+        return self.BLOCKING_TIMEOUT_TARGET_DURATIONS * (playlist.target_duration or 1)
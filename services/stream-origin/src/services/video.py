@@ -1,40 +1,117 @@
+from hashlib import md5
 from uuid import UUID
 
+from src.config import settings
 from src.enums import Quality
 from src.exceptions import (
     ObjectNotFoundException,
     PlaylistNotFoundException,
     SegmentNotFoundException,
 )
+from src.interfaces.storage import AbstractStorage
+from src.schemas.storage import ByteRange, ObjectInfo, ObjectStream, StorageObject
 from src.services.base import BaseService
+from src.utils.playlists import rewrite_uris
+from src.utils.prefetch import Prefetcher
+from src.utils.ttl_cache import TTLCache
 
 
 class VideoService(BaseService):
-    async def get_master_playlist(self, video_id: UUID):
+    def __init__(
+        self,
+        storage: AbstractStorage,
+        rewritten_playlists: TTLCache | None = None,
+        prefetcher: Prefetcher | None = None,
+        url_signer: AbstractStorage | None = None,
+    ):
+        super().__init__(storage)
+        self.rewritten_playlists = rewritten_playlists
+        self.prefetcher = prefetcher
+        # signs the URLs of rewritten playlists; must not reuse cached URLs, which may be
+        # close to expiring while the playlist is cached for a full TTL
+        self.url_signer = url_signer or storage
+
+    async def get_master_playlist(self, video_id: UUID) -> StorageObject:
         key = f"videos/{video_id}/master.m3u8"
         try:
-            playlist = await self.storage.get_file(key)
+            playlist = await self.storage.get_object(key)
         except ObjectNotFoundException:
             raise PlaylistNotFoundException
         return playlist
 
-    async def get_index_playlist(self, video_id: UUID, quality: Quality):
+    async def get_index_playlist(self, video_id: UUID, quality: Quality) -> StorageObject:
         key = f"videos/{video_id}/{quality}/index.m3u8"
+        mode = settings.PLAYLIST_SEGMENT_URLS
+        if mode == "relative":
+            return await self._get_playlist(key)
+
+        cache_key = f"{mode}:{key}"
+        if self.rewritten_playlists is not None:
+            playlist = self.rewritten_playlists.get(cache_key)
+            if playlist is not None:
+                return playlist
+
+        playlist = await self._get_playlist(key)
+        playlist = await self._rewrite_segment_urls(playlist, base_key=key.rpartition("/")[0])
+        if self.rewritten_playlists is not None:
+            # the URLs inside were just signed, so they outlive the cached copy and the
+            # clients' max-age; the playlist itself may be rewritten like any other
+            ttl = min(
+                settings.PRESIGNED_URL_EXPIRES - settings.PRESIGNED_URL_MIN_VALIDITY,
+                settings.CACHE_PLAYLIST_TTL,
+            )
+            self.rewritten_playlists.set(cache_key, playlist, ttl=ttl)
+        return playlist
+
+    async def _get_playlist(self, key: str) -> StorageObject:
         try:
-            playlist = await self.storage.get_file(key)
+            playlist = await self.storage.get_object(key)
         except ObjectNotFoundException:
             raise PlaylistNotFoundException
         return playlist
 
-    async def get_segment(self, video_id: UUID, quality: Quality, segment_name: str):
+    async def _rewrite_segment_urls(self, playlist: StorageObject, base_key: str) -> StorageObject:
+        """
+        Turn relative segment URIs into absolute CDN or presigned storage URLs,
+        so players fetch segments without going through the origin
+        """
+
+        async def resolve(uri: str) -> str:
+            segment_key = f"{base_key}/{uri}"
+            if settings.PLAYLIST_SEGMENT_URLS == "cdn":
+                return f"{settings.CDN_BASE_URL.rstrip('/')}/{segment_key}"
+            return await self.url_signer.generate_presigned_url(
+                segment_key, expires=settings.PRESIGNED_URL_EXPIRES
+            )
+
+        data = (await rewrite_uris(playlist.data.decode(), resolve)).encode()
+        info = ObjectInfo(
+            key=playlist.info.key,
+            size=len(data),
+            etag=f'"{md5(data).hexdigest()}"',
+            last_modified=playlist.info.last_modified,
+        )
+        return StorageObject(info=info, data=data)
+
+    async def get_segment(
+        self,
+        video_id: UUID,
+        quality: Quality,
+        segment_name: str,
+        byte_range: ByteRange | None = None,
+    ) -> ObjectStream:
         key = f"videos/{video_id}/{quality}/{segment_name}"
         try:
-            segment = await self.storage.get_file(key)
+            segment = await self.storage.get_file_stream(key, byte_range)
         except ObjectNotFoundException:
             raise SegmentNotFoundException
+        if self.prefetcher is not None:
+            self.prefetcher.on_segment(video_id, quality, segment_name)
         return segment
 
-    async def get_segment_url(self, video_id: UUID, quality: Quality, segment_name: str):
+    async def get_segment_url(
+        self, video_id: UUID, quality: Quality, segment_name: str, expires: int = 600
+    ) -> str | None:
         key = f"videos/{video_id}/{quality}/{segment_name}"
-        url = await self.storage.generate_presigned_url(key, expires=600)
+        url = await self.storage.generate_presigned_url(key, expires=expires)
         return url
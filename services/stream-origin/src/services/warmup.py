@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from uuid import UUID, uuid4
+
+from src.adapters.cached_storage import CachedStorage
+from src.exceptions import (
+    ObjectNotFoundException,
+    PlaylistNotFoundException,
+    WarmupJobNotFoundException,
+)
+from src.schemas.warmup import WarmupJob
+from src.services.base import BaseService
+from src.utils.playlists import get_uris, is_absolute
+from src.utils.redis_cache import RedisCache
+from src.utils.ttl_cache import TTLCache
+
+
+log = logging.getLogger(__name__)
+
+
+class WarmupService(BaseService):
+    """
+    Preloads a title into the origin caches before it gets traffic:
+    master playlist, every variant playlist and the first segments of each rendition.
+
+    A job runs in the worker that started it. With `shared_jobs` its progress is also
+    published to Redis, so any worker can report it.
+    """
+
+    # the event loop only keeps weak references to tasks, and the job cache may drop a job
+    # before it finishes; services are created per request, so the set is shared
+    _tasks: set[asyncio.Task] = set()
+
+    def __init__(
+        self,
+        storage: CachedStorage,
+        jobs: TTLCache,
+        concurrency: int,
+        job_ttl: int,
+        shared_jobs: RedisCache | None = None,
+    ):
+        super().__init__(storage)
+        self.jobs = jobs
+        self.concurrency = concurrency
+        self.job_ttl = job_ttl
+        self.shared_jobs = shared_jobs
+
+    async def start(self, video_id: UUID, segments: int) -> WarmupJob:
+        """
+        Read the playlists up front (so a missing title fails the request)
+        and warm the segments in the background
+        """
+        base_key = f"videos/{video_id}"
+        try:
+            master = await self.storage.get_file(f"{base_key}/master.m3u8")
+        except ObjectNotFoundException:
+            raise PlaylistNotFoundException
+
+        segment_keys = []
+        for variant_uri in get_uris(master.decode()):
+            if is_absolute(variant_uri):
+                continue
+            variant_key = f"{base_key}/{variant_uri}"
+            try:
+                variant = await self.storage.get_file(variant_key)
+            except ObjectNotFoundException:
+                log.warning(f"Warmup: variant playlist {variant_key} not found")
+                continue
+            rendition_key = variant_key.rpartition("/")[0]
+            segment_uris = [uri for uri in get_uris(variant.decode()) if not is_absolute(uri)]
+            segment_keys.extend(f"{rendition_key}/{uri}" for uri in segment_uris[:segments])
+
+        job = WarmupJob(
+            id=uuid4(),
+            video_id=video_id,
+            segments_per_rendition=segments,
+            total=len(segment_keys),
+        )
+        job.task = asyncio.create_task(self._run(job, segment_keys))
+        self._tasks.add(job.task)
+        job.task.add_done_callback(self._tasks.discard)
+        self.jobs.set(str(job.id), job, ttl=self.job_ttl)
+        await self._publish(job)
+        return job
+
+    async def get_job(self, job_id: UUID) -> WarmupJob:
+        job = self.jobs.get(str(job_id))
+        if job is None and self.shared_jobs is not None:
+            data = await self.shared_jobs.get_json(f"warmup:{job_id}")
+            job = WarmupJob.from_dict(data) if data is not None else None
+        if job is None:
+            raise WarmupJobNotFoundException
+        return job
+
+    async def _publish(self, job: WarmupJob) -> None:
+        if self.shared_jobs is not None:
+            await self.shared_jobs.set_json(f"warmup:{job.id}", job.to_dict(), ttl=self.job_ttl)
+
+    async def _run(self, job: WarmupJob, keys: list[str]) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def warm(key: str) -> None:
+            async with semaphore:
+                try:
+                    await self.storage.warm(key)
+                    job.warmed += 1
+                except Exception as exc:
+                    job.failed += 1
+                    log.warning(f"Warmup: failed to warm {key}: {exc}")
+                await self._publish(job)
+
+        try:
+            await asyncio.gather(*(warm(key) for key in keys))
+        except Exception as exc:
+            job.status = "failed"
+            job.error = str(exc)
+            await self._publish(job)
+            raise
+        job.status = "done"
+        await self._publish(job)
+        log.info(f"Warmup: video {job.video_id} finished, {job.warmed}/{job.total} objects warmed")
@@ -0,0 +1,106 @@
+import asyncio
+from collections import deque
+from enum import IntEnum
+
+from src.exceptions import ServiceOverloadedException
+from src.metrics import ADMISSION_REJECTED
+
+
+class Priority(IntEnum):
+    PLAYLIST = 0
+    SEGMENT = 1
+    BACKGROUND = 2
+
+
+class AdmissionSlot:
+    """
+    Held for the lifetime of one upstream fetch. Releasing it more than once is a no-op,
+    so it can be tied both to the end of the body and to closing the stream.
+    """
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release()
+
+
+class AdmissionController:
+    """
+    Limits concurrent upstream fetches. Callers over the limit wait in a bounded queue
+    ordered by priority (playlists first, so players can still step down to a lower rendition);
+    when the queue is full or the wait times out they are rejected instead of piling up.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: dict[Priority, deque[asyncio.Future]] = {p: deque() for p in Priority}
+
+    @property
+    def queued(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    async def acquire(self, priority: Priority) -> AdmissionSlot:
+        if self.active < self.max_concurrency and not self._has_waiters(priority):
+            self.active += 1
+            return AdmissionSlot(self)
+
+        if self.queued >= self.max_queue and not self._shed_lower(priority):
+            ADMISSION_REJECTED.labels(priority=priority.name.lower(), reason="queue_full").inc()
+            raise ServiceOverloadedException
+
+        future = asyncio.get_running_loop().create_future()
+        waiters = self._waiters[priority]
+        waiters.append(future)
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._pass_on_handoff(future)
+            ADMISSION_REJECTED.labels(priority=priority.name.lower(), reason="timeout").inc()
+            raise ServiceOverloadedException
+        except BaseException:
+            self._pass_on_handoff(future)
+            raise
+        finally:
+            if future in waiters:
+                waiters.remove(future)
+        return AdmissionSlot(self)
+
+    def _pass_on_handoff(self, future: asyncio.Future) -> None:
+        # the slot can be handed over in the same loop iteration as the timeout or
+        # the cancellation that ends the wait; it then goes to the next waiter
+        if future.done() and not future.cancelled() and future.exception() is None:
+            self._release()
+
+    def _has_waiters(self, priority: Priority) -> bool:
+        return any(self._waiters[p] for p in Priority if p <= priority)
+
+    def _shed_lower(self, priority: Priority) -> bool:
+        """
+        Make room in a full queue by rejecting the newest waiter of a lower priority
+        """
+        for p in reversed(Priority):
+            if p <= priority:
+                return False
+            if self._waiters[p]:
+                self._waiters[p].pop().set_exception(ServiceOverloadedException())
+                ADMISSION_REJECTED.labels(priority=p.name.lower(), reason="shed").inc()
+                return True
+        return False
+
+    def _release(self) -> None:
+        for p in Priority:
+            waiters = self._waiters[p]
+            while waiters:
+                future = waiters.popleft()
+                if not future.done():
+                    # the slot passes to the waiter directly, so `active` does not change
+                    future.set_result(None)
+                    return
+        self.active -= 1
@@ -0,0 +1,225 @@
+import asyncio
+import json
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime
+from hashlib import sha256
+from pathlib import Path
+from uuid import uuid4
+
+from src.schemas.storage import ObjectInfo, StorageObject
+
+
+log = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """
+    Local disk tier for immutable objects. Bodies are written once and then served
+    straight from the file system.
+
+    Each object is stored under the sha256 of its key (so request paths never reach the
+    file system) next to a `.json` sidecar with its metadata. The sidecar is written last
+    and acts as the commit marker, so `load()` can rebuild the index after a restart.
+
+    The index is kept in LRU order and a background task evicts the least recently used
+    files once the size cap is exceeded. Evicted files are unlinked one cycle later,
+    so a response that is just about to open the file still finds it.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int,
+        eviction_interval: float = 5,
+        low_watermark: float = 0.9,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.eviction_interval = eviction_interval
+        self.low_watermark = low_watermark
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self._index: OrderedDict[str, ObjectInfo] = OrderedDict()
+        self._pending_unlink: set[str] = set()
+        self._over_budget = asyncio.Event()
+        self._evictor: asyncio.Task | None = None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    async def contains(self, key: str) -> bool:
+        return key in self
+
+    def path_for(self, key: str) -> Path:
+        digest = sha256(key.encode()).hexdigest()
+        return self.directory / digest[:2] / digest[2:4] / digest
+
+    async def get(self, key: str) -> tuple[Path, ObjectInfo] | None:
+        info = self._index.get(key)
+        if info is None:
+            self.misses += 1
+            return None
+        self._index.move_to_end(key)
+        self.hits += 1
+        return self.path_for(key), info
+
+    async def delete(self, key: str) -> None:
+        self._discard(key)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._index if key.startswith(prefix)]:
+            self._discard(key)
+
+    def _discard(self, key: str) -> None:
+        info = self._index.pop(key, None)
+        if info is not None:
+            self.size_bytes -= info.size
+            # unlinked on the next cycle, like evicted files
+            self._pending_unlink.add(key)
+
+    async def put(self, item: StorageObject) -> None:
+        key = item.info.key
+        if key in self._index or key in self._pending_unlink or item.info.size > self.max_bytes:
+            return
+        try:
+            await asyncio.to_thread(self._write, item)
+        except OSError as exc:
+            log.warning(f"Disk cache: failed to write {key}: {exc}")
+            return
+        self._add(item.info)
+
+    def _add(self, info: ObjectInfo) -> None:
+        if info.key in self._index:
+            return
+        self._index[info.key] = info
+        self.size_bytes += info.size
+        if self.size_bytes > self.max_bytes:
+            self._over_budget.set()
+
+    async def start(self) -> None:
+        await self.load()
+        self._evictor = asyncio.create_task(self._run_evictor())
+
+    async def stop(self) -> None:
+        if self._evictor is not None:
+            self._evictor.cancel()
+            try:
+                await self._evictor
+            except asyncio.CancelledError:
+                pass
+            self._evictor = None
+
+    async def load(self) -> None:
+        """
+        Rebuild the index from the files left by a previous run
+        """
+        entries = await asyncio.to_thread(self._scan)
+        for info in entries:
+            self._add(info)
+        log.info(
+            f"Disk cache: loaded {len(self._index)} objects ({self.size_bytes} bytes) "
+            f"from {self.directory}"
+        )
+
+    def _scan(self) -> list[ObjectInfo]:
+        """
+        Read every committed sidecar and drop leftovers of interrupted writes.
+        Entries are returned least recently used first (by access time).
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for path in self.directory.glob("*/*/*"):
+            if path.name.endswith(".tmp"):
+                path.unlink(missing_ok=True)
+                continue
+            if path.suffix != ".json":
+                if not path.with_suffix(".json").exists():
+                    path.unlink(missing_ok=True)
+                continue
+            data_path = path.with_suffix("")
+            try:
+                info = self._read_meta(path)
+                stat = data_path.stat()
+            except (OSError, ValueError, KeyError) as exc:
+                log.warning(f"Disk cache: dropping broken entry {path}: {exc}")
+                path.unlink(missing_ok=True)
+                data_path.unlink(missing_ok=True)
+                continue
+            if stat.st_size != info.size or self.path_for(info.key) != data_path:
+                path.unlink(missing_ok=True)
+                data_path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_atime, info))
+        entries.sort(key=lambda entry: entry[0])
+        return [info for _, info in entries]
+
+    async def _run_evictor(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._over_budget.wait(), timeout=self.eviction_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._over_budget.clear()
+
+            # files evicted on the previous cycle are no longer referenced by any response
+            if self._pending_unlink:
+                paths = [self.path_for(key) for key in self._pending_unlink]
+                await asyncio.to_thread(self._unlink, paths)
+                self._pending_unlink.clear()
+            self._evict()
+
+    def _evict(self) -> None:
+        target = self.max_bytes * self.low_watermark
+        while self._index and self.size_bytes > target:
+            key, info = self._index.popitem(last=False)
+            self.size_bytes -= info.size
+            self.evictions += 1
+            self.evicted_bytes += info.size
+            self._pending_unlink.add(key)
+
+    @staticmethod
+    def _unlink(paths: list[Path]) -> None:
+        for path in paths:
+            path.with_suffix(".json").unlink(missing_ok=True)
+            path.unlink(missing_ok=True)
+
+    def _write(self, item: StorageObject) -> None:
+        path = self.path_for(item.info.key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "key": item.info.key,
+            "size": item.info.size,
+            "etag": item.info.etag,
+            "last_modified": item.info.last_modified.isoformat()
+            if item.info.last_modified
+            else None,
+        }
+        self._write_atomic(path, item.data)
+        self._write_atomic(path.with_suffix(".json"), json.dumps(meta).encode())
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        tmp_path = path.with_name(f".{path.name}.{uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def _read_meta(meta_path: Path) -> ObjectInfo:
+        meta = json.loads(meta_path.read_bytes())
+        last_modified = meta.get("last_modified")
+        return ObjectInfo(
+            key=meta["key"],
+            size=meta["size"],
+            etag=meta.get("etag"),
+            last_modified=datetime.fromisoformat(last_modified) if last_modified else None,
+        )
@@ -0,0 +1,36 @@
+from bisect import bisect_left
+from zlib import crc32
+
+
+class HashRing:
+    """
+    Consistent hash ring laid out like nginx's `hash ... consistent` (ketama) upstream:
+    160 points per server, each the crc32 of "host\\0port" chained with the previous point.
+    With the same server list as the gateway, the origin picks the same owner for a key
+    as nginx does, so peer hops only happen while the two configurations disagree.
+    """
+
+    POINTS_PER_SERVER = 160
+
+    def __init__(self, servers: list[str]):
+        self.servers = list(servers)
+        points: dict[int, str] = {}
+        for server in self.servers:
+            host, _, port = server.rpartition(":")
+            if not host:
+                host, port = port, ""
+            base_hash = crc32(host.encode() + b"\0" + port.encode())
+            prev_hash = 0
+            for _ in range(self.POINTS_PER_SERVER):
+                point = crc32(prev_hash.to_bytes(4, "little"), base_hash)
+                # on collisions nginx keeps the first server
+                points.setdefault(point, server)
+                prev_hash = point
+        self._hashes = sorted(points)
+        self._servers = [points[point] for point in self._hashes]
+
+    def get_server(self, key: str) -> str | None:
+        if not self._hashes:
+            return None
+        index = bisect_left(self._hashes, crc32(key.encode()))
+        return self._servers[index % len(self._servers)]
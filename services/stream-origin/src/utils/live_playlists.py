@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable
+
+from src.exceptions import ObjectNotFoundException
+from src.interfaces.storage import AbstractStorage
+from src.schemas.live import LivePlaylist
+from src.utils.playlists import parse_live_playlist
+from src.utils.single_flight import SingleFlight
+
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class _Watch:
+    playlist: LivePlaylist
+    used_at: float
+    changed: asyncio.Condition = field(default_factory=asyncio.Condition)
+    waiters: int = 0
+    task: asyncio.Task | None = None
+
+
+class LivePlaylistWatcher:
+    """
+    Follows live playlists while a packager keeps rewriting them.
+
+    One polling task per playlist, shared by every request for it, re-reads the playlist
+    from the storage every `poll_interval` seconds and wakes the requests waiting for
+    a segment, a partial segment or a hinted URI to appear. Polling stops once the playlist
+    ends or nobody has asked for it in `idle_timeout` seconds.
+
+    The storage must not cache: live playlists change in place under the same key.
+    """
+
+    def __init__(self, storage: AbstractStorage, poll_interval: float, idle_timeout: float = 30):
+        self.storage = storage
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.flights = SingleFlight()
+        self._watches: dict[str, _Watch] = {}
+
+    async def get(self, key: str) -> LivePlaylist:
+        """
+        Latest known version of the playlist, loaded and followed from the first call on
+        """
+        watch = await self._watch(key)
+        return watch.playlist
+
+    async def wait_for(
+        self, key: str, predicate: Callable[[LivePlaylist], bool], timeout: float
+    ) -> LivePlaylist:
+        """
+        Wait until a version of the playlist satisfies `predicate`.
+        Raises TimeoutError if none does within `timeout` seconds.
+        """
+        watch = await self._watch(key)
+        watch.waiters += 1
+        try:
+            async with asyncio.timeout(timeout):
+                async with watch.changed:
+                    await watch.changed.wait_for(lambda: predicate(watch.playlist))
+        finally:
+            watch.waiters -= 1
+            watch.used_at = time.monotonic()
+        return watch.playlist
+
+    async def _watch(self, key: str) -> _Watch:
+        watch = self._watches.get(key)
+        if watch is None:
+            playlist, _ = await self.flights.do(key, partial(self._load, key))
+            # concurrent first requests share the load, the first one to resume starts polling
+            watch = self._watches.get(key)
+            if watch is None:
+                watch = _Watch(playlist=playlist, used_at=time.monotonic())
+                if not playlist.ended:
+                    self._watches[key] = watch
+                    watch.task = asyncio.create_task(self._poll(key, watch))
+        watch.used_at = time.monotonic()
+        return watch
+
+    async def _load(self, key: str) -> LivePlaylist:
+        item = await self.storage.get_object(key)
+        return parse_live_playlist(item)
+
+    async def _poll(self, key: str, watch: _Watch) -> None:
+        try:
+            while watch.waiters or time.monotonic() - watch.used_at < self.idle_timeout:
+                await asyncio.sleep(self.poll_interval)
+                try:
+                    playlist = await self._load(key)
+                except ObjectNotFoundException:
+                    # being replaced, keep the last version
+                    continue
+                except Exception as exc:
+                    log.warning(f"Live: failed to reload {key}: {exc}")
+                    continue
+                if playlist.item.data == watch.playlist.item.data:
+                    continue
+                async with watch.changed:
+                    watch.playlist = playlist
+                    watch.changed.notify_all()
+                if playlist.ended:
+                    break
+        finally:
+            if self._watches.get(key) is watch:
+                del self._watches[key]
+
+    async def stop(self) -> None:
+        tasks = [watch.task for watch in self._watches.values() if watch.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
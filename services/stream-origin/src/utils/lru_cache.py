@@ -0,0 +1,93 @@
+import time
+from collections import OrderedDict
+
+from src.schemas.storage import StorageObject
+
+
+class LRUCache:
+    """
+    In-memory LRU cache bounded by the total size of stored bodies, not by entry count.
+    With `ttl`, entries also expire that many seconds after they are stored.
+    """
+
+    def __init__(self, max_bytes: int, max_item_bytes: int | None = None, ttl: float | None = None):
+        self.max_bytes = max_bytes
+        self.max_item_bytes = min(max_item_bytes or max_bytes, max_bytes)
+        self.ttl = ttl
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self._items: OrderedDict[str, StorageObject] = OrderedDict()
+        self._expires_at: dict[str, float] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._items and not self._expired(key)
+
+    def _expired(self, key: str) -> bool:
+        expires_at = self._expires_at.get(key)
+        return expires_at is not None and expires_at <= time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def keys(self) -> list[str]:
+        return list(self._items)
+
+    def fits(self, size: int) -> bool:
+        return size <= self.max_item_bytes
+
+    def get(self, key: str) -> StorageObject | None:
+        item = self._items.get(key)
+        if item is not None and self._expired(key):
+            self.pop(key)
+            item = None
+        if item is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return item
+
+    def set(self, key: str, item: StorageObject) -> bool:
+        size = len(item.data)
+        if not self.fits(size):
+            return False
+
+        self.pop(key)
+        while self._items and self.size_bytes + size > self.max_bytes:
+            evicted_key, evicted = self._items.popitem(last=False)
+            self._expires_at.pop(evicted_key, None)
+            self.size_bytes -= len(evicted.data)
+            self.evictions += 1
+            self.evicted_bytes += len(evicted.data)
+
+        self._items[key] = item
+        if self.ttl is not None:
+            self._expires_at[key] = time.monotonic() + self.ttl
+        self.size_bytes += size
+        return True
+
+    def pop(self, key: str) -> StorageObject | None:
+        self._expires_at.pop(key, None)
+        item = self._items.pop(key, None)
+        if item is not None:
+            self.size_bytes -= len(item.data)
+        return item
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._expires_at.clear()
+        self.size_bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "items": len(self._items),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "evicted_bytes": self.evicted_bytes,
+        }
@@ -0,0 +1,17 @@
+from pathlib import PurePosixPath
+
+
+MEDIA_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+    ".m4s": "video/iso.segment",
+    ".mp4": "video/mp4",
+    ".m4a": "audio/mp4",
+    ".aac": "audio/aac",
+    ".vtt": "text/vtt",
+}
+DEFAULT_MEDIA_TYPE = "application/octet-stream"
+
+
+def get_media_type(filename: str) -> str:
+    return MEDIA_TYPES.get(PurePosixPath(filename).suffix.lower(), DEFAULT_MEDIA_TYPE)
@@ -0,0 +1,97 @@
+import re
+from typing import Awaitable, Callable
+
+from src.schemas.live import LivePlaylist
+from src.schemas.storage import StorageObject
+
+
+URI_ATTRIBUTE = re.compile(r'URI="([^"]+)"')
+ATTRIBUTE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+def is_absolute(uri: str) -> bool:
+    return uri.startswith(("http://", "https://", "/"))
+
+
+def get_uris(playlist: str) -> list[str]:
+    """
+    Return media URIs (variant playlists or segments) in playlist order
+    """
+    uris = []
+    for line in playlist.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            match = URI_ATTRIBUTE.search(line)
+            if match:
+                uris.append(match.group(1))
+            continue
+        uris.append(line)
+    return uris
+
+
+async def rewrite_uris(playlist: str, resolve: Callable[[str], Awaitable[str]]) -> str:
+    """
+    Replace every relative media URI of an HLS playlist (segment lines and URI="..."
+    attributes such as EXT-X-MAP) with the value returned by `resolve`
+    """
+    lines = []
+    for line in playlist.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            lines.append(line)
+        elif stripped.startswith("#"):
+            match = URI_ATTRIBUTE.search(line)
+            if match and not is_absolute(match.group(1)):
+                uri = await resolve(match.group(1))
+                line = line[: match.start(1)] + uri + line[match.end(1) :]
+            lines.append(line)
+        elif is_absolute(stripped):
+            lines.append(line)
+        else:
+            lines.append(await resolve(stripped))
+    return "\n".join(lines) + "\n"
+
+
+def parse_attributes(value: str) -> dict[str, str]:
+    return {name: value.strip('"') for name, value in ATTRIBUTE.findall(value)}
+
+
+def parse_live_playlist(item: StorageObject) -> LivePlaylist:
+    """
+    Read the media sequence numbers, partial segments and preload hints of a live
+    media playlist (RFC 8216bis, LL-HLS)
+    """
+    playlist = LivePlaylist(item=item)
+    segments = 0
+    for line in item.data.decode().splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        tag, _, value = line.partition(":")
+        if tag == "#EXT-X-MEDIA-SEQUENCE":
+            playlist.media_sequence = int(value)
+        elif tag == "#EXT-X-TARGETDURATION":
+            playlist.target_duration = float(value)
+        elif tag == "#EXT-X-PART-INF":
+            part_target = parse_attributes(value).get("PART-TARGET")
+            playlist.part_target = float(part_target) if part_target else None
+        elif tag == "#EXT-X-PART":
+            # parts precede the segment they belong to, trailing ones are of the next segment
+            playlist.parts += 1
+            uri = parse_attributes(value).get("URI")
+            if uri:
+                playlist.uris.add(uri)
+        elif tag == "#EXT-X-PRELOAD-HINT":
+            uri = parse_attributes(value).get("URI")
+            if uri:
+                playlist.preload_hints.add(uri)
+        elif tag == "#EXT-X-ENDLIST":
+            playlist.ended = True
+        elif not line.startswith("#"):
+            segments += 1
+            playlist.parts = 0
+            playlist.uris.add(line)
+    playlist.next_msn = playlist.media_sequence + segments
+    return playlist
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass
+
+from src.adapters.cached_storage import CachedStorage
+from src.exceptions import ObjectNotFoundException, ServiceOverloadedException
+
+
+log = logging.getLogger(__name__)
+
+SEGMENT_NUMBER = re.compile(r"^(?P<prefix>.*?)(?P<number>\d+)(?P<suffix>\.\w+)$")
+
+
+@dataclass(slots=True)
+class _Session:
+    position: int
+    updated_at: float
+    end: int | None = None
+
+
+class Prefetcher:
+    """
+    Read-ahead for sequential HLS playback.
+
+    Serving `segment_012.ts` of a rendition warms the next `depth` segments into the cache.
+    Progress is tracked per (video_id, quality), and read-ahead only happens while that
+    rendition keeps advancing. Prefetch runs under its own concurrency cap and is dropped,
+    not queued, when the cap is reached, so it never competes with foreground requests.
+    """
+
+    def __init__(
+        self,
+        storage: CachedStorage,
+        depth: int,
+        max_concurrency: int,
+        idle_timeout: float = 30,
+    ):
+        self.storage = storage
+        self.depth = depth
+        self.max_concurrency = max_concurrency
+        self.idle_timeout = idle_timeout
+        self.scheduled = 0
+        self.dropped = 0
+        self._sessions: dict[tuple[str, str], _Session] = {}
+        self._running: dict[str, asyncio.Task] = {}
+        self._last_sweep = time.monotonic()
+
+    def on_segment(self, video_id: str, quality: str, segment_name: str) -> None:
+        if self.depth <= 0:
+            return
+        match = SEGMENT_NUMBER.match(segment_name)
+        if match is None:
+            return
+
+        number = int(match["number"])
+        now = time.monotonic()
+        self._sweep(now)
+
+        session_key = (str(video_id), str(quality))
+        session = self._sessions.get(session_key)
+        if session is None:
+            session = self._sessions[session_key] = _Session(position=number, updated_at=now)
+        elif number > session.position:
+            session.position = number
+            session.updated_at = now
+        else:
+            # not advancing (retry or another viewer behind): rely on what is already warm
+            return
+
+        width = len(match["number"])
+        base_key = f"videos/{video_id}/{quality}/"
+        for next_number in range(number + 1, number + self.depth + 1):
+            if session.end is not None and next_number > session.end:
+                break
+            name = f"{match['prefix']}{next_number:0{width}d}{match['suffix']}"
+            self._schedule(session_key, base_key + name, next_number)
+
+    def _schedule(self, session_key: tuple[str, str], key: str, number: int) -> None:
+        # the disk tier is checked by warm(), off the request path
+        if key in self._running or self.storage.is_cached_in_memory(key):
+            return
+        if len(self._running) >= self.max_concurrency:
+            self.dropped += 1
+            return
+        self.scheduled += 1
+        task = asyncio.create_task(self._prefetch(session_key, key, number))
+        self._running[key] = task
+        task.add_done_callback(lambda _: self._running.pop(key, None))
+
+    async def _prefetch(self, session_key: tuple[str, str], key: str, number: int) -> None:
+        session = self._sessions.get(session_key)
+        if session is None or time.monotonic() - session.updated_at > self.idle_timeout:
+            return
+        try:
+            await self.storage.warm(key)
+        except ObjectNotFoundException:
+            # past the last segment, do not probe beyond it again
+            session.end = number - 1
+        except ServiceOverloadedException:
+            # read-ahead is the first thing to give up under load
+            pass
+        except Exception as exc:
+            log.warning(f"Prefetch: failed to warm {key}: {exc}")
+
+    def _sweep(self, now: float) -> None:
+        if now - self._last_sweep < self.idle_timeout:
+            return
+        self._last_sweep = now
+        for session_key, session in list(self._sessions.items()):
+            if now - session.updated_at > self.idle_timeout:
+                del self._sessions[session_key]
+
+    async def stop(self) -> None:
+        for task in list(self._running.values()):
+            task.cancel()
+        await asyncio.gather(*self._running.values(), return_exceptions=True)
@@ -0,0 +1,140 @@
+import json
+import logging
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from src.schemas.storage import ObjectInfo, StorageObject
+
+
+log = logging.getLogger(__name__)
+
+
+class RedisCache:
+    """
+    Cache tier shared by every origin replica, meant for small hot objects (playlists).
+    Entries expire after `ttl` seconds. It also holds small JSON documents that every worker
+    must see, such as warm-up job progress. Redis being slow or down only costs a miss:
+    errors are logged, the caller falls back to the storage and Redis is not tried again
+    for `retry_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl: int,
+        max_item_bytes: int,
+        key_prefix: str = "stream-origin:",
+        timeout: float = 0.5,
+        retry_interval: float = 5,
+    ):
+        self.url = url
+        self.ttl = ttl
+        self.max_item_bytes = max_item_bytes
+        self.key_prefix = key_prefix
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.redis: redis.Redis | None = None
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._retry_at = 0.0
+
+    async def connect(self):
+        parsed = urlparse(self.url)
+        log.info(f"Redis: Connecting to server at {parsed.hostname}:{parsed.port}...")
+        self.redis = redis.from_url(
+            self.url,
+            socket_timeout=self.timeout,
+            socket_connect_timeout=self.timeout,
+        )
+        try:
+            await self.redis.ping()
+            log.info("Redis: Connected.")
+        except RedisError as exc:
+            # the tier is optional, keep serving from the storage until Redis comes back
+            log.warning(f"Redis: Connection failed: {exc}")
+
+    async def close(self):
+        if self.redis is not None:
+            await self.redis.aclose()
+            self.redis = None
+            log.info("Redis: Connection closed.")
+
+    def fits(self, size: int) -> bool:
+        return size <= self.max_item_bytes
+
+    @property
+    def available(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._retry_at
+
+    def _on_error(self, action: str, key: str, exc: RedisError) -> None:
+        self.errors += 1
+        self._retry_at = time.monotonic() + self.retry_interval
+        log.warning(f"Redis: Failed to {action} {key}: {exc}")
+
+    async def get(self, key: str) -> StorageObject | None:
+        if not self.available:
+            return None
+        try:
+            entry = await self.redis.hgetall(self.key_prefix + key)
+        except RedisError as exc:
+            self._on_error("get", key, exc)
+            return None
+        if not entry:
+            self.misses += 1
+            return None
+        self.hits += 1
+        last_modified = entry.get(b"last_modified")
+        info = ObjectInfo(
+            key=key,
+            size=int(entry[b"size"]),
+            etag=entry[b"etag"].decode() if entry.get(b"etag") else None,
+            last_modified=datetime.fromisoformat(last_modified.decode()) if last_modified else None,
+        )
+        return StorageObject(info=info, data=entry[b"data"])
+
+    async def set(self, item: StorageObject) -> None:
+        if not self.available or not self.fits(item.info.size):
+            return
+        mapping = {
+            "data": item.data,
+            "size": item.info.size,
+            "etag": item.info.etag or "",
+            "last_modified": item.info.last_modified.isoformat() if item.info.last_modified else "",
+        }
+        name = self.key_prefix + item.info.key
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                await pipe.hset(name, mapping=mapping).expire(name, self.ttl).execute()
+        except RedisError as exc:
+            self._on_error("set", item.info.key, exc)
+
+    async def get_json(self, key: str) -> dict | None:
+        if not self.available:
+            return None
+        try:
+            value = await self.redis.get(self.key_prefix + key)
+        except RedisError as exc:
+            self._on_error("get", key, exc)
+            return None
+        return json.loads(value) if value is not None else None
+
+    async def set_json(self, key: str, value: dict, ttl: int) -> None:
+        if not self.available:
+            return
+        try:
+            await self.redis.set(self.key_prefix + key, json.dumps(value, default=str), ex=ttl)
+        except RedisError as exc:
+            self._on_error("set", key, exc)
+
+    async def delete(self, key: str) -> None:
+        if not self.available:
+            return
+        try:
+            await self.redis.delete(self.key_prefix + key)
+        except RedisError as exc:
+            self._on_error("delete", key, exc)
@@ -0,0 +1,185 @@
+import asyncio
+import fcntl
+import logging
+import os
+import time
+from pathlib import Path
+
+from src.schemas.storage import ObjectInfo, StorageObject
+from src.utils.disk_cache import DiskCache
+
+
+log = logging.getLogger(__name__)
+
+
+class SharedDiskCache(DiskCache):
+    """
+    Disk tier shared by every worker process on the host. Placed on tmpfs (e.g. /dev/shm)
+    it is a shared-memory segment cache: bodies live in memory once, whatever the number
+    of workers, and are still sent with sendfile.
+
+    The directory is the cross-process index: an entry exists while its sidecar exists.
+    Workers only keep a bounded local copy of metadata they have already read.
+    Access time is recorded by touching the sidecar, and one worker at a time (the holder
+    of an flock on the directory) evicts the least recently used entries. Sidecars go first,
+    so new lookups miss, and bodies are unlinked one cycle later.
+    """
+
+    LOCK_NAME = ".evictor.lock"
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int,
+        eviction_interval: float = 5,
+        low_watermark: float = 0.9,
+        max_known_items: int = 100_000,
+        orphan_grace: float = 60,
+    ):
+        super().__init__(directory, max_bytes, eviction_interval, low_watermark)
+        self.max_known_items = max_known_items
+        self.orphan_grace = orphan_grace
+        self.is_evictor = False
+        self._lock_file = None
+
+    def __contains__(self, key: str) -> bool:
+        return self.path_for(key).with_suffix(".json").exists()
+
+    async def contains(self, key: str) -> bool:
+        return await asyncio.to_thread(self.__contains__, key)
+
+    async def get(self, key: str) -> tuple[Path, ObjectInfo] | None:
+        path = self.path_for(key)
+        try:
+            info = await asyncio.to_thread(
+                self._touch, path.with_suffix(".json"), self._index.get(key)
+            )
+        except (OSError, ValueError, KeyError):
+            self._index.pop(key, None)
+            self.misses += 1
+            return None
+        self._remember(info)
+        self.hits += 1
+        return path, info
+
+    def _touch(self, meta_path: Path, info: ObjectInfo | None) -> ObjectInfo:
+        if info is None:
+            info = self._read_meta(meta_path)
+        # marks the entry as recently used for whichever worker evicts,
+        # and fails if the entry is gone
+        os.utime(meta_path)
+        return info
+
+    async def delete(self, key: str) -> None:
+        self._index.pop(key, None)
+        # lookups miss once the sidecar is gone, the evictor then removes the body
+        await asyncio.to_thread(self.path_for(key).with_suffix(".json").unlink, missing_ok=True)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._index if key.startswith(prefix)]:
+            del self._index[key]
+        await asyncio.to_thread(self._delete_prefix, prefix)
+
+    def _delete_prefix(self, prefix: str) -> None:
+        # keys are hashed on disk, so every sidecar is read to find them
+        for meta_path in self.directory.glob("*/*/*.json"):
+            try:
+                info = self._read_meta(meta_path)
+            except (OSError, ValueError, KeyError):
+                continue
+            if info.key.startswith(prefix):
+                meta_path.unlink(missing_ok=True)
+
+    async def put(self, item: StorageObject) -> None:
+        key = item.info.key
+        if item.info.size > self.max_bytes or await self.contains(key):
+            return
+        try:
+            await asyncio.to_thread(self._write, item)
+        except OSError as exc:
+            log.warning(f"Shared cache: failed to write {key}: {exc}")
+            return
+        self._remember(item.info)
+
+    def _remember(self, info: ObjectInfo) -> None:
+        self._index[info.key] = info
+        self._index.move_to_end(info.key)
+        while len(self._index) > self.max_known_items:
+            self._index.popitem(last=False)
+
+    async def load(self) -> None:
+        # nothing to rebuild, the directory is the index
+        await asyncio.to_thread(self.directory.mkdir, parents=True, exist_ok=True)
+
+    async def stop(self) -> None:
+        await super().stop()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+            self.is_evictor = False
+
+    def _try_lock(self) -> bool:
+        if self._lock_file is None:
+            self._lock_file = open(self.directory / self.LOCK_NAME, "a")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        log.info(f"Shared cache: worker {os.getpid()} is now the evictor for {self.directory}")
+        return True
+
+    async def _run_evictor(self) -> None:
+        while True:
+            # the lock is held until the process exits, so workers take over from a dead one
+            if not self.is_evictor:
+                self.is_evictor = self._try_lock()
+            if self.is_evictor:
+                await asyncio.to_thread(self._evict_shared)
+            await asyncio.sleep(self.eviction_interval)
+
+    def _evict_shared(self) -> None:
+        for pending in self._pending_unlink:
+            path = Path(pending)
+            # skip entries another worker has written again in the meantime
+            if not path.with_suffix(".json").exists():
+                path.unlink(missing_ok=True)
+        self._pending_unlink.clear()
+
+        now = time.time()
+        entries = []
+        total = 0
+        for path in self.directory.glob("*/*/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.suffix == ".json":
+                # bodies are written before their sidecar, so a sidecar alone is a leftover
+                # of an unlink racing a rewrite, and lookups would find an entry with no body
+                if not path.with_suffix("").exists():
+                    path.unlink(missing_ok=True)
+                continue
+            # leftovers of interrupted writes; recent ones may still be in progress elsewhere
+            if path.name.endswith(".tmp") or not path.with_suffix(".json").exists():
+                if now - stat.st_mtime > self.orphan_grace:
+                    path.unlink(missing_ok=True)
+                continue
+            try:
+                used_at = path.with_suffix(".json").stat().st_mtime
+            except FileNotFoundError:
+                continue
+            entries.append((used_at, stat.st_size, path))
+            total += stat.st_size
+
+        target = self.max_bytes * self.low_watermark
+        if total > self.max_bytes:
+            entries.sort(key=lambda entry: entry[0])
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                path.with_suffix(".json").unlink(missing_ok=True)
+                self._pending_unlink.add(str(path))
+                total -= size
+                self.evictions += 1
+                self.evicted_bytes += size
+        self.size_bytes = total
@@ -0,0 +1,94 @@
+import asyncio
+from functools import partial
+from typing import AsyncIterator, Awaitable, Callable, Generic, TypeVar
+
+from src.schemas.storage import ObjectInfo, ObjectStream
+
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Collapses concurrent calls with the same key into one execution.
+    The call runs as a separate task, so a cancelled caller does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self.executed = 0
+        self.deduplicated = 0
+        self._calls: dict[str, asyncio.Task[T]] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """
+        Return the call result and whether it was shared with an already running call
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if shared:
+            self.deduplicated += 1
+        else:
+            self.executed += 1
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(partial(self._forget, key))
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: str, task: asyncio.Task[T]) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # mark the exception as retrieved when every caller has gone away
+            task.exception()
+
+
+class SharedDownload:
+    """
+    Body of a single upstream stream buffered for any number of concurrent readers.
+    Every reader gets the bytes from the beginning and follows the download as it progresses.
+    """
+
+    def __init__(self, info: ObjectInfo):
+        self.info = info
+        self.buffer = bytearray()
+        self.done = False
+        self.error: BaseException | None = None
+        self._updated = asyncio.Event()
+
+    def _notify(self) -> None:
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    async def pump(self, stream: ObjectStream) -> None:
+        try:
+            async for chunk in stream:
+                self.buffer.extend(chunk)
+                self._notify()
+            self.done = True
+        except BaseException as exc:
+            self.error = exc
+            raise
+        finally:
+            await stream.aclose()
+            self._notify()
+
+    async def wait(self) -> None:
+        while not self.done and self.error is None:
+            await self._updated.wait()
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        position = 0
+        while True:
+            if position < len(self.buffer):
+                chunk = bytes(self.buffer[position:])
+                position += len(chunk)
+                yield chunk
+            elif self.error is not None:
+                raise self.error
+            elif self.done:
+                return
+            else:
+                await self._updated.wait()
+
+    def open(self) -> ObjectStream:
+        return ObjectStream(info=self.info, chunks=self.iter_chunks())
@@ -0,0 +1,53 @@
+import os
+
+# settings are read when src.config is first imported
+os.environ.setdefault("MODE", "TEST")
+os.environ.setdefault("S3_ENDPOINT_URL", "http://localhost:9000")
+os.environ.setdefault("S3_ACCESS_KEY", "test")
+os.environ.setdefault("S3_SECRET_KEY", "test")
+os.environ.setdefault("S3_BUCKET_NAME", "test")
+os.environ.setdefault("PREFETCH_DEPTH", "0")
+
+import pytest  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+
+from src.api.dependencies import FileAdapterFactory, LiveServiceFactory  # noqa: E402
+from src.main import app  # noqa: E402
+from src.services.live import LiveService  # noqa: E402
+from src.utils.live_playlists import LivePlaylistWatcher  # noqa: E402
+from tests.utils import make_storage  # noqa: E402
+
+
+@pytest.fixture
+def objects() -> dict[str, bytes]:
+    return {}
+
+
+@pytest.fixture
+def storage(objects):
+    return make_storage(objects)
+
+
+@pytest.fixture
+def upstream(storage):
+    return storage[1]
+
+
+@pytest.fixture
+async def watcher(upstream):
+    # live playlists are read from the uncached storage, as in the container
+    watcher = LivePlaylistWatcher(storage=upstream, poll_interval=0.01, idle_timeout=1)
+    yield watcher
+    await watcher.stop()
+
+
+@pytest.fixture
+async def client(storage, watcher):
+    cached_storage, _ = storage
+    app.dependency_overrides[FileAdapterFactory.storage_factory] = lambda: cached_storage
+    app.dependency_overrides[LiveServiceFactory.live_service_factory] = lambda: LiveService(
+        storage=cached_storage, playlists=watcher
+    )
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from src.exceptions import ServiceOverloadedException
+from src.utils.admission import AdmissionController, Priority
+
+
+def timeout_after_handoff(slot):
+    """
+    Stand-in for asyncio.wait_for where the slot is handed over
+    in the same loop iteration as the queue timeout
+    """
+
+    async def wait_for(future, timeout):
+        slot.release()
+        assert future.done()
+        raise asyncio.TimeoutError
+
+    return wait_for
+
+
+async def test_queued_acquire_gets_released_slot():
+    admission = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=1)
+    slot = await admission.acquire(Priority.SEGMENT)
+    waiter = asyncio.create_task(admission.acquire(Priority.SEGMENT))
+    await asyncio.sleep(0)
+    assert admission.queued == 1
+
+    slot.release()
+    (await waiter).release()
+    assert admission.active == 0
+
+
+async def test_timeout_racing_handoff_frees_the_slot(monkeypatch):
+    admission = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=1)
+    slot = await admission.acquire(Priority.SEGMENT)
+    monkeypatch.setattr(asyncio, "wait_for", timeout_after_handoff(slot))
+
+    with pytest.raises(ServiceOverloadedException):
+        await admission.acquire(Priority.SEGMENT)
+
+    assert admission.active == 0
+    assert admission.queued == 0
+    (await admission.acquire(Priority.SEGMENT)).release()
+
+
+async def test_timeout_racing_handoff_passes_the_slot_on(monkeypatch):
+    admission = AdmissionController(max_concurrency=1, max_queue=2, queue_timeout=1)
+    slot = await admission.acquire(Priority.SEGMENT)
+    next_waiter = asyncio.create_task(admission.acquire(Priority.BACKGROUND))
+    await asyncio.sleep(0)
+    monkeypatch.setattr(asyncio, "wait_for", timeout_after_handoff(slot))
+
+    with pytest.raises(ServiceOverloadedException):
+        await admission.acquire(Priority.SEGMENT)
+    monkeypatch.undo()
+
+    (await asyncio.wait_for(next_waiter, 1)).release()
+    assert admission.active == 0
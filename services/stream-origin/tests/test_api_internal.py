@@ -0,0 +1,56 @@
+import pytest
+
+from src.config import settings
+
+
+KEY = "videos/00000000-0000-0000-0000-000000000001/720p/segment_000.ts"
+ORIGINAL = "videos/00000000-0000-0000-0000-000000000001/original/video.mp4"
+TOKEN = "peer-secret"
+
+
+@pytest.fixture
+def objects():
+    return {KEY: b"segment", ORIGINAL: b"original"}
+
+
+@pytest.fixture(autouse=True)
+def peer_token(monkeypatch):
+    monkeypatch.setattr(settings, "PEER_TOKEN", TOKEN)
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Peer-Token": "wrong"}, {"X-Peer-Token": ""}])
+async def test_missing_or_wrong_token_is_denied(client, headers):
+    response = await client.get(f"/internal/objects/{KEY}", headers=headers)
+
+    assert response.status_code == 403
+
+
+async def test_routes_stay_closed_without_a_configured_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "PEER_TOKEN", None)
+
+    response = await client.get(f"/internal/objects/{KEY}", headers={"X-Peer-Token": ""})
+
+    assert response.status_code == 403
+
+
+async def test_peer_reads_the_object(client):
+    response = await client.get(f"/internal/objects/{KEY}", headers={"X-Peer-Token": TOKEN})
+
+    assert response.status_code == 200
+    assert response.content == b"segment"
+
+
+async def test_peer_range_read(client):
+    response = await client.get(
+        f"/internal/objects/{KEY}", headers={"X-Peer-Token": TOKEN, "Range": "bytes=0-2"}
+    )
+
+    assert response.status_code == 206
+    assert response.content == b"seg"
+
+
+@pytest.mark.parametrize("key", [ORIGINAL, "uploads/video.ts", "videos/v/720p/notes.txt"])
+async def test_non_hls_key_is_not_found(client, key):
+    response = await client.get(f"/internal/objects/{key}", headers={"X-Peer-Token": TOKEN})
+
+    assert response.status_code == 404
@@ -0,0 +1,63 @@
+import pytest
+
+
+VIDEO_ID = "00000000-0000-0000-0000-000000000001"
+KEY = f"videos/{VIDEO_ID}/720p/segment_000.ts"
+URL = f"/{KEY}"
+DATA = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def objects():
+    return {KEY: DATA}
+
+
+async def test_whole_segment_advertises_ranges(client):
+    response = await client.get(URL)
+
+    assert response.status_code == 200
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-length"] == str(len(DATA))
+    assert response.content == DATA
+
+
+@pytest.mark.parametrize(
+    "header, start, end",
+    [("bytes=10-19", 10, 19), ("bytes=1000-", 1000, 1023), ("bytes=-24", 1000, 1023)],
+)
+async def test_partial_content(client, header, start, end):
+    response = await client.get(URL, headers={"Range": header})
+
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes {start}-{end}/{len(DATA)}"
+    assert response.headers["content-length"] == str(end - start + 1)
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.content == DATA[start : end + 1]
+
+
+async def test_unsatisfiable_range(client):
+    response = await client.get(URL, headers={"Range": f"bytes={len(DATA)}-"})
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(DATA)}"
+
+
+async def test_multiple_ranges(client):
+    # once uncached and once from the segment cache
+    for _ in range(2):
+        response = await client.get(URL, headers={"Range": "bytes=0-1,5-6"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(DATA)}"
+
+
+async def test_multiple_ranges_of_a_missing_segment(client):
+    response = await client.get(URL.replace("000", "001"), headers={"Range": "bytes=0-1,5-6"})
+
+    assert response.status_code == 404
+
+
+async def test_malformed_range_is_ignored(client):
+    response = await client.get(URL, headers={"Range": "bytes=oops"})
+
+    assert response.status_code == 200
+    assert response.content == DATA
@@ -0,0 +1,48 @@
+import pytest
+
+from src.config import settings
+
+
+VIDEO_ID = "00000000-0000-0000-0000-000000000001"
+KEY = f"videos/{VIDEO_ID}/720p/segment_000.ts"
+URL = f"/{KEY}"
+
+
+@pytest.fixture
+def objects():
+    return {KEY: b"segment"}
+
+
+@pytest.fixture(autouse=True)
+def redirect_mode(monkeypatch):
+    monkeypatch.setattr(settings, "SEGMENT_DELIVERY_MODE", "redirect")
+
+
+async def test_segment_redirects_to_the_signed_url(client, upstream, monkeypatch):
+    async def generate_presigned_url(key, expires=3600):
+        return f"https://cdn.example.com/{key}?expires={expires}"
+
+    monkeypatch.setattr(upstream, "generate_presigned_url", generate_presigned_url)
+
+    response = await client.get(URL)
+
+    assert response.status_code == 302
+    assert response.headers["location"] == (
+        f"https://cdn.example.com/{KEY}?expires={settings.PRESIGNED_URL_EXPIRES}"
+    )
+    assert response.headers["cache-control"] == "no-cache"
+
+
+async def test_segment_is_proxied_when_no_url_is_signed(client, upstream):
+    # MemoryStorage cannot sign URLs
+    response = await client.get(URL)
+
+    assert response.status_code == 200
+    assert response.content == b"segment"
+    assert upstream.reads == [None]
+
+
+async def test_missing_segment_without_a_url_is_not_found(client):
+    response = await client.get(URL.replace("000", "001"))
+
+    assert response.status_code == 404
@@ -0,0 +1,56 @@
+import pytest
+
+from src.exceptions import MultipleRangesException, RangeNotSatisfiableException
+from src.schemas.storage import ByteRange
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=0-99", ByteRange(start=0, end=99)),
+        ("bytes=100-", ByteRange(start=100, end=None)),
+        ("bytes=-500", ByteRange(start=None, end=500)),
+        ("Bytes = 5 - 9", ByteRange(start=5, end=9)),
+    ],
+)
+def test_parses_single_range(header, expected):
+    assert ByteRange.from_header(header) == expected
+
+
+@pytest.mark.parametrize(
+    "header", [None, "", "items=0-9", "bytes=abc", "bytes=-", "bytes=9-5", "bytes=0-x", "bytes=5"]
+)
+def test_ignores_malformed_range(header):
+    assert ByteRange.from_header(header) is None
+
+
+def test_multiple_ranges_are_rejected():
+    with pytest.raises(MultipleRangesException):
+        ByteRange.from_header("bytes=0-1,5-6")
+
+
+@pytest.mark.parametrize(
+    "byte_range, expected",
+    [
+        (ByteRange(start=0, end=99), ByteRange(start=0, end=99)),
+        (ByteRange(start=900, end=2000), ByteRange(start=900, end=999)),
+        (ByteRange(start=900, end=None), ByteRange(start=900, end=999)),
+        (ByteRange(start=None, end=100), ByteRange(start=900, end=999)),
+        (ByteRange(start=None, end=5000), ByteRange(start=0, end=999)),
+    ],
+)
+def test_resolves_against_object_size(byte_range, expected):
+    assert byte_range.resolve(1000) == expected
+
+
+@pytest.mark.parametrize("byte_range", [ByteRange(start=1000, end=None), ByteRange(None, 0)])
+def test_unsatisfiable_range_carries_the_size(byte_range):
+    with pytest.raises(RangeNotSatisfiableException) as exc_info:
+        byte_range.resolve(1000)
+    assert exc_info.value.size == 1000
+
+
+def test_content_range():
+    resolved = ByteRange(start=None, end=100).resolve(1000)
+    assert resolved.length == 100
+    assert resolved.content_range(1000) == "bytes 900-999/1000"
@@ -0,0 +1,189 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.adapters.cached_storage import CachedStorage
+from src.exceptions import (
+    ObjectNotFoundException,
+    RangeNotSatisfiableException,
+    ServiceOverloadedException,
+)
+from src.schemas.storage import ByteRange
+from src.utils.admission import AdmissionController, Priority
+from src.utils.disk_cache import DiskCache
+from src.utils.shared_disk_cache import SharedDiskCache
+from tests.utils import CHUNK_SIZE, SEGMENT_MAX_ITEM_BYTES, make_storage, read
+
+
+KEY = "videos/v/720p/segment_000.ts"
+# too large for the segment cache, so it is served in aligned chunks
+LARGE = bytes(range(256)) * (2 * SEGMENT_MAX_ITEM_BYTES // 256)
+
+
+def chunk_range(index: int) -> ByteRange:
+    return ByteRange(start=index * CHUNK_SIZE, end=(index + 1) * CHUNK_SIZE - 1)
+
+
+async def test_range_request_keeps_cacheable_segment_whole():
+    data = bytes(range(256)) * 1200  # 300 KiB, fits the segment cache
+    storage, upstream = make_storage({KEY: data})
+
+    assert await read(storage, KEY, ByteRange(start=0, end=99)) == data[:100]
+    assert KEY not in storage._range_objects
+
+    assert await read(storage, KEY) == data
+    assert await read(storage, KEY) == data
+    # one chunk for the range, then a single whole read that the segment cache keeps
+    assert upstream.reads == [chunk_range(0), None]
+    assert KEY in storage.segment_cache
+
+
+async def test_large_object_is_read_whole_in_chunks_after_range_request():
+    storage, upstream = make_storage({KEY: LARGE})
+
+    assert await read(storage, KEY, ByteRange(start=10, end=19)) == LARGE[10:20]
+    assert KEY in storage._range_objects
+
+    assert await read(storage, KEY) == LARGE
+    assert None not in upstream.reads
+    assert KEY not in storage.segment_cache
+
+
+async def test_range_within_one_chunk_reads_the_aligned_chunk():
+    storage, upstream = make_storage({KEY: LARGE})
+    start = 3 * CHUNK_SIZE + 100
+
+    assert (
+        await read(storage, KEY, ByteRange(start=start, end=start + 9)) == LARGE[start : start + 10]
+    )
+    assert upstream.reads == [chunk_range(3)]
+
+
+async def test_range_on_chunk_boundaries():
+    storage, upstream = make_storage({KEY: LARGE})
+    await read(storage, KEY, ByteRange(start=0, end=0))
+
+    # last byte of chunk 0 and first byte of chunk 1
+    boundary = ByteRange(start=CHUNK_SIZE - 1, end=CHUNK_SIZE)
+    assert await read(storage, KEY, boundary) == LARGE[CHUNK_SIZE - 1 : CHUNK_SIZE + 1]
+    # exactly one chunk
+    assert await read(storage, KEY, chunk_range(2)) == LARGE[2 * CHUNK_SIZE : 3 * CHUNK_SIZE]
+    assert upstream.reads == [chunk_range(0), chunk_range(1), chunk_range(2)]
+
+
+async def test_range_across_chunks_is_cached():
+    storage, upstream = make_storage({KEY: LARGE})
+    byte_range = ByteRange(start=10, end=3 * CHUNK_SIZE + 10)
+    expected = LARGE[10 : 3 * CHUNK_SIZE + 11]
+
+    assert await read(storage, KEY, byte_range) == expected
+    assert upstream.reads == [chunk_range(index) for index in range(4)]
+
+    assert await read(storage, KEY, byte_range) == expected
+    assert len(upstream.reads) == 4
+
+
+async def test_open_ended_and_suffix_ranges_of_a_known_object():
+    storage, upstream = make_storage({KEY: LARGE})
+    await read(storage, KEY, ByteRange(start=0, end=0))
+    last = (len(LARGE) - 1) // CHUNK_SIZE
+    start = last * CHUNK_SIZE - 5
+
+    stream = await storage.get_file_stream(KEY, ByteRange(start=start, end=None))
+    assert stream.byte_range == ByteRange(start=start, end=len(LARGE) - 1)
+    assert b"".join([chunk async for chunk in stream]) == LARGE[start:]
+    await stream.aclose()
+
+    assert await read(storage, KEY, ByteRange(start=None, end=100)) == LARGE[-100:]
+    assert upstream.reads == [chunk_range(0), chunk_range(last - 1), chunk_range(last)]
+
+
+async def test_suffix_range_of_an_unknown_object_learns_its_size():
+    storage, upstream = make_storage({KEY: LARGE})
+
+    assert await read(storage, KEY, ByteRange(start=None, end=100)) == LARGE[-100:]
+    assert upstream.reads == [ByteRange(start=None, end=100)]
+    assert storage._range_objects[KEY].size == len(LARGE)
+
+
+async def test_unsatisfiable_range_of_a_known_object():
+    storage, _ = make_storage({KEY: LARGE})
+    await read(storage, KEY, ByteRange(start=0, end=0))
+
+    with pytest.raises(RangeNotSatisfiableException) as exc_info:
+        await storage.get_file_stream(KEY, ByteRange(start=len(LARGE), end=None))
+    assert exc_info.value.size == len(LARGE)
+
+
+async def test_known_object_is_rejected_before_the_stream_is_returned():
+    admission = AdmissionController(max_concurrency=1, max_queue=0, queue_timeout=1)
+    storage, _ = make_storage({KEY: LARGE}, admission=admission)
+    await read(storage, KEY, ByteRange(start=0, end=0))
+
+    slot = await admission.acquire(Priority.SEGMENT)
+    with pytest.raises(ServiceOverloadedException):
+        await storage.get_file_stream(KEY, ByteRange(start=CHUNK_SIZE, end=CHUNK_SIZE + 9))
+    slot.release()
+    assert admission.active == 0
+
+
+async def test_known_object_deleted_upstream_is_not_found():
+    storage, upstream = make_storage({KEY: LARGE})
+    await read(storage, KEY, ByteRange(start=0, end=0))
+    del upstream.objects[KEY]
+
+    with pytest.raises(ObjectNotFoundException):
+        await storage.get_file_stream(KEY, ByteRange(start=CHUNK_SIZE, end=CHUNK_SIZE + 9))
+
+
+async def test_upload_invalidates_the_disk_tier(tmp_path):
+    data = b"x" * 1000
+    storage, upstream = make_storage({KEY: data})
+    storage.disk_cache = DiskCache(tmp_path, max_bytes=10_000)
+    await read(storage, KEY)
+    await asyncio.gather(*storage._background_tasks)
+    assert KEY in storage.disk_cache
+
+    await storage.upload_file(KEY, b"y" * 1000)
+
+    assert KEY not in storage.disk_cache
+    assert await read(storage, KEY) == b"y" * 1000
+
+
+async def test_delete_many_invalidates_the_disk_tier(tmp_path):
+    storage, _ = make_storage({KEY: b"x" * 1000})
+    storage.disk_cache = SharedDiskCache(tmp_path, max_bytes=10_000)
+    await read(storage, KEY)
+    await asyncio.gather(*storage._background_tasks)
+    assert await storage.disk_cache.contains(KEY)
+
+    await storage.delete_many("videos/v/")
+
+    assert not await storage.disk_cache.contains(KEY)
+    assert await storage.disk_cache.get(KEY) is None
+
+
+async def test_disk_tier_serves_ranges_without_blocking_the_loop(tmp_path, monkeypatch):
+    data = bytes(range(256)) * 40
+    storage, upstream = make_storage({KEY: data})
+    storage.disk_cache = DiskCache(tmp_path, max_bytes=100_000)
+    await read(storage, KEY)
+    await asyncio.gather(*storage._background_tasks)
+    storage.segment_cache.pop(KEY)
+
+    threads = []
+    open_at = CachedStorage._open_at
+
+    def record_open_at(path, offset):
+        threads.append(threading.current_thread())
+        return open_at(path, offset)
+
+    monkeypatch.setattr(CachedStorage, "_open_at", staticmethod(record_open_at))
+
+    assert await read(storage, KEY, ByteRange(start=5000, end=5099)) == data[5000:5100]
+    assert await read(storage, KEY, ByteRange(start=None, end=10)) == data[-10:]
+    assert await read(storage, KEY) == data
+    assert upstream.reads == [None]
+    assert len(threads) == 3
+    assert threading.main_thread() not in threads
@@ -0,0 +1,107 @@
+from itertools import count
+
+import pytest
+
+from src.utils.hash_ring import HashRing
+
+
+def make_crc_table() -> list[int]:
+    table = []
+    for n in range(256):
+        c = n
+        for _ in range(8):
+            c = (c >> 1) ^ 0xEDB88320 if c & 1 else c >> 1
+        table.append(c)
+    return table
+
+
+CRC_TABLE = make_crc_table()
+
+
+def crc32_update(crc: int, data: bytes) -> int:
+    for byte in data:
+        crc = CRC_TABLE[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    return crc
+
+
+def crc32_final(crc: int) -> int:
+    return crc ^ 0xFFFFFFFF
+
+
+CRC_INIT = 0xFFFFFFFF
+
+
+def nginx_ring(servers: list[str]) -> list[tuple[int, str]]:
+    """
+    Points as ngx_http_upstream_init_chash builds them: the host, a NUL and the port
+    are hashed into an unfinalized base crc, which every point then extends with
+    the previous point (little endian)
+    """
+    points = []
+    for server in servers:
+        host, sep, port = server.rpartition(":")
+        if not sep:
+            host, port = server, ""
+        base_hash = crc32_update(CRC_INIT, host.encode())
+        base_hash = crc32_update(base_hash, b"\0")
+        base_hash = crc32_update(base_hash, port.encode())
+        prev_hash = 0
+        for _ in range(160):
+            point = crc32_final(crc32_update(base_hash, prev_hash.to_bytes(4, "little")))
+            points.append((point, server))
+            prev_hash = point
+    points.sort(key=lambda point: point[0])
+    deduplicated = []
+    for point in points:
+        if not deduplicated or deduplicated[-1][0] != point[0]:
+            deduplicated.append(point)
+    return deduplicated
+
+
+def nginx_server(points: list[tuple[int, str]], key: str) -> str:
+    key_hash = crc32_final(crc32_update(CRC_INIT, key.encode()))
+    for point, server in points:
+        if point >= key_hash:
+            return server
+    return points[0][1]
+
+
+SERVER_LISTS = [
+    ["172.25.58.145:8003", "172.25.58.145:8004"],
+    ["origin-1:8000", "origin-2:8000", "origin-3:8000"],
+    ["10.0.0.1:80", "10.0.0.2:80", "10.0.0.3:80", "10.0.0.4:80", "10.0.0.5"],
+]
+KEYS = [f"{n:08x}-0000-4000-8000-{n * 7919:012x}" for n in range(300)] + ["", "a", "live-1"]
+
+
+@pytest.mark.parametrize("servers", SERVER_LISTS)
+def test_points_match_nginx(servers):
+    ring = HashRing(servers)
+    points = nginx_ring(servers)
+
+    assert ring._hashes == [point for point, _ in points]
+
+
+@pytest.mark.parametrize("servers", SERVER_LISTS)
+def test_owner_matches_nginx(servers):
+    ring = HashRing(servers)
+    points = nginx_ring(servers)
+
+    for key in KEYS:
+        assert ring.get_server(key) == nginx_server(points, key), key
+
+
+def test_key_past_the_last_point_wraps_to_the_first():
+    ring = HashRing(SERVER_LISTS[0])
+    last_point = ring._hashes[-1]
+    key = next(
+        key
+        for key in (f"video-{n}" for n in count())
+        if crc32_final(crc32_update(CRC_INIT, key.encode())) > last_point
+    )
+
+    assert ring.get_server(key) == ring._servers[0]
+
+
+def test_empty_ring_has_no_owner():
+    assert HashRing([]).get_server("key") is None
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+
+STREAM_ID = "00000000-0000-0000-0000-000000000002"
+KEY = f"live/{STREAM_ID}/720p/index.m3u8"
+URL = f"/{KEY}"
+
+
+def playlist(segments: int, parts: int = 0, target_duration: float = 1) -> bytes:
+    """
+    LL-HLS media playlist with `segments` full segments followed by `parts` partial
+    segments of the next one and a preload hint for the part after them
+    """
+    lines = [
+        "#EXTM3U",
+        f"#EXT-X-TARGETDURATION:{target_duration}",
+        "#EXT-X-PART-INF:PART-TARGET=0.2",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+    ]
+    for msn in range(segments):
+        lines += ["#EXTINF:1.0,", f"segment_{msn}.m4s"]
+    for part in range(parts):
+        lines.append(f'#EXT-X-PART:DURATION=0.2,URI="part_{segments}_{part}.m4s"')
+    lines.append(f'#EXT-X-PRELOAD-HINT:TYPE=PART,URI="part_{segments}_{parts}.m4s"')
+    return "\n".join(lines).encode() + b"\n"
+
+
+@pytest.fixture
+def objects():
+    return {KEY: playlist(segments=2)}
+
+
+async def publish_later(upstream, data: bytes, delay: float = 0.05) -> None:
+    await asyncio.sleep(delay)
+    upstream.objects[KEY] = data
+
+
+async def test_playlist_without_blocking(client):
+    response = await client.get(URL)
+
+    assert response.status_code == 200
+    assert response.content == playlist(segments=2)
+
+
+async def test_segment_already_listed_is_returned_at_once(client):
+    response = await client.get(URL, params={"_HLS_msn": 1, "_HLS_part": 0})
+
+    assert response.status_code == 200
+    assert response.content == playlist(segments=2)
+
+
+async def test_waits_for_the_next_segment(client, upstream):
+    publisher = asyncio.create_task(publish_later(upstream, playlist(segments=3)))
+
+    response = await client.get(URL, params={"_HLS_msn": 2})
+
+    await publisher
+    assert response.status_code == 200
+    assert response.content == playlist(segments=3)
+
+
+async def test_waits_for_a_partial_segment(client, upstream):
+    async def publish():
+        # a version without the requested part does not end the wait
+        await publish_later(upstream, playlist(segments=2, parts=1))
+        await publish_later(upstream, playlist(segments=2, parts=2))
+
+    publisher = asyncio.create_task(publish())
+
+    response = await client.get(URL, params={"_HLS_msn": 2, "_HLS_part": 1})
+
+    await publisher
+    assert response.status_code == 200
+    assert response.content == playlist(segments=2, parts=2)
+
+
+async def test_part_without_msn_is_rejected(client):
+    response = await client.get(URL, params={"_HLS_part": 0})
+
+    assert response.status_code == 400
+
+
+async def test_msn_too_far_ahead_is_rejected(client):
+    response = await client.get(URL, params={"_HLS_msn": 4})
+
+    assert response.status_code == 400
+
+
+async def test_stalled_stream_times_out(client, upstream):
+    upstream.objects[KEY] = playlist(segments=2, target_duration=0.02)
+
+    response = await client.get(URL, params={"_HLS_msn": 2})
+
+    assert response.status_code == 503
+
+
+async def test_ended_stream_answers_every_msn(client, upstream):
+    upstream.objects[KEY] = playlist(segments=2) + b"#EXT-X-ENDLIST\n"
+
+    response = await client.get(URL, params={"_HLS_msn": 3})
+
+    assert response.status_code == 200
+
+
+async def test_hinted_part_is_held_until_written(client, upstream):
+    name = "part_2_0.m4s"
+    part_key = f"live/{STREAM_ID}/720p/{name}"
+
+    async def publish():
+        await asyncio.sleep(0.05)
+        upstream.objects[part_key] = b"part"
+        upstream.objects[KEY] = playlist(segments=2, parts=1)
+
+    publisher = asyncio.create_task(publish())
+
+    response = await client.get(f"/live/{STREAM_ID}/720p/{name}")
+
+    await publisher
+    assert response.status_code == 200
+    assert response.content == b"part"
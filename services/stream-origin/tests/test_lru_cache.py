@@ -0,0 +1,34 @@
+import time
+
+from src.schemas.storage import ObjectInfo, StorageObject
+from src.utils.lru_cache import LRUCache
+
+
+def item(key: str, size: int) -> StorageObject:
+    return StorageObject(info=ObjectInfo(key=key, size=size), data=b"x" * size)
+
+
+def test_evicts_least_recently_used_over_the_byte_budget():
+    cache = LRUCache(max_bytes=300)
+    for key in ("a", "b", "c"):
+        cache.set(key, item(key, 100))
+    cache.get("a")
+    cache.set("d", item("d", 100))
+
+    assert cache.keys() == ["c", "a", "d"]
+    assert cache.size_bytes == 300
+    assert cache.evicted_bytes == 100
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache = LRUCache(max_bytes=300, ttl=10)
+    cache.set("a", item("a", 100))
+
+    now += 9
+    assert cache.get("a") is not None
+    now += 1
+    assert "a" not in cache
+    assert cache.get("a") is None
+    assert cache.size_bytes == 0
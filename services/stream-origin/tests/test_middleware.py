@@ -0,0 +1,34 @@
+from fastapi.responses import FileResponse
+from prometheus_client import REGISTRY
+
+from src.middleware import MetricsMiddleware
+
+
+PATH = "/videos/00000000-0000-0000-0000-000000000000/720p/segment_000.ts"
+LABELS = {"artefact": "segment", "rendition": "720p"}
+
+
+async def test_pathsend_counts_file_size(tmp_path):
+    body = tmp_path / "segment_000.ts"
+    body.write_bytes(b"x" * 1000)
+    messages = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        messages.append(message)
+
+    middleware = MetricsMiddleware(FileResponse(body))
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": PATH,
+        "headers": [],
+        "extensions": {"http.response.pathsend": {}},
+    }
+    before = REGISTRY.get_sample_value("origin_response_bytes_sum", LABELS) or 0
+    await middleware(scope, receive, send)
+
+    assert messages[-1]["type"] == "http.response.pathsend"
+    assert REGISTRY.get_sample_value("origin_response_bytes_sum", LABELS) == before + 1000
@@ -0,0 +1,28 @@
+from typing import AsyncIterator
+
+from src.schemas.storage import ObjectInfo, ObjectStream
+
+
+async def iter_body() -> AsyncIterator[bytes]:
+    yield b"data"
+
+
+async def test_unread_stream_awaits_async_on_close():
+    closed = []
+
+    async def on_close():
+        closed.append(True)
+
+    stream = ObjectStream(info=ObjectInfo(key="k", size=4), chunks=iter_body(), on_close=on_close)
+    await stream.aclose()
+    assert closed == [True]
+
+
+async def test_sync_on_close_is_called():
+    closed = []
+    stream = ObjectStream(
+        info=ObjectInfo(key="k", size=4), chunks=iter_body(), on_close=lambda: closed.append(True)
+    )
+    assert [chunk async for chunk in stream] == [b"data"]
+    await stream.aclose()
+    assert closed == [True]
@@ -0,0 +1,158 @@
+import asyncio
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from src.schemas.storage import ObjectInfo, StorageObject
+from src.utils.redis_cache import RedisCache
+from tests.utils import make_storage, read
+
+
+KEY = "videos/v/720p/index.m3u8"
+PLAYLIST = b"#EXTM3U\n#EXT-X-ENDLIST\n"
+
+
+class FakeRedis:
+    """
+    The part of the redis client the cache uses, backed by a dict.
+    With `down` set every command fails as if the server were unreachable.
+    """
+
+    def __init__(self):
+        self.hashes: dict[str, dict[bytes, bytes]] = {}
+        self.ttls: dict[str, int] = {}
+        self.down = False
+
+    def _check(self) -> None:
+        if self.down:
+            raise RedisConnectionError("connection refused")
+
+    async def hgetall(self, name: str) -> dict[bytes, bytes]:
+        self._check()
+        return dict(self.hashes.get(name, {}))
+
+    async def delete(self, name: str) -> None:
+        self._check()
+        self.hashes.pop(name, None)
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    def hset(self, name: str, mapping: dict) -> "FakePipeline":
+        encoded = {
+            k.encode(): v if isinstance(v, bytes) else str(v).encode() for k, v in mapping.items()
+        }
+        self.commands.append(lambda: self.redis.hashes.__setitem__(name, encoded))
+        return self
+
+    def expire(self, name: str, ttl: int) -> "FakePipeline":
+        self.commands.append(lambda: self.redis.ttls.__setitem__(name, ttl))
+        return self
+
+    async def execute(self) -> None:
+        self.redis._check()
+        for command in self.commands:
+            command()
+
+
+def make_cache() -> tuple[RedisCache, FakeRedis]:
+    cache = RedisCache(url="redis://localhost:6379/0", ttl=30, max_item_bytes=1024)
+    cache.redis = FakeRedis()
+    return cache, cache.redis
+
+
+async def settle(storage) -> None:
+    await asyncio.gather(*storage._background_tasks)
+
+
+async def test_miss_reads_the_storage_and_fills_redis():
+    cache, redis = make_cache()
+    storage, upstream = make_storage({KEY: PLAYLIST}, shared_playlist_cache=cache)
+
+    assert await read(storage, KEY) == PLAYLIST
+    await settle(storage)
+
+    assert upstream.reads == [None]
+    assert cache.misses == 1
+    assert redis.hashes[cache.key_prefix + KEY][b"data"] == PLAYLIST
+    assert redis.ttls[cache.key_prefix + KEY] == 30
+
+
+async def test_hit_is_served_without_the_storage():
+    cache, _ = make_cache()
+    # another replica already fetched the playlist
+    writer, _ = make_storage({KEY: PLAYLIST}, shared_playlist_cache=cache)
+    await read(writer, KEY)
+    await settle(writer)
+
+    storage, upstream = make_storage({KEY: PLAYLIST}, shared_playlist_cache=cache)
+    assert await read(storage, KEY) == PLAYLIST
+    assert upstream.reads == []
+    assert cache.hits == 1
+    # the hit is kept in the local tier
+    assert KEY in storage.playlist_cache
+
+
+async def test_entry_round_trips_its_metadata():
+    cache, _ = make_cache()
+    info = ObjectInfo(key=KEY, size=len(PLAYLIST), etag='"abc"')
+    await cache.set(StorageObject(info=info, data=PLAYLIST))
+
+    item = await cache.get(KEY)
+    assert item.data == PLAYLIST
+    assert item.info == info
+
+
+async def test_object_over_the_size_cap_is_not_shared():
+    cache, redis = make_cache()
+    data = b"#" * 2048
+    await cache.set(StorageObject(info=ObjectInfo(key=KEY, size=len(data)), data=data))
+
+    assert redis.hashes == {}
+
+
+async def test_redis_down_falls_back_to_the_storage():
+    cache, redis = make_cache()
+    redis.down = True
+    storage, upstream = make_storage({KEY: PLAYLIST}, shared_playlist_cache=cache)
+
+    assert await read(storage, KEY) == PLAYLIST
+    await settle(storage)
+
+    assert upstream.reads == [None]
+    assert cache.errors == 1
+    # the failed get backs off, so the set is not even attempted
+    assert not cache.available
+
+
+async def test_redis_is_retried_after_the_back_off():
+    cache, redis = make_cache()
+    cache.retry_interval = 0
+    redis.down = True
+    assert await cache.get(KEY) is None
+
+    redis.down = False
+    await cache.set(StorageObject(info=ObjectInfo(key=KEY, size=len(PLAYLIST)), data=PLAYLIST))
+    assert (await cache.get(KEY)).data == PLAYLIST
+
+
+async def test_invalidation_deletes_the_shared_entry():
+    cache, redis = make_cache()
+    storage, _ = make_storage({KEY: PLAYLIST}, shared_playlist_cache=cache)
+    await read(storage, KEY)
+    await settle(storage)
+
+    await storage.upload_file(KEY, b"#EXTM3U\n")
+
+    assert cache.key_prefix + KEY not in redis.hashes
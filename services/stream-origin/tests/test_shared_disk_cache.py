@@ -0,0 +1,26 @@
+from src.schemas.storage import ObjectInfo, StorageObject
+from src.utils.shared_disk_cache import SharedDiskCache
+
+
+async def test_entries_are_visible_to_other_workers(tmp_path):
+    writer = SharedDiskCache(tmp_path, max_bytes=1000)
+    reader = SharedDiskCache(tmp_path, max_bytes=1000)
+    await writer.put(StorageObject(info=ObjectInfo(key="k", size=3), data=b"abc"))
+
+    assert await reader.contains("k")
+    path, info = await reader.get("k")
+    assert path.read_bytes() == b"abc"
+    assert info.size == 3
+    assert not await reader.contains("other")
+
+
+async def test_eviction_removes_sidecars_without_a_body(tmp_path):
+    cache = SharedDiskCache(tmp_path, max_bytes=1000)
+    await cache.put(StorageObject(info=ObjectInfo(key="k", size=3), data=b"abc"))
+    cache.path_for("k").unlink()
+
+    cache._evict_shared()
+
+    assert not cache.path_for("k").with_suffix(".json").exists()
+    assert not await cache.contains("k")
+    assert await cache.get("k") is None
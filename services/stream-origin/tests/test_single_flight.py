@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from src.exceptions import ObjectNotFoundException
+from src.utils.single_flight import SingleFlight
+from tests.utils import make_storage, read
+
+
+KEY = "videos/v/720p/segment_000.ts"
+DATA = bytes(range(256)) * 16
+
+
+async def wait_for_readers(upstream, count: int) -> None:
+    # the leader reaches the storage, the followers only the flight
+    while len(upstream.reads) < count:
+        await asyncio.sleep(0)
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_concurrent_misses_fetch_once():
+    storage, upstream = make_storage({KEY: DATA})
+    upstream.gate = asyncio.Event()
+
+    readers = [asyncio.create_task(read(storage, KEY)) for _ in range(10)]
+    await wait_for_readers(upstream, 1)
+    upstream.gate.set()
+
+    assert await asyncio.gather(*readers) == [DATA] * 10
+    assert upstream.reads == [None]
+    assert storage.flights.executed == 1
+    assert storage.coalesced == 9
+
+
+async def test_metrics_are_labelled_by_rendition():
+    storage, _ = make_storage({KEY: DATA})
+
+    def sample(name: str, **labels) -> float:
+        labels = {"artefact": "segment", "rendition": "720p", **labels}
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    misses = sample("origin_cache_requests_total", tier="memory", result="miss")
+    hits = sample("origin_cache_requests_total", tier="memory", result="hit")
+    executed = sample("origin_single_flight_total", result="executed")
+
+    await read(storage, KEY)
+    await read(storage, KEY)
+
+    assert sample("origin_cache_requests_total", tier="memory", result="miss") == misses + 1
+    assert sample("origin_cache_requests_total", tier="memory", result="hit") == hits + 1
+    assert sample("origin_single_flight_total", result="executed") == executed + 1
+
+
+async def test_leader_error_reaches_every_follower():
+    storage, upstream = make_storage({KEY: DATA})
+    upstream.gate = asyncio.Event()
+    upstream.error = ObjectNotFoundException()
+
+    readers = [asyncio.create_task(read(storage, KEY)) for _ in range(5)]
+    await wait_for_readers(upstream, 1)
+    upstream.gate.set()
+
+    results = await asyncio.gather(*readers, return_exceptions=True)
+    assert all(isinstance(result, ObjectNotFoundException) for result in results)
+    assert upstream.reads == [None]
+
+    # the failure is not remembered, the next miss tries again
+    upstream.error = None
+    assert await read(storage, KEY) == DATA
+
+
+async def test_cancelled_follower_does_not_abort_the_leader():
+    storage, upstream = make_storage({KEY: DATA})
+    upstream.gate = asyncio.Event()
+
+    leader = asyncio.create_task(read(storage, KEY))
+    await wait_for_readers(upstream, 1)
+    follower = asyncio.create_task(read(storage, KEY))
+    await asyncio.sleep(0)
+    follower.cancel()
+    upstream.gate.set()
+
+    assert await leader == DATA
+    with pytest.raises(asyncio.CancelledError):
+        await follower
+    assert upstream.reads == [None]
+
+
+async def test_cancelled_leader_does_not_abort_the_followers():
+    storage, upstream = make_storage({KEY: DATA})
+    upstream.gate = asyncio.Event()
+
+    leader = asyncio.create_task(read(storage, KEY))
+    await wait_for_readers(upstream, 1)
+    followers = [asyncio.create_task(read(storage, KEY)) for _ in range(3)]
+    await asyncio.sleep(0)
+    leader.cancel()
+    upstream.gate.set()
+
+    assert await asyncio.gather(*followers) == [DATA] * 3
+    assert upstream.reads == [None]
+    # the shared download still fills the cache
+    assert KEY in storage.segment_cache
+
+
+async def test_calls_with_different_keys_run_separately():
+    flights = SingleFlight()
+    release = asyncio.Event()
+    calls = []
+
+    async def fetch(key):
+        calls.append(key)
+        await release.wait()
+        return key
+
+    first = asyncio.create_task(flights.do("a", lambda: fetch("a")))
+    second = asyncio.create_task(flights.do("b", lambda: fetch("b")))
+    shared = asyncio.create_task(flights.do("a", lambda: fetch("a")))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(first, second, shared) == [("a", False), ("b", False), ("a", True)]
+    assert calls == ["a", "b"]
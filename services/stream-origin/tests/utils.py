@@ -0,0 +1,103 @@
+import asyncio
+from typing import AsyncIterator, List
+
+from src.adapters.cached_storage import CachedStorage
+from src.exceptions import ObjectNotFoundException
+from src.interfaces.storage import AbstractStorage
+from src.schemas.storage import ByteRange, ObjectInfo, ObjectStream, StorageObject
+from src.utils.admission import AdmissionController
+from src.utils.lru_cache import LRUCache
+from src.utils.redis_cache import RedisCache
+from src.utils.ttl_cache import TTLCache
+
+
+CHUNK_SIZE = 64 * 1024
+SEGMENT_MAX_ITEM_BYTES = 1024 * 1024
+
+
+class MemoryStorage(AbstractStorage):
+    """
+    In-memory storage recording the range of every read.
+    While `gate` is set, reads wait for it; `error` is then raised instead of opening the object.
+    """
+
+    def __init__(self, objects: dict[str, bytes]):
+        self.objects = objects
+        self.reads: list[ByteRange | None] = []
+        self.gate: asyncio.Event | None = None
+        self.error: Exception | None = None
+
+    async def get_file(self, key: str) -> bytes:
+        item = await self.get_object(key)
+        return item.data
+
+    async def get_object(self, key: str) -> StorageObject:
+        stream = await self.get_file_stream(key)
+        data = b"".join([chunk async for chunk in stream])
+        await stream.aclose()
+        return StorageObject(info=stream.info, data=data)
+
+    async def get_file_stream(self, key: str, byte_range: ByteRange | None = None) -> ObjectStream:
+        self.reads.append(byte_range)
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        if key not in self.objects:
+            raise ObjectNotFoundException
+        data = self.objects[key]
+        info = ObjectInfo(key=key, size=len(data))
+        resolved_range = byte_range.resolve(len(data)) if byte_range is not None else None
+        if resolved_range is not None:
+            data = data[resolved_range.start : resolved_range.end + 1]
+        return ObjectStream(info=info, chunks=self._iter(data), byte_range=resolved_range)
+
+    @staticmethod
+    async def _iter(data: bytes) -> AsyncIterator[bytes]:
+        yield data
+
+    async def get_files_list(self, folder_path: str) -> List[dict]:
+        return [{"Key": key} for key in self.objects if key.startswith(folder_path)]
+
+    async def upload_file(self, key: str, data: bytes) -> bool:
+        self.objects[key] = data
+        return True
+
+    async def delete_file(self, key: str):
+        self.objects.pop(key, None)
+
+    async def delete_many(self, key: str) -> None:
+        for stored_key in [k for k in self.objects if k.startswith(key)]:
+            del self.objects[stored_key]
+
+    async def generate_presigned_url(self, key: str, expires: int = 3600) -> str | None:
+        return None
+
+
+def make_storage(
+    objects: dict[str, bytes],
+    admission: AdmissionController | None = None,
+    shared_playlist_cache: RedisCache | None = None,
+) -> tuple[CachedStorage, MemoryStorage]:
+    upstream = MemoryStorage(objects)
+    storage = CachedStorage(
+        storage=upstream,
+        playlist_cache=LRUCache(max_bytes=1024 * 1024),
+        segment_cache=LRUCache(max_bytes=16 * 1024 * 1024, max_item_bytes=SEGMENT_MAX_ITEM_BYTES),
+        presigned_urls=TTLCache(max_items=10),
+        admission=admission,
+        shared_playlist_cache=shared_playlist_cache,
+        range_cache=LRUCache(max_bytes=16 * 1024 * 1024),
+        range_chunk_size=CHUNK_SIZE,
+    )
+    return storage, upstream
+
+
+async def read(storage: CachedStorage, key: str, byte_range: ByteRange | None = None) -> bytes:
+    stream = await storage.get_file_stream(key, byte_range)
+    try:
+        return b"".join([chunk async for chunk in stream])
+    finally:
+        await stream.aclose()
+        # let the shared download store its result
+        await asyncio.sleep(0)